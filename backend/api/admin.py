@@ -1,8 +1,54 @@
 from django.contrib import admin
-from .models import Learner, Skill, Unit, Task
+from core.admin import LargeTableAdmin
+from .models import Learner, Skill, SkillReason, Unit, Task
 
-# Register your models here.
-admin.site.register(Learner)
-admin.site.register(Skill)
-admin.site.register(Unit)
-admin.site.register(Task)
+# Foreign keys use raw id inputs (or autocomplete where the target admin searches
+# efficiently), and searches use prefix lookups on indexed columns; see LargeTableAdmin.
+
+@admin.register(Learner)
+class LearnerAdmin(LargeTableAdmin):
+    list_display = ('user', 'birth_date')
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+    search_fields = ('user__username__startswith',)
+
+
+@admin.register(Skill)
+class SkillAdmin(LargeTableAdmin):
+    list_display = ('id', 'name', 'learner', 'tasks_done', 'tasks_total', 'deleted_at')
+    list_select_related = ('learner',)
+    list_filter = (('deleted_at', admin.EmptyFieldListFilter),)
+    raw_id_fields = ('learner',)
+    search_fields = ('learner__username__startswith',)
+
+    def get_queryset(self, request):
+        # Skills awaiting their background purge are listed too (see the deleted_at filter)
+        return Skill.all_objects.all()
+
+
+@admin.register(SkillReason)
+class SkillReasonAdmin(LargeTableAdmin):
+    list_display = ('id', 'skill', 'reason')
+    list_select_related = ('skill', 'reason')
+    raw_id_fields = ('skill', 'reason')
+    search_fields = ('skill__learner__username__startswith',)
+
+
+@admin.register(Unit)
+class UnitAdmin(LargeTableAdmin):
+    list_display = ('id', 'title', 'skill', 'deadline', 'tasks_done', 'tasks_total')
+    list_select_related = ('skill_reason_pair__skill',)
+    raw_id_fields = ('skill_reason_pair',)
+    search_fields = ('skill_reason_pair__skill__learner__username__startswith',)
+
+    @admin.display(ordering='skill_reason_pair__skill__name')
+    def skill(self, unit):
+        return unit.skill_reason_pair.skill
+
+
+@admin.register(Task)
+class TaskAdmin(LargeTableAdmin):
+    list_display = ('id', 'title', 'unit', 'done')
+    list_select_related = ('unit',)
+    autocomplete_fields = ('unit',)
+    search_fields = ('unit__skill_reason_pair__skill__learner__username__startswith',)
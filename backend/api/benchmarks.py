@@ -0,0 +1,47 @@
+"""
+Scenarios and query budgets of the API benchmark suite (`manage.py benchmark_api`).
+
+Every route of `api/urls.py` must have an entry here; the suite refuses to run
+otherwise, so new routes get a budget when they are added. A budget is the most
+queries one request may run (authentication and session included). Lower it when an
+endpoint gets cheaper, so regressions back to the old count are caught. Routes the
+suite can't drive meaningfully map to `None`, with the reason next to them.
+"""
+from collections import namedtuple
+
+
+Scenario = namedtuple('Scenario', ['method', 'max_queries', 'data', 'relogin'], defaults=(None, False))
+Scenario.__doc__ = """
+How the suite drives one route.
+
+Fields:
+    method (str): HTTP method.
+    max_queries (int): Query budget of one request.
+    data (dict or None): Request body, formatted with `username`/`password` of the benchmark user.
+    relogin (bool): Log the client back in before each request (for routes that log out).
+"""
+
+
+SCENARIOS = {
+    'Skills': Scenario('get', 4),
+    'Skill-details': Scenario('get', 4),
+    'register': Scenario('get', 2),
+    'login': Scenario('get', 2),
+    'token': Scenario('post', 5, data={'username': '{username}', 'password': '{password}'}),
+    'logout': Scenario('get', 4, relogin=True),
+    'user-detail': Scenario('get', 3),
+    # Staff-only, takes a JSON array of new accounts and is bound by password hashing, not queries
+    'learner-provision': None,
+    'learner-tree': Scenario('get', 5),
+    'learner-export': Scenario('get', 5),
+    'units': Scenario('get', 3),
+    'unit-detail': Scenario('get', 3),
+    'tasks': Scenario('get', 3),
+    'task-details': Scenario('get', 3),
+    'async-Skills': Scenario('get', 4),
+    'async-Skill-details': Scenario('get', 4),
+    'async-units': Scenario('get', 3),
+    'async-unit-detail': Scenario('get', 3),
+    'async-tasks': Scenario('get', 3),
+    'async-task-details': Scenario('get', 3),
+}
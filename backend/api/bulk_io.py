@@ -0,0 +1,325 @@
+"""
+Bulk import and export of learning plans (`manage.py import_plans` / `export_plans`).
+
+Plans are exchanged as flat records, one per task, carrying the natural keys of
+the rows above it:
+
+    username, skill, reason, unit, deadline, task, done
+
+A record with an empty `task` describes a unit without tasks, and one with an
+empty `unit` a skill without units. The same columns are used for JSONL (one
+object per line) and CSV (with a header row), so an export can be imported into
+another database as is.
+"""
+import csv
+import datetime
+import io
+import json
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import F
+
+from core.cache import bump_learner_version_on_commit
+from .models import Reason, Skill, SkillReason, Task, Unit
+from .progress import recompute_progress
+
+
+FIELDS = ('username', 'skill', 'reason', 'unit', 'deadline', 'task', 'done')
+FORMATS = ('jsonl', 'csv')
+
+_TRUE = {'1', 'true', 't', 'yes', 'y'}
+_FALSE = {'', '0', 'false', 'f', 'no', 'n'}
+
+
+class PlanImportError(ValueError):
+    """A record can't be imported; the message names the line."""
+
+
+def chunks(iterable, size):
+    """Lists of up to `size` consecutive items of `iterable`."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def read_records(stream, fmt):
+    """Yield `(line, record)` from a text stream of JSONL or CSV records."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            record = json.loads(text)
+        except ValueError as e:
+            raise PlanImportError(f"line {line}: invalid JSON ({e})")
+        if not isinstance(record, dict):
+            raise PlanImportError(f"line {line}: expected an object")
+        yield line, record
+
+
+def _text(record, field, line, required=False):
+    value = record.get(field)
+    value = '' if value is None else str(value).strip()
+    if required and not value:
+        raise PlanImportError(f"line {line}: '{field}' is required")
+    return value
+
+
+def _deadline(value, line):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise PlanImportError(f"line {line}: 'deadline' must be a YYYY-MM-DD date, not {value!r}")
+
+
+def _done(value, line):
+    if isinstance(value, bool):
+        return value
+    text = '' if value is None else str(value).strip().lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise PlanImportError(f"line {line}: 'done' must be a boolean, not {value!r}")
+
+
+def _parse(records):
+    """
+    Validate the records and group them by natural key.
+
+    Returns `(skills, units, tasks)`:
+    `{(username, skill): reason}`, `{(username, skill, unit): deadline}` and
+    `{(username, skill, unit, task): done}`. A later record for the same key wins.
+    """
+    skills, units, tasks = {}, {}, {}
+    for line, record in records:
+        username = _text(record, 'username', line, required=True)
+        skill = _text(record, 'skill', line, required=True)
+        reason = _text(record, 'reason', line)
+        unit = _text(record, 'unit', line)
+        task = _text(record, 'task', line)
+        if task and not unit:
+            raise PlanImportError(f"line {line}: a task needs a 'unit'")
+
+        if reason or (username, skill) not in skills:
+            skills[(username, skill)] = reason
+        if unit:
+            deadline = _text(record, 'deadline', line)
+            if deadline:
+                units[(username, skill, unit)] = _deadline(deadline, line)
+            else:
+                units.setdefault((username, skill, unit), None)
+        if task:
+            tasks[(username, skill, unit, task)] = _done(record.get('done'), line)
+    return skills, units, tasks
+
+
+def _copy(model, columns, rows):
+    """
+    Insert `rows` (tuples of `columns` values) into `model`'s table with COPY.
+
+    Works with both psycopg 3 (`cursor.copy()`) and psycopg2 (`copy_expert()`).
+    """
+    table = connection.ops.quote_name(model._meta.db_table)
+    names = ', '.join(connection.ops.quote_name(model._meta.get_field(c).column) for c in columns)
+    with connection.cursor() as cursor:
+        raw = cursor.cursor
+        if hasattr(raw, 'copy'):
+            with raw.copy(f'COPY {table} ({names}) FROM STDIN') as copy:
+                for row in rows:
+                    copy.write_row(row)
+            return
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        raw.copy_expert(f'COPY {table} ({names}) FROM STDIN WITH (FORMAT csv)', buffer)
+
+
+class PlanImporter:
+    """
+    Import parsed plan records, creating the rows that don't exist yet.
+
+    Users must exist. Existing skills, units and tasks are matched by natural key
+    (learner + name, skill + title, unit + title) and left as they are, so an
+    import can be re-run. Foreign keys are resolved in memory from one lookup
+    query per table and batch, then new rows are written with COPY on PostgreSQL
+    (unless `use_copy` is off) and with batched `bulk_create` elsewhere. Reasons
+    are always created with `bulk_create`, since they have no natural key to find
+    them by afterwards. The progress counters of the touched units and skills are
+    recomputed set-based at the end.
+    """
+
+    def __init__(self, batch_size=5000, use_copy=True):
+        self.batch_size = batch_size
+        self.use_copy = use_copy and connection.vendor == 'postgresql'
+        self.created = {'skills': 0, 'units': 0, 'tasks': 0}
+
+    def _insert(self, model, columns, rows):
+        for chunk in chunks(rows, self.batch_size):
+            if self.use_copy:
+                _copy(model, columns, chunk)
+            else:
+                model.objects.bulk_create(
+                    [model(**dict(zip(columns, row))) for row in chunk], batch_size=self.batch_size
+                )
+
+    def _lookup(self, queryset, field, values, *key_fields):
+        """`{key: pk}` of the rows of `queryset` with `field` in `values`, in batches."""
+        found = {}
+        for chunk in chunks(values, self.batch_size):
+            for row in queryset.filter(**{f'{field}__in': chunk}).values_list(*key_fields, 'pk'):
+                found[row[:-1]] = row[-1]
+        return found
+
+    @transaction.atomic
+    def run(self, records):
+        skills, units, tasks = _parse(records)
+
+        wanted = sorted({username for username, _ in skills})
+        user_ids = {key[0]: pk for key, pk in self._lookup(User.objects.all(), 'username', wanted, 'username').items()}
+        missing = [username for username in wanted if username not in user_ids]
+        if missing:
+            raise PlanImportError(f"unknown user(s): {', '.join(missing[:10])}{' ...' if len(missing) > 10 else ''}")
+        usernames = {pk: username for username, pk in user_ids.items()}
+
+        # Skills, keyed (username, name), with their skill-reason pair
+        def skill_keys():
+            rows = self._lookup(
+                Skill.objects.annotate(pair=F('skillreason__pk')), 'learner_id', list(usernames),
+                'learner_id', 'name', 'pair',
+            )
+            return {(usernames[learner], name): (pk, pair) for (learner, name, pair), pk in rows.items()}
+
+        existing = skill_keys()
+        new_skills = [key for key in skills if key not in existing]
+        # COPY takes no Python-side defaults: every NOT NULL column is listed with its value
+        self._insert(
+            Skill, ('learner_id', 'name', 'tasks_total', 'tasks_done', 'version'),
+            [(user_ids[u], name, 0, 0, 1) for u, name in new_skills],
+        )
+        skill_ids = skill_keys() if new_skills else existing
+
+        # Pairs for the new skills, and for existing skills that lack one
+        unpaired = [key for key in skills if skill_ids[key][1] is None]
+        reasons = Reason.objects.bulk_create(
+            [Reason(learning_reason=skills[key]) for key in unpaired], batch_size=self.batch_size
+        )
+        pairs = SkillReason.objects.bulk_create(
+            [SkillReason(skill_id=skill_ids[key][0], reason=reason) for key, reason in zip(unpaired, reasons)],
+            batch_size=self.batch_size,
+        )
+        pair_ids = {key: pair for key, (_, pair) in skill_ids.items()}
+        pair_ids.update((key, pair.pk) for key, pair in zip(unpaired, pairs))
+        self.created['skills'] = len(new_skills)
+
+        # Units, keyed (username, skill, title)
+        skill_of_pair = {pair: key for key, pair in pair_ids.items() if pair is not None}
+
+        def unit_keys():
+            rows = self._lookup(
+                Unit.objects.all(), 'skill_reason_pair_id', list(skill_of_pair), 'skill_reason_pair_id', 'title'
+            )
+            return {(*skill_of_pair[pair], title): pk for (pair, title), pk in rows.items()}
+
+        existing = unit_keys()
+        new_units = [key for key in units if key not in existing]
+        for key in new_units:
+            if units[key] is None:
+                raise PlanImportError(f"unit {key[2]!r} of skill {key[1]!r} ({key[0]}) is new and needs a 'deadline'")
+        self._insert(
+            Unit, ('skill_reason_pair_id', 'title', 'deadline', 'tasks_total', 'tasks_done', 'version'),
+            [(pair_ids[key[:2]], key[2], units[key], 0, 0, 1) for key in new_units],
+        )
+        unit_ids = unit_keys() if new_units else existing
+        self.created['units'] = len(new_units)
+
+        # Tasks, keyed (username, skill, unit, title)
+        touched_units = {unit_ids[key[:3]] for key in tasks}
+        unit_of_id = {pk: key for key, pk in unit_ids.items()}
+        existing = {
+            (*unit_of_id[unit], title)
+            for (unit, title) in self._lookup(
+                Task.objects.all(), 'unit_id', sorted(touched_units), 'unit_id', 'title'
+            )
+        }
+        new_tasks = [key for key in tasks if key not in existing]
+        self._insert(
+            Task, ('unit_id', 'title', 'done', 'version'),
+            [(unit_ids[key[:3]], key[3], tasks[key], 1) for key in new_tasks],
+        )
+        self.created['tasks'] = len(new_tasks)
+
+        # COPY and bulk_create bypass Task.save() and the signals
+        changed_units = {unit_ids[key[:3]] for key in new_tasks}
+        for chunk in chunks(sorted(changed_units), self.batch_size):
+            recompute_progress(Unit, Unit.objects.filter(pk__in=chunk))
+        changed_skills = {skill_ids[key[:2]][0] for key in new_tasks}
+        for chunk in chunks(sorted(changed_skills), self.batch_size):
+            recompute_progress(Skill, Skill.objects.filter(pk__in=chunk))
+        for user_id in {user_ids[key[0]] for key in (*new_skills, *new_units, *new_tasks)}:
+            bump_learner_version_on_commit(user_id)
+        return self.created
+
+
+def export_records(learners=None, chunk_size=2000):
+    """
+    Yield the plan records of `learners` (usernames; default: everyone) as dicts.
+
+    Three queries, each streamed with `.iterator(chunk_size=...)` (a server-side
+    cursor on PostgreSQL), so memory stays flat however many rows are exported:
+    tasks with their unit and skill, then units without tasks, then skills without
+    units.
+    """
+    tasks = Task.objects.values_list(
+        'unit__skill_reason_pair__skill__learner__username', 'unit__skill_reason_pair__skill__name',
+        'unit__skill_reason_pair__reason__learning_reason', 'unit__title', 'unit__deadline', 'title', 'done',
+    ).order_by('unit__skill_reason_pair__skill', 'unit', 'pk')
+    units = Unit.objects.filter(task__isnull=True).values_list(
+        'skill_reason_pair__skill__learner__username', 'skill_reason_pair__skill__name',
+        'skill_reason_pair__reason__learning_reason', 'title', 'deadline',
+    ).order_by('skill_reason_pair__skill', 'pk')
+    skills = Skill.objects.filter(skillreason__units__isnull=True).values_list(
+        'learner__username', 'name', 'skillreason__reason__learning_reason',
+    ).order_by('pk')
+    # Trees of skills awaiting their purge are left out, like the skills themselves
+    tasks = tasks.filter(unit__skill_reason_pair__skill__deleted_at__isnull=True)
+    units = units.filter(skill_reason_pair__skill__deleted_at__isnull=True)
+    if learners is not None:
+        tasks = tasks.filter(unit__skill_reason_pair__skill__learner__username__in=learners)
+        units = units.filter(skill_reason_pair__skill__learner__username__in=learners)
+        skills = skills.filter(learner__username__in=learners)
+
+    for queryset in (tasks, units, skills):
+        for row in queryset.iterator(chunk_size=chunk_size):
+            record = dict.fromkeys(FIELDS, '')
+            record.update(zip(FIELDS, row))
+            if record['reason'] is None:
+                record['reason'] = ''
+            if isinstance(record['deadline'], datetime.date):
+                record['deadline'] = record['deadline'].isoformat()
+            if record['task'] == '':
+                record['done'] = ''
+            yield record
+
+
+def write_records(records, stream, fmt):
+    """Write `records` to a text stream as JSONL or CSV; returns how many were written."""
+    written = 0
+    if fmt == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=FIELDS)
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+            written += 1
+        return written
+    for record in records:
+        stream.write(json.dumps(record, ensure_ascii=False))
+        stream.write('\n')
+        written += 1
+    return written
@@ -1,4 +1,5 @@
 from django import forms
+from django.db import transaction
 from django.utils import timezone
 from core.base_forms import BaseForm
 from .models import Skill, Unit, Task
@@ -6,33 +7,18 @@ from .models import Skill, Unit, Task
 class SkillForm(BaseForm):
     required_context = ['user']
     model = Skill
-    context_to_field_map = {'user': 'Learner'}
+    context_to_field_map = {'user': 'learner'}
     
     name = forms.CharField(max_length=100)
-    mid_deadline = forms.DateField()
-    final_deadline = forms.DateField()
-
-    def _validate_deadlines(self, mid, final):
-        """Logic validation of the deadlines"""
-        if final <= timezone.now().date():
-            self.add_error("final_deadline", "Deadline must be in the future.")
-        if final < mid:
-            self.add_error("mid_deadline", "Midterm deadline must be before final exam deadline.")
 
     def clean(self):
         cleaned_data = super().clean()
         Learner = self.context['user']
 
-        mid = cleaned_data.get('mid_deadline')
-        final = cleaned_data.get('final_deadline')
-
-        # Validate if the deadlines are logically set
-        self._validate_deadlines(mid, final)
-        
         # Validate if the Skill is unique for this user
         self._validate_unique(
             model=Skill,
-            filters={'name': cleaned_data.get('name'), 'Learner': Learner},
+            filters={'name': cleaned_data.get('name'), 'learner': Learner},
             error_message=f"You already have a Skill named {cleaned_data.get('name')}",
             field='name'
         )
@@ -43,11 +29,13 @@ class UnitForm(BaseForm):
     required_context = ['Skill']
     model = Unit
     title = forms.CharField(max_length=100)
-    context_to_field_map = {'Skill': 'Skill'}
+    deadline = forms.DateField()
 
     def clean(self):
         cleaned_data = super().clean()
-        Skill = self.context['Skill']
+        # Units hang off the skill's skill/reason pair. Validation must not write, so a
+        # missing pair is only created by save(); until then the skill has no units.
+        pair = self.context['Skill'].get_reason_pair(create=False)
 
         # Validate deadline if provided
         if deadline := cleaned_data.get('deadline'):
@@ -57,20 +45,26 @@ class UnitForm(BaseForm):
         # Unique Unit validation
         self._validate_unique(
             model=Unit,
-            filters={'title': cleaned_data.get('title'), 'Skill': Skill},
+            filters={'title': cleaned_data.get('title'), 'skill_reason_pair': pair},
             error_message=f"Unit {cleaned_data.get('title')} already exists in this Skill.",
             field='title'
         )
 
         return cleaned_data
 
+    def save(self, commit=True):
+        # In one transaction with the insert when committing; callers passing
+        # commit=False save the unit within their own transaction
+        with transaction.atomic():
+            self.cleaned_data['skill_reason_pair'] = self.context['Skill'].get_reason_pair()
+            return super().save(commit)
+
 class TaskForm(BaseForm):
     model = Task
     required_context = ['unit', 'Skill']
-    context_to_field_map = {'Skill': 'Skill', 'unit': 'unit'}
+    context_to_field_map = {'unit': 'unit'}
     
     title = forms.CharField(max_length=100)
-    deadline = forms.DateField(required=False)
 
     def clean(self):
         cleaned_data = super().clean()
@@ -0,0 +1,120 @@
+import logging
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLPattern, reverse
+
+from api import urls as api_urls
+from api.benchmarks import SCENARIOS
+from api.models import Task
+from api.seeding import seed_learners
+from core.cache import bump_learner_version
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive every route of api/urls.py through the test client against freshly seeded "
+        "data, report latency percentiles and query counts, and fail when a route exceeds "
+        "its query budget (api/benchmarks.py) or errors. The seeded data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--learners', type=int, default=20, help="Learners to seed (default: 20).")
+        parser.add_argument('--requests', type=int, default=20, help="Requests per route (default: 20).")
+        parser.add_argument('--warm-cache', action='store_true',
+                            help="Let the response cache serve repeated GETs (default: every request misses).")
+        parser.add_argument('--route', action='append', dest='routes', metavar='NAME',
+                            help="Only run this route (repeatable).")
+
+    def handle(self, *args, **options):
+        patterns = {p.name: p for p in api_urls.urlpatterns if isinstance(p, URLPattern) and p.name}
+        missing = sorted(set(patterns) - set(SCENARIOS))
+        if missing:
+            raise CommandError(f"No benchmark scenario for route(s): {', '.join(missing)} (see api/benchmarks.py).")
+        names = options['routes'] or [name for name in patterns if SCENARIOS[name] is not None]
+        unknown = sorted(set(names) - set(patterns))
+        if unknown:
+            raise CommandError(f"Unknown route(s): {', '.join(unknown)}.")
+        excluded = sorted(name for name in names if SCENARIOS[name] is None)
+        if excluded:
+            raise CommandError(f"Route(s) without a benchmark scenario: {', '.join(excluded)} (see api/benchmarks.py).")
+
+        failures = []
+        # Server errors are reported in the table; their tracebacks would drown it
+        request_logger = logging.getLogger('django.request')
+        level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        try:
+            with transaction.atomic(), override_settings(ALLOWED_HOSTS=['*']):
+                failures = self.run(patterns, names, options)
+                raise _Rollback
+        except _Rollback:
+            pass
+        finally:
+            request_logger.setLevel(level)
+
+        if failures:
+            raise CommandError(f"{len(failures)} route(s) failed: {', '.join(failures)}.")
+        self.stdout.write(self.style.SUCCESS("All routes within budget."))
+
+    def run(self, patterns, names, options):
+        password = 'benchmark'
+        users = seed_learners(options['learners'], password=password, prefix=f'benchmark-{time.time_ns()}')
+        user = users[0]
+        task = Task.objects.filter(unit__skill_reason_pair__skill__learner=user).select_related(
+            'unit__skill_reason_pair'
+        ).first()
+        url_values = {
+            'Skill_id': task.unit.skill_reason_pair.skill_id,
+            'unit_id': task.unit_id,
+            'task_id': task.pk,
+        }
+        substitutions = {'username': user.username, 'password': password}
+
+        client = Client(raise_request_exception=False)
+        self.stdout.write(
+            f"{'route':<22}{'method':<8}{'status':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'queries':>9}{'budget':>8}"
+        )
+        failures = []
+        for name in names:
+            scenario = SCENARIOS[name]
+            url = reverse(name, kwargs={key: url_values[key] for key in patterns[name].pattern.converters})
+            data = {key: value.format(**substitutions) for key, value in (scenario.data or {}).items()}
+
+            client.force_login(user)
+            latencies, query_counts, statuses = [], [], set()
+            for _ in range(options['requests']):
+                if scenario.relogin:
+                    client.force_login(user)
+                if not options['warm_cache']:
+                    bump_learner_version(user.pk)
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    response = getattr(client, scenario.method)(url, data or None)
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                    latencies.append(time.perf_counter() - start)
+                query_counts.append(len(queries))
+                statuses.add(response.status_code)
+
+            quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+            worst = max(query_counts)
+            failed = worst > scenario.max_queries or any(code >= 500 for code in statuses)
+            if failed:
+                failures.append(name)
+            status_text = ','.join(str(code) for code in sorted(statuses))
+            line = (
+                f"{name:<22}{scenario.method.upper():<8}{status_text:>7}{quantiles[49] * 1e3:>9.1f}"
+                f"{quantiles[94] * 1e3:>9.1f}{quantiles[98] * 1e3:>9.1f}{worst:>9}{scenario.max_queries:>8}"
+            )
+            self.stdout.write(self.style.ERROR(line) if failed else line)
+        return failures
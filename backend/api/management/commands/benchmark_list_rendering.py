@@ -0,0 +1,80 @@
+import datetime
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from api.models import Learner, Reason, Skill, SkillReason, Task, Unit
+from api.serializers import TaskSerializer
+from core.query_planner import values_fields_for_serializer
+from core.renderers import FastJSONRenderer, orjson
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark rendering a list of tasks through the stock path (TaskSerializer + "
+        "DRF's JSONRenderer) against the fast path (values() rows + FastJSONRenderer). "
+        "The tasks are created inside a transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=10000, help="Number of tasks to list (default: 10000).")
+        parser.add_argument('--repeat', type=int, default=5, help="Runs per path; the best is reported (default: 5).")
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stderr.write("orjson is not installed; FastJSONRenderer falls back to the stock encoder.")
+        try:
+            with transaction.atomic():
+                self.run(options['tasks'], options['repeat'])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def run(self, count, repeat):
+        user = get_user_model().objects.create_user(f'benchmark-{time.time_ns()}')
+        Learner.objects.create(user=user, birth_date=datetime.date(2000, 1, 1))
+        skill = Skill.objects.create(name='benchmark', learner=user)
+        pair = SkillReason.objects.create(skill=skill, reason=Reason.objects.create(learning_reason='benchmark'))
+        unit = Unit.objects.create(title='benchmark', skill_reason_pair=pair, deadline=datetime.date(2100, 1, 1))
+        Task.objects.bulk_create(
+            (Task(title=f'task {i}', unit=unit, done=i % 2 == 0) for i in range(count)), batch_size=1000
+        )
+        queryset = Task.objects.filter(unit=unit).order_by('id')
+        fields = values_fields_for_serializer(TaskSerializer)
+
+        paths = (
+            ('stock', lambda: TaskSerializer(queryset.all(), many=True).data, JSONRenderer()),
+            ('fast', lambda: list(queryset.values(*fields)), FastJSONRenderer()),
+        )
+
+        self.stdout.write(f"{count} tasks, best of {repeat}")
+        self.stdout.write(f"{'path':<8}{'fetch + serialize ms':>22}{'render ms':>12}{'total ms':>12}{'bytes':>10}")
+        results = {}
+        for label, serialize, renderer in paths:
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                data = serialize()
+                serialized = time.perf_counter()
+                body = renderer.render(data)
+                rendered = time.perf_counter()
+                timing = (serialized - start, rendered - serialized)
+                if best is None or sum(timing) < sum(best):
+                    best = timing
+            results[label] = (best, body)
+            self.stdout.write(
+                f"{label:<8}{best[0] * 1e3:>22.1f}{best[1] * 1e3:>12.1f}"
+                f"{sum(best) * 1e3:>12.1f}{len(body):>10}"
+            )
+
+        (stock_timing, stock_body), (fast_timing, fast_body) = results['stock'], results['fast']
+        self.stdout.write(f"speedup: {sum(stock_timing) / sum(fast_timing):.1f}x")
+        if stock_body != fast_body:
+            self.stderr.write("Output differs between the two paths.")
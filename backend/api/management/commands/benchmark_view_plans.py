@@ -0,0 +1,121 @@
+import statistics
+import time
+import timeit
+from contextlib import nullcontext
+from unittest import mock
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLPattern, reverse
+
+from api import urls as api_urls
+from api.benchmarks import SCENARIOS
+from api.models import Task
+from api.seeding import seed_learners
+from core.cache import bump_learner_version
+from core.view_plans import ViewPlan, ViewPlanMixin
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _compile_per_call(cls):
+    """`get_view_plan` without the per-class cache: the metadata is worked out on every use."""
+    return ViewPlan(cls)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the per-view plans (core.view_plans): drive every route whose view "
+        "compiles a ViewPlan through the test client, with the plan cached on the class "
+        "and with it recompiled on every use (the per-request behaviour before the plans), "
+        "and report latency and query counts of both, plus the time of resolving the parent "
+        "filters alone. Fails if the two differ in queries "
+        "or status. The seeded data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--learners', type=int, default=20, help="Learners to seed (default: 20).")
+        parser.add_argument('--requests', type=int, default=200, help="Requests per route and mode (default: 200).")
+
+    def handle(self, *args, **options):
+        failures = []
+        try:
+            with transaction.atomic(), override_settings(ALLOWED_HOSTS=['*']):
+                failures = self.run(options)
+                raise _Rollback
+        except _Rollback:
+            pass
+        if failures:
+            raise CommandError(f"Plan and no-plan runs differ for route(s): {', '.join(failures)}.")
+
+    def run(self, options):
+        user = seed_learners(options['learners'], password='benchmark', prefix=f'benchmark-{time.time_ns()}')[0]
+        task = Task.objects.filter(unit__skill_reason_pair__skill__learner=user).select_related(
+            'unit__skill_reason_pair'
+        ).first()
+        url_values = {
+            'Skill_id': task.unit.skill_reason_pair.skill_id,
+            'unit_id': task.unit_id,
+            'task_id': task.pk,
+        }
+        routes = [
+            (p.name, p.callback.view_class, {key: url_values[key] for key in p.pattern.converters})
+            for p in api_urls.urlpatterns
+            if isinstance(p, URLPattern) and issubclass(getattr(p.callback, 'view_class', object), ViewPlanMixin)
+            and SCENARIOS.get(p.name) is not None and SCENARIOS[p.name].method == 'get'
+        ]
+
+        client = Client(raise_request_exception=False)
+        client.force_login(user)
+        self.stdout.write(
+            "Filters: resolving the URL's parent filters alone. Request: the whole GET, "
+            "median of the interleaved runs."
+        )
+        self.stdout.write(
+            f"{'route':<22}{'filters us':>11}{'no plan':>9}{'request us':>12}{'no plan':>9}"
+            f"{'queries':>9}{'no plan':>9}"
+        )
+        failures = []
+        for name, view_class, kwargs in routes:
+            url = reverse(name, kwargs=kwargs)
+            number = options['requests'] * 10
+            plan_filters = timeit.timeit(
+                lambda: view_class.get_view_plan().fill_parent_filters(kwargs, user), number=number
+            ) / number
+            raw_filters = timeit.timeit(
+                lambda: _compile_per_call(view_class).fill_parent_filters(kwargs, user), number=number
+            ) / number
+
+            results = {'plan': ([], set(), set()), 'no plan': ([], set(), set())}
+            # Interleaved, so both modes see the same cache and database state
+            for _ in range(options['requests']):
+                for mode, (latencies, query_counts, statuses) in results.items():
+                    bump_learner_version(user.pk)
+                    plans = (
+                        mock.patch.object(ViewPlanMixin, 'get_view_plan', classmethod(_compile_per_call))
+                        if mode == 'no plan' else nullcontext()
+                    )
+                    with plans, CaptureQueriesContext(connection) as queries:
+                        start = time.perf_counter()
+                        response = client.get(url)
+                        if response.streaming:
+                            b''.join(response.streaming_content)
+                        latencies.append(time.perf_counter() - start)
+                    query_counts.add(len(queries))
+                    statuses.add(response.status_code)
+
+            (plan_times, plan_queries, plan_statuses), (raw_times, raw_queries, raw_statuses) = results.values()
+            plan_p50, raw_p50 = statistics.median(plan_times) * 1e6, statistics.median(raw_times) * 1e6
+            failed = plan_queries != raw_queries or plan_statuses != raw_statuses or len(plan_queries) != 1
+            if failed:
+                failures.append(name)
+            line = (
+                f"{name:<22}{plan_filters * 1e6:>11.1f}{raw_filters * 1e6:>9.1f}{plan_p50:>12.0f}{raw_p50:>9.0f}"
+                f"{','.join(map(str, sorted(plan_queries))):>9}{','.join(map(str, sorted(raw_queries))):>9}"
+            )
+            self.stdout.write(self.style.ERROR(line) if failed else line)
+        return failures
@@ -0,0 +1,30 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from api.bulk_io import FORMATS, export_records, write_records
+from .import_plans import format_of
+
+
+class Command(BaseCommand):
+    help = (
+        "Export learning plans as JSONL or CSV records (the format import_plans reads), "
+        "streaming the rows with server-side cursors so memory use doesn't grow with the data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help="Output file (default: standard output).")
+        parser.add_argument('--format', choices=FORMATS, help="Record format (default: from the extension, else jsonl).")
+        parser.add_argument('--learner', action='append', dest='learners', metavar='USERNAME',
+                            help="Only export this learner's plans (repeatable).")
+        parser.add_argument('--chunk-size', type=int, default=2000, help="Rows fetched per round trip (default: 2000).")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        records = export_records(options['learners'], chunk_size=options['chunk_size'])
+        if path == '-':
+            write_records(records, sys.stdout, format_of(path, options['format']))
+            return
+        with open(path, 'w', newline='', encoding='utf-8') as stream:
+            written = write_records(records, stream, format_of(path, options['format']))
+        self.stderr.write(f"Exported {written} record(s) to {path}.")
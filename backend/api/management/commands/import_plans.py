@@ -0,0 +1,48 @@
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.bulk_io import FORMATS, PlanImporter, PlanImportError, read_records
+
+
+def format_of(path, fmt):
+    """The explicit format, or the one the file extension names (JSONL by default)."""
+    if fmt:
+        return fmt
+    extension = os.path.splitext(path)[1].lstrip('.').lower()
+    return 'csv' if extension == 'csv' else 'jsonl'
+
+
+class Command(BaseCommand):
+    help = (
+        "Import learning plans (skills, reasons, units and tasks) from JSONL or CSV records "
+        "of username, skill, reason, unit, deadline, task, done. Rows that already exist are "
+        "kept; new ones are written with COPY on PostgreSQL and batched bulk_create elsewhere, "
+        "in one transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, or '-' for standard input.")
+        parser.add_argument('--format', choices=FORMATS, help="Record format (default: from the extension, else jsonl).")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows per lookup and insert (default: 5000).")
+        parser.add_argument('--no-copy', action='store_true', help="Use bulk_create even on PostgreSQL.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = format_of(path, options['format'])
+        importer = PlanImporter(batch_size=options['batch_size'], use_copy=not options['no_copy'])
+        start = time.perf_counter()
+        try:
+            if path == '-':
+                created = importer.run(read_records(sys.stdin, fmt))
+            else:
+                with open(path, newline='', encoding='utf-8') as stream:
+                    created = importer.run(read_records(stream, fmt))
+        except (OSError, PlanImportError) as e:
+            raise CommandError(str(e))
+        self.stdout.write(
+            f"Created {created['skills']} skill(s), {created['units']} unit(s) and {created['tasks']} task(s) "
+            f"in {time.perf_counter() - start:.1f}s ({'COPY' if importer.use_copy else 'bulk_create'})."
+        )
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.models import Skill, Unit
+from api.progress import drifted, recompute_progress
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the tasks_total/tasks_done counters of units (from their tasks) and "
+        "skills (from their units) with one set-based UPDATE per table, touching only the "
+        "rows that drifted. Best run when few tasks are being written, since tasks "
+        "created while the command runs may still be counted off by one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help="Only report drifted rows; exit with an error if there are any.")
+
+    def handle(self, *args, **options):
+        if options['check']:
+            units, skills = drifted(Unit).count(), drifted(Skill).count()
+            if units or skills:
+                raise CommandError(f"{units} unit(s) and {skills} skill(s) have drifted counters.")
+            self.stdout.write("All progress counters are up to date.")
+            return
+
+        with transaction.atomic():
+            units = recompute_progress(Unit)
+            # Skill sums are read from the unit counters, so those are fixed first
+            skills = recompute_progress(Skill)
+        self.stdout.write(f"Rebuilt the counters of {units} unit(s) and {skills} skill(s).")
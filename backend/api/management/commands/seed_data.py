@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.models import Task
+from api.seeding import seed_learners
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed synthetic learners with Skill/SkillReason/Unit/Task trees using bulk_create, "
+        "for benchmarks and local load testing. All users get the same password."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('learners', type=int, help="Number of learners to create.")
+        parser.add_argument('--skills', type=int, default=5, help="Average skills per learner (default: 5).")
+        parser.add_argument('--units', type=int, default=4, help="Average units per skill (default: 4).")
+        parser.add_argument('--tasks', type=int, default=8, help="Average tasks per unit (default: 8).")
+        parser.add_argument('--done-ratio', type=float, default=0.4, help="Share of done tasks (default: 0.4).")
+        parser.add_argument('--password', default='benchmark', help="Password of the seeded users.")
+        parser.add_argument('--prefix', default=None,
+                            help="Username prefix (default: 'seed-<timestamp>', so runs don't collide).")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed (default: 0).")
+
+    def handle(self, *args, **options):
+        prefix = options['prefix'] or f'seed-{int(time.time())}'
+        tasks_before = Task.objects.count()
+        start = time.perf_counter()
+        users = seed_learners(
+            options['learners'], skills=options['skills'], units=options['units'], tasks=options['tasks'],
+            done_ratio=options['done_ratio'], password=options['password'], prefix=prefix, seed=options['seed'],
+        )
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"Created {len(users)} learners ({prefix}-0 ...) with {Task.objects.count() - tasks_before} tasks "
+            f"in {elapsed:.1f}s."
+        )
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_reason_rename_learner_skill_learner_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['learner', 'id'], name='skill_learner_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['unit', 'id'], name='task_unit_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='unit',
+            index=models.Index(fields=['skill_reason_pair', 'id'], name='unit_pair_id_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='skill',
+            constraint=models.UniqueConstraint(fields=('learner', 'name'), name='unique_skill_name_per_learner'),
+        ),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.UniqueConstraint(fields=('unit', 'title'), name='unique_task_title_per_unit'),
+        ),
+        migrations.AddConstraint(
+            model_name='unit',
+            constraint=models.UniqueConstraint(fields=('skill_reason_pair', 'title'), name='unique_unit_title_per_skill_reason'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:07
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def fill_progress_counters(apps, schema_editor):
+    Task = apps.get_model('api', 'Task')
+    Unit = apps.get_model('api', 'Unit')
+    Skill = apps.get_model('api', 'Skill')
+
+    tasks = Task.objects.filter(unit=OuterRef('pk')).order_by().values('unit')
+    Unit.objects.update(
+        tasks_total=Coalesce(Subquery(tasks.annotate(n=Count('pk')).values('n')), 0),
+        tasks_done=Coalesce(Subquery(tasks.annotate(n=Count('pk', filter=Q(done=True))).values('n')), 0),
+    )
+    units = Unit.objects.filter(skill_reason_pair__skill=OuterRef('pk')).order_by().values('skill_reason_pair__skill')
+    Skill.objects.update(
+        tasks_total=Coalesce(Subquery(units.annotate(n=Sum('tasks_total')).values('n')), 0),
+        tasks_done=Coalesce(Subquery(units.annotate(n=Sum('tasks_done')).values('n')), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_unique_constraints_and_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skill',
+            name='tasks_done',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='skill',
+            name='tasks_total',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='unit',
+            name='tasks_done',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='unit',
+            name='tasks_total',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_progress_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_progress_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skill',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.AddField(
+            model_name='unit',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
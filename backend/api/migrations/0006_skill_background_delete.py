@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_versions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='skill',
+            name='unique_skill_name_per_learner',
+        ),
+        migrations.AddField(
+            model_name='skill',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='skill',
+            constraint=models.UniqueConstraint(condition=models.Q(('deleted_at__isnull', True)), fields=('learner', 'name'), name='unique_skill_name_per_learner'),
+        ),
+    ]
@@ -1,7 +1,10 @@
-from django.db import models
+from django.db import IntegrityError, models, router, transaction
+from django.db.models import F, Q
 from django.contrib.auth.models import User
 from django.db.models.deletion import PROTECT
 from django.utils import timezone
+from core.deletion import delete_in_batches
+from core.models import SoftDeleteModel, StaleVersionError, VersionedModel
 
 # Create your models here.
 class Learner(models.Model):
@@ -11,13 +14,70 @@ class Learner(models.Model):
     def __str__(self):
         return self.user.username
 
-class Skill(models.Model):
+class Skill(SoftDeleteModel, VersionedModel):
+    """
+    A learner's skill, root of a SkillReason -> Unit -> Task tree.
+
+    Deleting through the API marks the skill deleted (`SoftDeleteModel`) and
+    leaves removing the tree to a background purge (`purge()`).
+    """
     name = models.CharField(max_length=200)
     learner = models.ForeignKey(User, on_delete=models.PROTECT)
+    # Sums of the counters of the skill's units, maintained alongside them (see adjust_progress)
+    tasks_total = models.PositiveIntegerField(default=0, editable=False)
+    tasks_done = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        constraints = [
+            # Only among live skills, so a name can be reused while the old skill awaits its purge
+            models.UniqueConstraint(
+                fields=['learner', 'name'], condition=Q(deleted_at__isnull=True), name='unique_skill_name_per_learner',
+            ),
+        ]
+        indexes = [
+            # Backs keyset pagination of a learner's skills (filter by learner, order by id)
+            models.Index(fields=['learner', 'id'], name='skill_learner_id_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    def get_reason_pair(self, create=True):
+        """
+        The skill's `SkillReason`, which its units hang off, created with an empty
+        reason if the skill has none yet (as `manage.py import_plans` does). With
+        `create=False`, `None` instead.
+        """
+        try:
+            return self.skillreason
+        except SkillReason.DoesNotExist:
+            if not create:
+                return None
+        try:
+            with transaction.atomic():
+                return SkillReason.objects.create(skill=self, reason=Reason.objects.create(learning_reason=''))
+        except IntegrityError:
+            # Created by a concurrent request
+            return SkillReason.objects.get(skill=self)
+
+    def purge(self):
+        """
+        Delete the tree bottom-up in batches: tasks, units, the skill/reason pair and
+        its reason, then the skill.
+
+        `Task.unit` is PROTECT and the collector would load every row of the tree, so
+        this deletes with raw batched statements instead (`delete_in_batches`),
+        without delete signals; the skill is already hidden, so no counters or
+        cached responses need updating.
+        """
+        units = Unit.objects.filter(skill_reason_pair__skill=self)
+        delete_in_batches(Task.objects.filter(unit__in=units))
+        delete_in_batches(units)
+        reason_ids = list(SkillReason.objects.filter(skill=self).values_list('reason_id', flat=True))
+        delete_in_batches(SkillReason.objects.filter(skill=self))
+        delete_in_batches(Reason.objects.filter(pk__in=reason_ids))
+        delete_in_batches(type(self).all_objects.filter(pk=self.pk))
+
 class Reason(models.Model):
     learning_reason = models.CharField(max_length=100)
 
@@ -28,21 +88,107 @@ class SkillReason(models.Model):
     reason = models.OneToOneField(Reason, on_delete=models.CASCADE)
     skill = models.OneToOneField(Skill, on_delete=models.CASCADE)
 
-class Unit(models.Model):
+class Unit(VersionedModel):
     title = models.CharField(max_length=100)
     skill_reason_pair = models.ForeignKey(SkillReason, on_delete=models.CASCADE, related_name='units')
     deadline = models.DateField()
+    # Denormalized task counts, maintained by Task.save(), Task deletes and the bulk task views
+    tasks_total = models.PositiveIntegerField(default=0, editable=False)
+    tasks_done = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['skill_reason_pair', 'title'], name='unique_unit_title_per_skill_reason'),
+        ]
+        indexes = [
+            models.Index(fields=['skill_reason_pair', 'id'], name='unit_pair_id_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
 
-class Task(models.Model):
+def adjust_progress(unit_id, total=0, done=0):
+    """
+    Add `total`/`done` to the task counters of a unit and of its skill.
+
+    The counters are updated with `F()` expressions, so concurrent adjustments don't
+    overwrite each other. Call it in the transaction that creates, deletes or
+    updates the tasks.
+    """
+    changes = {}
+    if total:
+        changes['tasks_total'] = F('tasks_total') + total
+    if done:
+        changes['tasks_done'] = F('tasks_done') + done
+    if not changes:
+        return
+    Unit.objects.filter(pk=unit_id).update(**changes)
+    Skill.objects.filter(skillreason__units__pk=unit_id).update(**changes)
+
+
+class Task(VersionedModel):
+    """
+    A task of a unit.
+
+    Creating a task, flipping `done` or moving it to another unit adjusts the
+    progress counters of the units and skills involved in the same transaction
+    (`save()`); deletes are handled by a `post_delete` receiver (`api.signals`),
+    which runs inside the delete's transaction. Bulk writes that bypass both must
+    call `adjust_progress` themselves, as `TasksListView` does.
+
+    Updates are checked against `version` (`VersionedModel`), which is also what
+    keeps the counter adjustments right without locking the row.
+    """
     title = models.CharField(max_length=100)
     unit = models.ForeignKey(Unit, on_delete=models.PROTECT)
     done = models.BooleanField(default=False)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['unit', 'title'], name='unique_task_title_per_unit'),
+        ]
+        indexes = [
+            models.Index(fields=['unit', 'id'], name='task_unit_id_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        update_fields = None if update_fields is None else set(update_fields)
+        saves_unit = update_fields is None or bool({'unit', 'unit_id'} & update_fields)
+        saves_done = update_fields is None or 'done' in update_fields
+
+        if not self._state.adding and not (saves_unit or saves_done):
+            return super().save(*args, **kwargs)
+
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            previous = None
+            if not self._state.adding:
+                # The stored row: what's in memory may have been overwritten since it was read.
+                # If it is still at our version, the compare-and-swap in save() guarantees it
+                # stays as read until the update, so it needn't be locked.
+                previous = type(self)._base_manager.using(using).filter(
+                    pk=self.pk
+                ).values_list('unit_id', 'done', 'version').first()
+                if previous is not None and previous[2] != self.version:
+                    raise StaleVersionError(self, previous[2])
+
+            super().save(*args, **kwargs)
+
+            if previous is None:
+                adjust_progress(self.unit_id, total=1, done=int(self.done))
+                return
+
+            unit_id = self.unit_id if saves_unit else previous[0]
+            done = self.done if saves_done else previous[1]
+            if unit_id != previous[0]:
+                adjust_progress(previous[0], total=-1, done=-int(previous[1]))
+                adjust_progress(unit_id, total=1, done=int(done))
+            elif done != previous[1]:
+                adjust_progress(unit_id, done=int(done) - int(previous[1]))
+
 
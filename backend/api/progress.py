@@ -0,0 +1,43 @@
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from .models import Skill, Task, Unit
+
+
+def unit_progress_counts():
+    """`(tasks_total, tasks_done)` expressions counting a unit's tasks."""
+    tasks = Task.objects.filter(unit=OuterRef('pk')).order_by().values('unit')
+    return (
+        Coalesce(Subquery(tasks.annotate(n=Count('pk')).values('n')), 0),
+        Coalesce(Subquery(tasks.annotate(n=Count('pk', filter=Q(done=True))).values('n')), 0),
+    )
+
+
+def skill_progress_counts():
+    """`(tasks_total, tasks_done)` expressions summing the counters of a skill's units."""
+    units = Unit.objects.filter(skill_reason_pair__skill=OuterRef('pk')).order_by().values('skill_reason_pair__skill')
+    return (
+        Coalesce(Subquery(units.annotate(n=Sum('tasks_total')).values('n')), 0),
+        Coalesce(Subquery(units.annotate(n=Sum('tasks_done')).values('n')), 0),
+    )
+
+
+def drifted(model):
+    """Rows of `Unit` or `Skill` whose counters differ from what they should be."""
+    total, done = unit_progress_counts() if model is Unit else skill_progress_counts()
+    return model.objects.annotate(actual_total=total, actual_done=done).exclude(
+        tasks_total=F('actual_total'), tasks_done=F('actual_done')
+    )
+
+
+def recompute_progress(model, queryset=None):
+    """
+    Recompute the counters of `queryset` (default: the drifted rows) of `Unit` or `Skill`.
+
+    One set-based UPDATE; skills read the unit counters, so fix units first.
+    Returns the number of rows updated.
+    """
+    total, done = unit_progress_counts() if model is Unit else skill_progress_counts()
+    if queryset is None:
+        queryset = model.objects.filter(pk__in=Subquery(drifted(model).values('pk')))
+    return queryset.update(tasks_total=total, tasks_done=done)
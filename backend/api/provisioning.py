@@ -0,0 +1,104 @@
+"""
+Bulk provisioning of learner accounts for a cohort (`CohortProvisionView`, `manage.py provision_learners`).
+
+Registering learners one by one (`RegisterSerializer`) costs two uniqueness
+queries, a password hash and two inserts per person. Here the whole cohort is
+validated with one set-based uniqueness query, passwords are hashed in a pool of
+worker processes (`core.hashing`), and the users and learners are written with
+`bulk_create` in one transaction.
+"""
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from rest_framework import serializers
+
+from core.hashing import hash_passwords
+from .bulk_io import chunks
+from .models import Learner
+
+
+class CohortLearnerSerializer(serializers.Serializer):
+    """One row of a cohort: the fields of `RegisterSerializer`, without its per-row queries."""
+    username = serializers.CharField(max_length=150, validators=[User.username_validator])
+    email = serializers.EmailField()
+    password = serializers.CharField(write_only=True)
+    first_name = serializers.CharField(max_length=150, required=False, allow_blank=True, default='')
+    last_name = serializers.CharField(max_length=150, required=False, allow_blank=True, default='')
+    birth_date = serializers.DateField()
+
+
+def _taken(rows, batch_size=1000):
+    """Usernames and emails of `rows` that belong to existing users, looked up in batches."""
+    usernames, emails = set(), set()
+    for chunk in chunks(rows, batch_size):
+        existing = User.objects.filter(
+            Q(username__in=[row['username'] for row in chunk]) | Q(email__in=[row['email'] for row in chunk])
+        ).values_list('username', 'email')
+        for username, email in existing:
+            usernames.add(username)
+            emails.add(email)
+    return usernames, emails
+
+
+def _uniqueness_errors(rows, errors):
+    """Add errors for usernames/emails repeated within the cohort or already taken."""
+    usernames, emails = _taken([row for row in rows if row is not None])
+    seen_usernames, seen_emails = set(), set()
+    for row, row_errors in zip(rows, errors):
+        if row is None:
+            continue
+        if row['username'] in usernames:
+            row_errors.setdefault('username', []).append("A user with that username already exists.")
+        elif row['username'] in seen_usernames:
+            row_errors.setdefault('username', []).append("Duplicate username in request.")
+        if row['email'] in emails:
+            row_errors.setdefault('email', []).append("A user with that email address already exists.")
+        elif row['email'] in seen_emails:
+            row_errors.setdefault('email', []).append("Duplicate email in request.")
+        seen_usernames.add(row['username'])
+        seen_emails.add(row['email'])
+
+
+def provision_learners(items, workers=None):
+    """
+    Create a user and a learner profile for each item, all or nothing.
+
+    Returns `(users, errors)`: the created users in input order, or no users and
+    one error dict per item (empty for valid items) if any item is invalid.
+    """
+    rows, errors = [], []
+    for item in items:
+        serializer = CohortLearnerSerializer(data=item)
+        if serializer.is_valid():
+            rows.append(serializer.validated_data)
+            errors.append({})
+        else:
+            rows.append(None)
+            errors.append(dict(serializer.errors))
+    _uniqueness_errors(rows, errors)
+    if any(errors):
+        return [], errors
+
+    hashes = hash_passwords([row['password'] for row in rows], workers=workers)
+    users = [
+        User(
+            username=row['username'], email=row['email'], password=password_hash,
+            first_name=row['first_name'], last_name=row['last_name'],
+        )
+        for row, password_hash in zip(rows, hashes)
+    ]
+    try:
+        with transaction.atomic():
+            users = User.objects.bulk_create(users, batch_size=1000)
+            Learner.objects.bulk_create(
+                [Learner(user=user, birth_date=row['birth_date']) for user, row in zip(users, rows)],
+                batch_size=1000,
+            )
+    except IntegrityError:
+        # Someone registered one of the names while the passwords were hashed
+        errors = [{} for _ in rows]
+        _uniqueness_errors(rows, errors)
+        if not any(errors):
+            raise
+        return [], errors
+    return users, errors
@@ -0,0 +1,81 @@
+import datetime
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from .models import Learner, Reason, Skill, SkillReason, Task, Unit
+
+
+LEARNING_REASONS = (
+    "Career change", "Promotion", "University course", "Side project", "Certification", "Curiosity",
+)
+
+
+def _fan_out(rng, mean):
+    """A child count around `mean` (at least 1), so trees aren't uniformly shaped."""
+    return max(1, round(rng.gauss(mean, mean / 3)))
+
+
+@transaction.atomic
+def seed_learners(count, skills=5, units=4, tasks=8, done_ratio=0.4, password='benchmark',
+                  prefix='learner', seed=0, batch_size=1000):
+    """
+    Create `count` learners with Skill -> SkillReason -> Unit -> Task trees, using `bulk_create`.
+
+    Each learner gets about `skills` skills, each skill about `units` units and each
+    unit about `tasks` tasks (varied around those means), with `done_ratio` of the
+    tasks done. The progress counters are filled in as the rows are generated.
+    Usernames are `{prefix}-{n}`; all users share `password`, hashed once.
+
+    Returns the created users.
+    """
+    rng = random.Random(seed)
+    password_hash = make_password(password)
+    today = datetime.date.today()
+
+    users = User.objects.bulk_create(
+        [User(username=f'{prefix}-{n}', email=f'{prefix}-{n}@example.com', password=password_hash)
+         for n in range(count)],
+        batch_size=batch_size,
+    )
+    Learner.objects.bulk_create(
+        [Learner(user=user, birth_date=datetime.date(rng.randint(1960, 2008), rng.randint(1, 12), rng.randint(1, 28)))
+         for user in users],
+        batch_size=batch_size,
+    )
+
+    # Shape the trees first, so every counter is known when its row is created
+    skill_rows, unit_rows, task_rows = [], [], []
+    for user in users:
+        for s in range(_fan_out(rng, skills)):
+            skill = Skill(name=f'Skill {s}', learner=user)
+            skill_rows.append(skill)
+            for u in range(_fan_out(rng, units)):
+                unit = Unit(title=f'Unit {u}', deadline=today + datetime.timedelta(days=rng.randint(7, 365)))
+                unit_rows.append((skill, unit))
+                for t in range(_fan_out(rng, tasks)):
+                    task = Task(title=f'Task {t}', done=rng.random() < done_ratio)
+                    task_rows.append((unit, task))
+                    unit.tasks_total += 1
+                    unit.tasks_done += task.done
+                skill.tasks_total += unit.tasks_total
+                skill.tasks_done += unit.tasks_done
+
+    Skill.objects.bulk_create(skill_rows, batch_size=batch_size)
+    reasons = Reason.objects.bulk_create(
+        [Reason(learning_reason=rng.choice(LEARNING_REASONS)) for _ in skill_rows], batch_size=batch_size
+    )
+    pairs = SkillReason.objects.bulk_create(
+        [SkillReason(skill=skill, reason=reason) for skill, reason in zip(skill_rows, reasons)],
+        batch_size=batch_size,
+    )
+    pair_of_skill = {pair.skill_id: pair for pair in pairs}
+    for skill, unit in unit_rows:
+        unit.skill_reason_pair = pair_of_skill[skill.pk]
+    Unit.objects.bulk_create([unit for _, unit in unit_rows], batch_size=batch_size)
+    for unit, task in task_rows:
+        task.unit = unit
+    Task.objects.bulk_create([task for _, task in task_rows], batch_size=batch_size)
+    return users
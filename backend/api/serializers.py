@@ -2,11 +2,11 @@ from rest_framework import serializers
 from django.db import transaction
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
-from .models import Learner, Unit, Skill, Task
+from .models import Learner, Unit, Skill, Task, SkillReason, Reason
 from django.utils import timezone
 
 class LearnerSerializer(serializers.ModelSerializer):
-    birth_date = serializers.DateField(source='Learner.birth_date', read_only=True)
+    birth_date = serializers.DateField(source='learner.birth_date', read_only=True)
 
     class Meta:
         model = User
@@ -16,15 +16,17 @@ class LearnerSerializer(serializers.ModelSerializer):
 class UnitSerializer(serializers.ModelSerializer):
     class Meta:
         model = Unit
-        fields = ['title']
+        fields = ['id', 'title', 'deadline', 'tasks_total', 'tasks_done', 'version']
+        read_only_fields = ['tasks_total', 'tasks_done', 'version']
 
 
 class SkillSerializer(serializers.ModelSerializer):
-    units = UnitSerializer(many=True, read_only=True)
-    Learner = LearnerSerializer(many=False, read_only=True)
+    units = UnitSerializer(source='skillreason.units', many=True, read_only=True)
+    Learner = LearnerSerializer(source='learner', many=False, read_only=True)
     class Meta:
         model = Skill
-        fields = ['name', 'mid_deadline', 'final_deadline', 'units', 'Learner']
+        fields = ['id', 'name', 'units', 'Learner', 'tasks_total', 'tasks_done', 'version']
+        read_only_fields = ['tasks_total', 'tasks_done', 'version']
 
         def validate_mid_deadline(self, value):
             if value and value < timezone.now().date():
@@ -58,6 +60,44 @@ class TaskSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+# Learner tree (LearnerTreeView): skills -> skill/reason pair -> units -> tasks
+class TreeTaskSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Task
+        fields = ['id', 'title', 'done', 'version']
+
+
+class TreeUnitSerializer(serializers.ModelSerializer):
+    tasks = TreeTaskSerializer(source='task_set', many=True, read_only=True)
+
+    class Meta:
+        model = Unit
+        fields = ['id', 'title', 'deadline', 'tasks_total', 'tasks_done', 'version', 'tasks']
+
+
+class TreeReasonSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Reason
+        fields = ['id', 'learning_reason']
+
+
+class TreeSkillReasonSerializer(serializers.ModelSerializer):
+    reason = TreeReasonSerializer(read_only=True)
+    units = TreeUnitSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = SkillReason
+        fields = ['id', 'reason', 'units']
+
+
+class LearnerTreeSerializer(serializers.ModelSerializer):
+    skill_reason = TreeSkillReasonSerializer(source='skillreason', read_only=True)
+
+    class Meta:
+        model = Skill
+        fields = ['id', 'name', 'tasks_total', 'tasks_done', 'version', 'skill_reason']
+
+
 class RegisterSerializer(serializers.Serializer):
     username = serializers.CharField(required=True)
     email = serializers.EmailField(required=True)
@@ -0,0 +1,95 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.cache import bump_learner_version_on_commit
+from core.events import change_event, publish_on_commit
+from .models import Learner, Skill, SkillReason, Unit, Task, adjust_progress
+
+
+# How each model reaches the skill whose learner owns it
+_SKILL_PATHS = {
+    SkillReason: ('skill',),
+    Unit: ('skill_reason_pair', 'skill'),
+    Task: ('unit', 'skill_reason_pair', 'skill'),
+}
+
+
+def _loaded_skill(instance):
+    """The skill `instance` belongs to if its relations up to it are already loaded, else `None`."""
+    for name in _SKILL_PATHS[type(instance)]:
+        if not type(instance)._meta.get_field(name).is_cached(instance):
+            return None
+        instance = getattr(instance, name)
+    return instance
+
+
+def _owner_ids(instance):
+    """Ids of the users whose data `instance` is part of."""
+    if isinstance(instance, User):
+        return [instance.pk]
+    if isinstance(instance, Learner):
+        return [instance.user_id]
+    if isinstance(instance, Skill):
+        return [instance.learner_id]
+
+    # The views load the parents they check (e.g. a task's unit, pair and skill) along
+    # with the instance, and assigning another FK id drops the cached parent
+    skill = _loaded_skill(instance)
+    if skill is not None:
+        return [skill.learner_id]
+
+    # Resolve through the FK ids on the instance, which survive a delete
+    if isinstance(instance, SkillReason):
+        owners = Skill.objects.filter(pk=instance.skill_id)
+    elif isinstance(instance, Unit):
+        owners = Skill.objects.filter(skillreason__pk=instance.skill_reason_pair_id)
+    else:
+        owners = Skill.objects.filter(skillreason__units__pk=instance.unit_id)
+    return list(owners.values_list('learner_id', flat=True))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Learner)
+@receiver(post_save, sender=Skill)
+@receiver(post_save, sender=SkillReason)
+@receiver(post_save, sender=Unit)
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Learner)
+@receiver(post_delete, sender=Skill)
+@receiver(post_delete, sender=SkillReason)
+@receiver(post_delete, sender=Unit)
+@receiver(post_delete, sender=Task)
+def learner_data_changed(sender, instance, **kwargs):
+    """
+    Bump the owner's version so cached responses of their data are dropped, and
+    push a change event for skills, units and tasks to their subscribed clients.
+    """
+    if kwargs.get('raw'):
+        return  # loaddata
+    update_fields = kwargs.get('update_fields')
+    if sender is User and update_fields is not None and set(update_fields) <= {'last_login'}:
+        return  # Logins change nothing the API serves
+    events = []
+    if sender in (Skill, Unit, Task):
+        if 'created' not in kwargs or getattr(instance, 'deleted_at', None) is not None:
+            action, fields = 'deleted', None
+        elif kwargs['created']:
+            action, fields = 'created', None
+        else:
+            action, fields = 'updated', kwargs.get('update_fields')
+        events.append(change_event(sender, instance.pk, action, fields))
+    for user_id in _owner_ids(instance):
+        bump_learner_version_on_commit(user_id)
+        publish_on_commit(user_id, events)
+
+
+@receiver(post_delete, sender=Task)
+def update_progress_on_delete(sender, instance, **kwargs):
+    """
+    Take a deleted task out of its unit's and skill's counters.
+
+    Deletes (including `QuerySet.delete()`) send this from inside their transaction,
+    so the counters change atomically with the delete.
+    """
+    adjust_progress(instance.unit_id, total=-1, done=-int(instance.done))
@@ -1,3 +1,817 @@
-from django.test import TestCase
+import gzip
+import json
+from contextlib import nullcontext
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.conf import settings
+from django.db import connection, connections, router
+from django.db.models import F, QuerySet
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import BrowsableAPIRenderer
+
+from core.authentication import get_token_ttl
+from core.cache import bump_learner_version, get_learner_version
+from core.deletion import deleter
+from core.events import get_broker
+from core.db_routers import read_from
+from core.fieldsets import serializer_for_request
+from core.renderers import FastJSONRenderer
+from core.view_plans import ViewPlan, ViewPlanMixin
+from . import urls as api_urls
+from .benchmarks import SCENARIOS
+from .bulk_io import PlanImporter, export_records
+from .forms import SkillForm
+from .models import Skill, SkillReason, Task, Unit
+from .seeding import seed_learners
+from .serializers import SkillSerializer
+from .views import AsyncSkillDetailView, CohortProvisionView, SkillDetailView
+
+
+PASSWORD = 'benchmark'
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class APITestCase(TestCase):
+    """Two seeded learners; `self.user` owns `self.task`, `self.unit` and `self.skill`."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, cls.other = seed_learners(2, skills=2, units=2, tasks=3, password=PASSWORD, prefix='test')
+        cls.task = Task.objects.filter(unit__skill_reason_pair__skill__learner=cls.user).select_related(
+            'unit__skill_reason_pair__skill'
+        ).first()
+        cls.unit = cls.task.unit
+        cls.skill = cls.unit.skill_reason_pair.skill
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def user_tasks(self):
+        return Task.objects.filter(unit__skill_reason_pair__skill__learner=self.user)
+
+    def url(self, name, **kwargs):
+        values = {'Skill_id': self.skill.pk, 'unit_id': self.unit.pk, 'task_id': self.task.pk, **kwargs}
+        pattern = next(p for p in api_urls.urlpatterns if p.name == name)
+        return reverse(name, kwargs={key: values[key] for key in pattern.pattern.converters})
+
+
+class QueryBudgetTests(APITestCase):
+    """
+    Every route runs the queries budgeted in `api.benchmarks.SCENARIOS`, as under
+    `manage.py benchmark_api`. Budgets are exact here: lower one when a route gets cheaper.
+    """
+
+    def test_every_route_has_a_scenario(self):
+        names = {p.name for p in api_urls.urlpatterns if isinstance(p, URLPattern) and p.name}
+        self.assertEqual(names - set(SCENARIOS), set())
+
+    def test_routes_within_budget(self):
+        substitutions = {'username': self.user.username, 'password': PASSWORD}
+        for name, scenario in SCENARIOS.items():
+            if scenario is None:
+                continue
+            with self.subTest(route=name):
+                self.client.force_login(self.user)
+                bump_learner_version(self.user.pk)
+                data = {key: value.format(**substitutions) for key, value in (scenario.data or {}).items()}
+                with self.assertNumQueries(scenario.max_queries):
+                    response = getattr(self.client, scenario.method)(self.url(name), data or None)
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                self.assertLess(response.status_code, 500)
+
+
+class DetailOwnershipTests(APITestCase):
+
+    def test_owner_reads_their_objects(self):
+        for name in ('Skill-details', 'unit-detail', 'task-details'):
+            with self.subTest(route=name):
+                self.assertEqual(self.client.get(self.url(name)).status_code, 200)
+
+    def test_other_learners_get_404(self):
+        self.client.force_login(self.other)
+        for name in ('Skill-details', 'unit-detail', 'task-details'):
+            with self.subTest(route=name):
+                self.assertEqual(self.client.get(self.url(name)).status_code, 404)
+
+    def test_object_under_wrong_parent_is_404(self):
+        other_unit = Unit.objects.filter(skill_reason_pair__skill__learner=self.user).exclude(pk=self.unit.pk).first()
+        self.assertEqual(self.client.get(self.url('task-details', unit_id=other_unit.pk)).status_code, 404)
+
+
+class ViewPlanTests(APITestCase):
+    """Each view's `ViewPlan` narrows its model to the URL's rows of the owner in one query."""
+
+    def planned_routes(self):
+        for pattern in api_urls.urlpatterns:
+            view_class = getattr(pattern.callback, 'view_class', None)
+            if view_class is not None and issubclass(view_class, ViewPlanMixin):
+                values = {'Skill_id': self.skill.pk, 'unit_id': self.unit.pk, 'task_id': self.task.pk}
+                yield pattern.name, view_class, {key: values[key] for key in pattern.pattern.converters}
+
+    def test_plans_are_compiled_once_without_queries(self):
+        for name, view_class, kwargs in self.planned_routes():
+            with self.subTest(route=name), self.assertNumQueries(0):
+                ViewPlan(view_class).fill_parent_filters(kwargs, self.user)
+                self.assertIs(view_class.get_view_plan(), view_class.get_view_plan())
+
+    def test_filters_select_the_owners_rows_in_one_query(self):
+        for name, view_class, kwargs in self.planned_routes():
+            filters = view_class.get_view_plan().fill_parent_filters(kwargs, self.user)
+            with self.subTest(route=name), self.assertNumQueries(1):
+                rows = list(view_class.model.objects.filter(**filters))
+            self.assertTrue(rows)
+            others = view_class.get_view_plan().fill_parent_filters(kwargs, self.other)
+            self.assertFalse(view_class.model.objects.filter(**others, pk__in=[row.pk for row in rows]).exists())
+
+
+class PaginationTests(APITestCase):
+
+    def test_cursor_walks_every_row_once(self):
+        Task.objects.bulk_create([Task(unit=self.unit, title=f'Extra {n}') for n in range(5)])
+        expected = list(Task.objects.filter(unit=self.unit).order_by('id').values_list('id', flat=True))
+        seen, url = [], f"{self.url('tasks')}?limit=2"
+        while url:
+            page = self.client.get(url).json()
+            self.assertLessEqual(len(page['results']), 2)
+            seen += [task['id'] for task in page['results']]
+            url = page['next']
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor_is_404(self):
+        self.assertEqual(self.client.get(f"{self.url('tasks')}?cursor=bogus").status_code, 404)
+
+
+class SparseFieldsetTests(APITestCase):
+    """Session and user lookups are 2 queries; the skills 1 more, and their units 1 more."""
+
+    def first_skill(self, name, query):
+        body = self.client.get(self.url(name) + query).json()
+        return body['results'][0] if 'results' in body else body
+
+    def test_fields_render_only_those_fields(self):
+        for name in ('Skills', 'Skill-details', 'async-Skills'):
+            with self.subTest(route=name):
+                self.assertEqual(set(self.first_skill(name, '?fields=id,name')), {'id', 'name'})
+
+    def test_expand_adds_nested_serializers_back(self):
+        for name in ('Skills', 'Skill-details', 'async-Skills'):
+            with self.subTest(route=name):
+                skill = self.first_skill(name, '?fields=name&expand=units')
+                self.assertEqual(set(skill), {'name', 'units'})
+                self.assertTrue(skill['units'])
+                self.assertNotIn('Learner', self.first_skill(name, '?expand=units'))
+
+    def test_dropped_relations_are_not_queried(self):
+        for query, queries in (('', 4), ('?fields=id,name', 3), ('?fields=name&expand=units', 4)):
+            with self.subTest(query=query), self.assertNumQueries(queries):
+                self.client.get(self.url('Skills') + query)
+
+    def test_unknown_names_are_400(self):
+        for name in ('Skills', 'Skill-details', 'async-Skills'):
+            for query, param in (('?fields=id,bogus', 'fields'), ('?expand=bogus', 'expand')):
+                with self.subTest(route=name, query=query), self.assertNumQueries(2):
+                    response = self.client.get(self.url(name) + query)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {param: ["Unknown field: bogus."]})
+
+    def test_equivalent_requests_share_one_class(self):
+        serializer_class = SkillSerializer
+        narrowed = serializer_for_request(serializer_class, {'fields': 'name,id'})
+        self.assertIs(serializer_for_request(serializer_class, {'fields': 'id,name', 'expand': 'id'}), narrowed)
+        self.assertIs(serializer_for_request(serializer_class, {'fields': ','.join(SkillSerializer.Meta.fields)}),
+                      serializer_class)
+
+
+class TokenLoginTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.logout()
+
+    def login(self, **headers):
+        return self.client.post(self.url('token'), {'username': self.user.username, 'password': PASSWORD}, headers=headers)
+
+    def test_expired_token_in_the_header_can_log_in_again(self):
+        key = self.login().json()['token']
+        Token.objects.filter(key=key).update(created=F('created') - get_token_ttl())
+        response = self.login(authorization=f'Token {key}')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.json()['token'], key)
+        self.assertFalse(Token.objects.filter(key=key).exists())
+
+    def test_delete_revokes_the_token(self):
+        key = self.login().json()['token']
+        self.assertEqual(self.client.delete(self.url('token')).status_code, 401)
+        self.assertEqual(self.client.delete(self.url('token'), headers={'authorization': f'Token {key}'}).status_code, 204)
+        self.assertFalse(Token.objects.filter(key=key).exists())
+
+
+class BulkCreateTests(APITestCase):
+
+    def post(self, name, items):
+        return self.client.post(self.url(name), items, content_type='application/json')
+
+    def test_creates_every_item(self):
+        response = self.post('tasks', [{'title': 'Read'}, {'title': 'Write'}])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([task['title'] for task in response.json()], ['Read', 'Write'])
+        self.assertEqual(Task.objects.filter(unit=self.unit, title__in=['Read', 'Write']).count(), 2)
+
+    def test_one_invalid_item_creates_nothing(self):
+        response = self.post('units', [
+            {'title': 'Later', 'deadline': '2999-01-01'},
+            {'title': 'Late', 'deadline': '2000-01-01'},
+            {'title': 'Later', 'deadline': '2999-01-01'},
+        ])
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()
+        self.assertEqual(errors[0], {})
+        self.assertIn('deadline', errors[1])
+        self.assertIn('title', errors[2])
+        self.assertFalse(Unit.objects.filter(title__in=['Later', 'Late']).exists())
+
+    def test_existing_title_is_rejected(self):
+        response = self.post('tasks', [{'title': self.task.title}])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('title', response.json()[0])
+
+    def test_under_another_learners_unit_is_404(self):
+        self.client.force_login(self.other)
+        self.assertEqual(self.post('tasks', [{'title': 'Read'}]).status_code, 404)
+
+    def test_lists_are_refused_where_not_enabled(self):
+        self.assertEqual(self.post('Skills', [{'name': 'Chess'}]).status_code, 400)
+
+
+class UnitCreationTests(APITestCase):
+    """Units of a skill without a skill/reason pair yet: the pair is only created with a unit."""
+
+    def setUp(self):
+        super().setUp()
+        self.bare = Skill.objects.create(learner=self.user, name='Chess')
+
+    def post(self, name, data):
+        return self.client.post(self.url(name, Skill_id=self.bare.pk), data, content_type='application/json')
+
+    def test_invalid_unit_writes_nothing(self):
+        pairs = SkillReason.objects.count()
+        for name, data in (
+            ('units', {'title': 'Openings', 'deadline': 'bad'}),
+            ('units', [{'title': 'Openings', 'deadline': 'bad'}]),
+            ('async-units', {'title': 'Openings', 'deadline': 'bad'}),
+        ):
+            with self.subTest(route=name, data=data):
+                self.assertEqual(self.post(name, data).status_code, 400)
+                self.assertEqual(SkillReason.objects.count(), pairs)
+
+    def test_first_unit_creates_the_pair(self):
+        for name, data in (
+            ('units', {'title': 'Openings', 'deadline': '2999-01-01'}),
+            ('units', [{'title': 'Endgames', 'deadline': '2999-01-01'}, {'title': 'Tactics', 'deadline': '2999-01-01'}]),
+            ('async-units', {'title': 'Gambits', 'deadline': '2999-01-01'}),
+        ):
+            with self.subTest(route=name, data=data):
+                self.assertEqual(self.post(name, data).status_code, 201)
+        pair = SkillReason.objects.get(skill=self.bare)
+        self.assertEqual(
+            sorted(pair.units.values_list('title', flat=True)), ['Endgames', 'Gambits', 'Openings', 'Tactics']
+        )
+
+    def test_repeated_title_in_a_batch_is_rejected(self):
+        response = self.post('units', [{'title': 'Openings', 'deadline': '2999-01-01'}] * 2)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('title', response.json()[1])
+        self.assertFalse(SkillReason.objects.filter(skill=self.bare).exists())
+
+
+class BulkUpdateTests(APITestCase):
+
+    def patch(self, items):
+        return self.client.patch(self.url('tasks'), items, content_type='application/json')
+
+    def test_updates_tasks_and_counters(self):
+        tasks = list(Task.objects.filter(unit=self.unit))
+        Task.objects.filter(unit=self.unit).update(done=False)
+        Unit.objects.filter(pk=self.unit.pk).update(tasks_done=0)
+        self.skill.refresh_from_db()
+
+        response = self.patch([{'id': task.pk, 'done': True} for task in tasks])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'updated': sorted(task.pk for task in tasks), 'not_found': []})
+        self.assertFalse(Task.objects.filter(unit=self.unit, done=False).exists())
+        self.unit.refresh_from_db()
+        self.assertEqual(self.unit.tasks_done, len(tasks))
+        done = self.skill.tasks_done
+        self.skill.refresh_from_db()
+        self.assertEqual(self.skill.tasks_done, done + len(tasks))
+
+    def test_only_the_changed_task_rows_are_locked(self):
+        with mock.patch.object(QuerySet, 'select_for_update', autospec=True,
+                               side_effect=QuerySet.select_for_update) as select_for_update:
+            self.patch([{'id': self.task.pk, 'done': not self.task.done}])
+        (queryset, *_), kwargs = select_for_update.call_args
+        self.assertEqual(kwargs, {'of': ('self',)})
+        self.assertEqual(list(queryset.values_list('pk', flat=True)), [self.task.pk])
+
+    def test_unchanged_rows_are_not_written(self):
+        response = self.patch([{'id': self.task.pk, 'done': self.task.done}])
+        self.assertEqual(response.json(), {'updated': [], 'not_found': []})
+
+    def test_other_learners_tasks_are_not_found(self):
+        foreign = Task.objects.filter(unit__skill_reason_pair__skill__learner=self.other).first()
+        response = self.patch([{'id': foreign.pk, 'done': not foreign.done}])
+        self.assertEqual(response.json(), {'updated': [], 'not_found': [foreign.pk]})
+        self.assertEqual(Task.objects.get(pk=foreign.pk).done, foreign.done)
+
+    def test_only_listed_fields_can_change(self):
+        response = self.patch([{'id': self.task.pk, 'title': 'Renamed'}])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('title', response.json()[0])
+
+
+class ResponseCacheTests(APITestCase):
+
+    def test_repeated_list_is_served_from_the_cache(self):
+        self.client.get(self.url('tasks'))
+        with self.assertNumQueries(2):  # session and user
+            self.assertEqual(self.client.get(self.url('tasks')).status_code, 200)
+
+    def test_writes_invalidate_the_learners_responses(self):
+        self.client.get(self.url('tasks'))
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                self.url('tasks'), [{'id': self.task.pk, 'done': not self.task.done}], content_type='application/json'
+            )
+        self.assertEqual(response.json()['updated'], [self.task.pk])
+        tasks = {task['id']: task for task in self.client.get(self.url('tasks')).json()['results']}
+        self.assertEqual(tasks[self.task.pk]['done'], not self.task.done)
+
+    def test_logins_keep_the_learners_responses(self):
+        version = get_learner_version(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.login(username=self.user.username, password=PASSWORD)
+        self.assertEqual(get_learner_version(self.user.pk), version)
+
+    def test_owner_taken_from_loaded_parents(self):
+        task = Task.objects.select_related('unit__skill_reason_pair__skill').get(pk=self.task.pk)
+        version = get_learner_version(self.user.pk)
+        task.title = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            task.save(update_fields=['title'])
+        self.assertNotEqual(get_learner_version(self.user.pk), version)
+        # Just the UPDATE; the savepoint around it is only there because tests run in a transaction
+        statements = [query['sql'] for query in queries if not query['sql'].startswith(('SAVEPOINT', 'RELEASE'))]
+        self.assertEqual(len(statements), 1, statements)
+
+
+class ConditionalGetTests(APITestCase):
+
+    def test_matching_etag_is_304_without_queries(self):
+        for name in ('Skills', 'Skill-details', 'units', 'unit-detail', 'tasks', 'task-details'):
+            with self.subTest(route=name):
+                response = self.client.get(self.url(name))
+                self.assertIn('Accept', response['Vary'])
+                # Session and user lookups only
+                with self.assertNumQueries(2):
+                    cached = self.client.get(self.url(name), headers={'if-none-match': response['ETag']})
+                self.assertEqual(cached.status_code, 304)
+                self.assertEqual(cached['ETag'], response['ETag'])
+                self.assertIn('Accept', cached['Vary'])
+
+    def test_writes_change_the_etag(self):
+        etag = self.client.get(self.url('Skill-details'))['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(self.url('task-details'), {'done': not self.task.done}, content_type='application/json')
+        response = self.client.get(self.url('Skill-details'), headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_query_string_changes_the_etag(self):
+        etag = self.client.get(self.url('Skills'))['ETag']
+        sparse = self.client.get(f"{self.url('Skills')}?fields=id,name", headers={'if-none-match': etag})
+        self.assertEqual(sparse.status_code, 200)
+        self.assertNotEqual(sparse['ETag'], etag)
+        self.assertNotEqual(self.client.get(f"{self.url('Skills')}?fields=id")['ETag'], sparse['ETag'])
+
+    def test_media_type_changes_the_etag(self):
+        renderers = [FastJSONRenderer, BrowsableAPIRenderer]
+        with mock.patch.object(SkillDetailView, 'renderer_classes', renderers):
+            etag = self.client.get(self.url('Skill-details'), headers={'accept': 'application/json'})['ETag']
+            response = self.client.get(
+                self.url('Skill-details'), headers={'accept': 'text/html', 'if-none-match': etag}
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+@skipUnless('replica' in settings.DATABASES, "needs a 'replica' database alias (edtech.test_settings)")
+@override_settings(
+    API_READ_REPLICA='replica', PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    `replica` mirrors `default` here: the same database over another connection. The
+    rows are committed (no `TestCase` transaction), so that connection sees them too.
+    """
+    # Checked by the runner even when skipped, so only named when configured
+    databases = {'default', 'replica'} & set(settings.DATABASES)
+
+    def setUp(self):
+        cache.clear()
+        self.user, self.other = seed_learners(2, skills=1, units=1, tasks=2, password=PASSWORD, prefix='replica')
+        self.task = Task.objects.filter(unit__skill_reason_pair__skill__learner=self.user).select_related(
+            'unit__skill_reason_pair__skill'
+        ).first()
+        self.unit = self.task.unit
+        self.skill = self.unit.skill_reason_pair.skill
+        self.client.force_login(self.user)
+
+    url = APITestCase.url
+
+    def queries_by_alias(self, request):
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            response = request()
+            if response.streaming:
+                b''.join(response.streaming_content)
+        return response, len(primary), len(replica)
+
+    def test_reads_go_to_the_replica(self):
+        for name in ('Skills', 'unit-detail', 'tasks', 'async-tasks', 'learner-tree'):
+            with self.subTest(route=name):
+                response, primary, replica = self.queries_by_alias(lambda: self.client.get(self.url(name)))
+                self.assertEqual(response.status_code, 200)
+                # Authentication reads the session and user before the view picks the alias
+                self.assertEqual(primary, 2)
+                self.assertGreater(replica, 0)
+
+    def test_writes_and_locking_reads_stay_on_the_primary(self):
+        with read_from('replica'):
+            self.assertEqual(Task.objects.all().db, 'replica')
+            self.assertEqual(Task.objects.select_for_update().db, 'default')
+            self.assertEqual(router.db_for_write(Task), 'default')
+        response, primary, replica = self.queries_by_alias(lambda: self.client.patch(
+            self.url('tasks'), [{'id': self.task.pk, 'done': not self.task.done}], content_type='application/json'
+        ))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(replica, 0)
+
+    def test_reads_after_a_write_in_the_request_stay_on_the_primary(self):
+        with read_from('replica'):
+            Task.objects.filter(pk=self.task.pk).update(title='Renamed')
+            self.assertEqual(Task.objects.all().db, 'default')
+        self.assertEqual(Task.objects.all().db, 'default')
+
+    def test_batched_deletes_run_on_the_primary(self):
+        with read_from('replica'), CaptureQueriesContext(connections['replica']) as replica:
+            self.skill.purge()
+        self.assertEqual(len(replica), 0)
+        self.assertFalse(Skill.all_objects.filter(pk=self.skill.pk).exists())
+
+    def test_writer_reads_from_the_primary_afterwards(self):
+        self.client.patch(self.url('task-details'), {'done': not self.task.done}, content_type='application/json')
+        _, primary, replica = self.queries_by_alias(lambda: self.client.get(self.url('tasks')))
+        self.assertEqual(replica, 0)
+        self.client.force_login(self.other)
+        _, primary, replica = self.queries_by_alias(lambda: self.client.get(self.url('Skills')))
+        self.assertGreater(replica, 0)
+
+
+class UniquenessTests(APITestCase):
+
+    def test_duplicate_task_caught_by_the_database_is_400(self):
+        # Unit/title is left to the unique constraint: the form runs no pre-check query
+        response = self.client.post(self.url('tasks'), {'title': self.task.title})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('title', response.json())
+        self.assertEqual(Task.objects.filter(unit=self.unit, title=self.task.title).count(), 1)
+
+    def test_duplicate_skill_name_is_400(self):
+        response = self.client.post(self.url('Skills'), {'name': self.skill.name})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('name', response.json())
+
+    def test_concurrent_duplicate_skill_name_is_400(self):
+        # Skill names are unique only among live skills (a conditional constraint), so
+        # the form still queries; a duplicate inserted after that query is caught on save
+        form = SkillForm({'name': 'Chess'}, user=self.user)
+        self.assertTrue(form.is_valid())
+        Skill.objects.create(learner=self.user, name='Chess')
+        with self.assertRaises(ValidationError):
+            form.save()
+        self.assertIn('name', form.errors)
+
+    def test_duplicate_skill_name_past_the_check_is_400(self):
+        with mock.patch.object(SkillForm, '_check_unique'):
+            response = self.client.post(self.url('Skills'), {'name': self.skill.name})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('name', response.json())
+        self.assertEqual(Skill.objects.filter(learner=self.user, name=self.skill.name).count(), 1)
+
+    def test_name_of_a_deleted_skill_can_be_reused(self):
+        self.skill.mark_deleted()
+        response = self.client.post(self.url('Skills'), {'name': self.skill.name})
+        self.assertEqual(response.status_code, 201)
+
+
+class ProgressCounterTests(APITestCase):
+
+    def assertCounters(self, total, done):
+        self.unit.refresh_from_db()
+        self.skill.refresh_from_db()
+        units = Unit.objects.filter(skill_reason_pair__skill=self.skill)
+        self.assertEqual((self.unit.tasks_total, self.unit.tasks_done), (total, done))
+        self.assertEqual(
+            (self.skill.tasks_total, self.skill.tasks_done),
+            (sum(unit.tasks_total for unit in units), sum(unit.tasks_done for unit in units)),
+        )
+
+    def test_counters_follow_task_writes(self):
+        tasks = Task.objects.filter(unit=self.unit)
+        total, done = tasks.count(), tasks.filter(done=True).count()
+        self.assertCounters(total, done)
+
+        response = self.client.post(self.url('tasks'), {'title': 'New'})
+        self.assertEqual(response.status_code, 201)
+        self.assertCounters(total + 1, done)
+
+        task_id = response.json()['id']
+        response = self.client.patch(
+            self.url('task-details', task_id=task_id), {'done': True}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertCounters(total + 1, done + 1)
+
+        self.assertEqual(self.client.delete(self.url('task-details', task_id=task_id)).status_code, 204)
+        self.assertCounters(total, done)
+
+    def test_rebuild_matches_maintained_counters(self):
+        Unit.objects.filter(pk=self.unit.pk).update(tasks_total=0, tasks_done=0)
+        call_command('rebuild_progress_counters', stdout=StringIO())
+        tasks = Task.objects.filter(unit=self.unit)
+        self.assertCounters(tasks.count(), tasks.filter(done=True).count())
+
+
+class StreamingTests(APITestCase):
+
+    def tree_ids(self, body):
+        return sorted(skill['id'] for skill in json.loads(body)['skills'])
+
+    def test_tree_is_streamed(self):
+        response = self.client.get(self.url('learner-tree'))
+        self.assertFalse(response.is_async)
+        body = b''.join(response.streaming_content)
+        skill_ids = Skill.objects.filter(learner=self.user).values_list('id', flat=True)
+        self.assertEqual(self.tree_ids(body), sorted(skill_ids))
+
+    async def test_tree_is_streamed_without_buffering_over_asgi(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(self.url('learner-tree'))
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        expected = [skill_id async for skill_id in Skill.objects.filter(learner=self.user).values_list('id', flat=True)]
+        self.assertEqual(self.tree_ids(body), sorted(expected))
+
+    def test_export_is_gzipped_when_accepted(self):
+        plain = b''.join(self.client.get(self.url('learner-export')).streaming_content)
+        response = self.client.get(self.url('learner-export'), headers={'accept-encoding': 'gzip'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), plain)
+        self.assertEqual(len(plain.splitlines()), self.user_tasks().count())
+
+    async def test_export_over_asgi(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(self.url('learner-export'), headers={'accept-encoding': 'gzip'})
+        self.assertTrue(response.is_async)
+        body = gzip.decompress(b''.join([chunk async for chunk in response.streaming_content]))
+        usernames = {json.loads(line)['username'] for line in body.splitlines()}
+        self.assertEqual(usernames, {self.user.username})
+
+
+class PlanImportTests(APITestCase):
+
+    def test_export_imports_into_another_learner(self):
+        newcomer = User.objects.create_user('newcomer')
+        records = [
+            (line, {**record, 'username': newcomer.username})
+            for line, record in enumerate(export_records([self.user.username]), 1)
+        ]
+        created = PlanImporter(batch_size=2).run(records)
+        source = Skill.objects.filter(learner=self.user)
+        self.assertEqual(created['skills'], source.count())
+        self.assertEqual(created['tasks'], self.user_tasks().count())
+        self.assertEqual(
+            sorted(Skill.objects.filter(learner=newcomer).values_list('name', 'tasks_total', 'tasks_done')),
+            sorted(source.values_list('name', 'tasks_total', 'tasks_done')),
+        )
+        self.assertEqual(PlanImporter().run(records), {'skills': 0, 'units': 0, 'tasks': 0})
+
+
+class ConcurrencyTests(APITestCase):
+
+    def patch(self, data):
+        return self.client.patch(self.url('task-details'), data, content_type='application/json')
+
+    def test_update_at_the_current_version(self):
+        response = self.patch({'title': 'Renamed', 'version': self.task.version})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['version'], self.task.version + 1)
+
+    def test_update_at_a_stale_version_is_409(self):
+        self.assertEqual(self.patch({'title': 'First'}).status_code, 200)
+        response = self.patch({'title': 'Second', 'version': self.task.version})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['version'], self.task.version + 1)
+        self.assertEqual(Task.objects.get(pk=self.task.pk).title, 'First')
+
+    def test_unchanged_update_at_a_stale_version_is_409(self):
+        self.assertEqual(self.patch({'title': 'First'}).status_code, 200)
+        for name in ('task-details', 'async-task-details'):
+            with self.subTest(route=name):
+                response = self.client.patch(
+                    self.url(name), {'title': 'First', 'version': self.task.version}, content_type='application/json'
+                )
+                self.assertEqual(response.status_code, 409)
+                self.assertEqual(response.json()['version'], self.task.version + 1)
+
+    def test_unchanged_update_at_the_current_version_is_200(self):
+        response = self.patch({'title': self.task.title, 'version': self.task.version})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['version'], self.task.version)
+
+    def changed_after_read(self, view_class):
+        """Patch `view_class.get_object` to return the object as it was before a concurrent write."""
+        get_object = view_class.get_object
+
+        def stale_get_object(view):
+            instance = get_object(view)
+            type(instance).objects.filter(pk=instance.pk).update(version=F('version') + 1)
+            return instance
+
+        async def astale_get_object(view):
+            instance = await get_object(view)
+            await type(instance).objects.filter(pk=instance.pk).aupdate(version=F('version') + 1)
+            return instance
+
+        return mock.patch.object(
+            view_class, 'get_object', astale_get_object if iscoroutinefunction(get_object) else stale_get_object
+        )
+
+    def test_delete_racing_an_update_is_409(self):
+        with self.changed_after_read(SkillDetailView):
+            response = self.client.delete(self.url('Skill-details'))
+        self.assertEqual(response.status_code, 409)
+        self.assertTrue(Skill.objects.filter(pk=self.skill.pk).exists())
+
+    def test_async_delete_racing_an_update_is_409(self):
+        with self.changed_after_read(AsyncSkillDetailView):
+            response = self.client.delete(self.url('async-Skill-details'))
+        self.assertEqual(response.status_code, 409)
+        self.assertTrue(Skill.objects.filter(pk=self.skill.pk).exists())
+
+    def test_import_lists_every_required_column(self):
+        # COPY (PostgreSQL) fills unlisted columns with database defaults, which these models don't have
+        copied = {}
+
+        def copy(model, columns, rows):
+            copied[model] = columns
+            model.objects.bulk_create([model(**dict(zip(columns, row))) for row in rows])
+
+        records = enumerate(export_records([self.user.username]), 1)
+        newcomer = User.objects.create_user('newcomer')
+        importer = PlanImporter()
+        importer.use_copy = True
+        with mock.patch('api.bulk_io._copy', copy):
+            importer.run((line, {**record, 'username': newcomer.username}) for line, record in records)
+        self.assertEqual(set(copied), {Skill, Unit, Task})
+        for model, columns in copied.items():
+            required = {
+                field.attname for field in model._meta.concrete_fields
+                if not field.null and not field.primary_key and not field.has_db_default()
+            }
+            self.assertEqual(required - set(columns), set(), model.__name__)
+
+
+class ChangeEventTests(APITestCase):
+
+    def save_form(self, data, queries=None):
+        """Validate and save a `SkillForm` updating `self.skill`; returns the published events."""
+        form = SkillForm(data, user=self.user, instance=self.skill)
+        self.assertTrue(form.is_valid(), form.errors)
+        with mock.patch.object(get_broker(), 'publish') as publish, self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(queries) if queries is not None else nullcontext():
+                form.save()
+        return [call.args[1] for call in publish.call_args_list]
+
+    def test_form_update_names_the_changed_fields(self):
+        events = self.save_form({'name': 'Renamed'})
+        self.assertEqual(events, [{'model': 'skill', 'id': self.skill.pk, 'action': 'updated', 'fields': ['name']}])
+        self.assertEqual(Skill.objects.get(pk=self.skill.pk).name, 'Renamed')
+
+    def test_unchanged_form_writes_nothing(self):
+        self.assertEqual(self.save_form({'name': self.skill.name}, queries=0), [])
+
+
+class SoftDeleteTests(APITestCase):
+
+    def test_deleted_skill_and_its_tree_are_hidden(self):
+        self.skill.mark_deleted()
+        for name in ('Skill-details', 'unit-detail', 'task-details', 'async-Skill-details', 'async-unit-detail'):
+            with self.subTest(route=name):
+                self.assertEqual(self.client.get(self.url(name)).status_code, 404)
+        for name in ('units', 'tasks', 'async-units', 'async-tasks'):
+            with self.subTest(route=name):
+                response = self.client.get(self.url(name))
+                self.assertEqual((response.status_code, response.json()['results']), (200, []))
+        skills = self.client.get(self.url('Skills')).json()['results']
+        self.assertNotIn(self.skill.pk, [skill['id'] for skill in skills])
+
+    def test_bulk_patch_under_a_deleted_skill_finds_nothing(self):
+        self.skill.mark_deleted()
+        response = self.client.patch(
+            self.url('tasks'), [{'id': self.task.pk, 'done': not self.task.done}], content_type='application/json'
+        )
+        self.assertEqual(response.json(), {'updated': [], 'not_found': [self.task.pk]})
+
+    def test_no_creates_under_a_deleted_skill(self):
+        self.skill.mark_deleted()
+        self.assertEqual(self.client.post(self.url('tasks'), {'title': 'New'}).status_code, 404)
+
+    def test_delete_hides_at_once_and_purges_on_commit(self):
+        skill = self.skill
+        with mock.patch.object(deleter, '_enqueue') as enqueue, self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.delete(self.url('Skill-details', Skill_id=skill.pk)).status_code, 204)
+        self.assertFalse(Skill.objects.filter(pk=skill.pk).exists())
+        enqueue.assert_called_once_with(Skill, skill.pk)
+        skill.purge()
+        self.assertFalse(Skill.all_objects.filter(pk=skill.pk).exists())
+        self.assertFalse(Unit.objects.filter(skill_reason_pair__skill=skill.pk).exists())
+
+
+class UnitDeleteTests(APITestCase):
+
+    def test_unit_with_tasks_is_409(self):
+        for name in ('unit-detail', 'async-unit-detail'):
+            with self.subTest(route=name):
+                response = self.client.delete(self.url(name))
+                self.assertEqual(response.status_code, 409)
+                self.assertIn('tasks', response.json()['detail'])
+                self.assertTrue(Unit.objects.filter(pk=self.unit.pk).exists())
+
+    def test_unit_without_tasks_is_deleted(self):
+        Task.objects.filter(unit=self.unit).delete()
+        self.assertEqual(self.client.delete(self.url('unit-detail')).status_code, 204)
+        self.assertFalse(Unit.objects.filter(pk=self.unit.pk).exists())
+
+@override_settings(API_PROVISIONING_WORKERS=1)
+class CohortProvisionTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(User.objects.create_user('staff', is_staff=True))
+
+    def cohort(self, size, prefix='cohort'):
+        return [
+            {'username': f'{prefix}-{n}', 'email': f'{prefix}-{n}@example.com', 'password': 'secret',
+             'birth_date': '2000-01-01'}
+            for n in range(size)
+        ]
+
+    def post(self, items):
+        return self.client.post(self.url('learner-provision'), items, content_type='application/json')
+
+    def test_creates_the_cohort(self):
+        response = self.post(self.cohort(3))
+        self.assertEqual(response.status_code, 201)
+        users = User.objects.filter(username__startswith='cohort-')
+        self.assertEqual(sorted(user['username'] for user in response.json()), sorted(u.username for u in users))
+        self.assertTrue(all(user.check_password('secret') and user.learner for user in users))
+
+    def test_one_taken_username_creates_nothing(self):
+        items = self.cohort(2)
+        items[1]['username'] = self.user.username
+        response = self.post(items)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()[0], {})
+        self.assertIn('username', response.json()[1])
+        self.assertFalse(User.objects.filter(username='cohort-0').exists())
+
+    def test_size_is_capped(self):
+        response = self.post(self.cohort(CohortProvisionView.max_size + 1))
+        self.assertEqual(response.status_code, 400)
+
+    def test_staff_only(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.post(self.cohort(1)).status_code, 403)
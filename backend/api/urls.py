@@ -6,11 +6,21 @@ urlpatterns = [
     path('Skills/<int:Skill_id>/', views.SkillDetailView.as_view(), name='Skill-details'),
     path('register/', views.RegisterView.as_view(), name="register"),
     path('login/', views.LoginView.as_view(), name='login'),
+    path('token/', views.TokenLoginView.as_view(), name='token'),
     path('logout/', views.LogoutView.as_view(), name='logout'),
     path('Learner/', views.UserDetailView.as_view(), name='user-detail'),
+    path('learners/bulk/', views.CohortProvisionView.as_view(), name='learner-provision'),
+    path('tree/', views.LearnerTreeView.as_view(), name='learner-tree'),
+    path('export/', views.LearnerExportView.as_view(), name='learner-export'),
     path('Skills/<int:Skill_id>/units/', views.UnitsListView.as_view(), name='units'),
     path('Skills/<int:Skill_id>/units/<int:unit_id>/', views.UnitDetailView.as_view(), name='unit-detail'),
     path('Skills/<int:Skill_id>/units/<int:unit_id>/tasks/', views.TasksListView.as_view(), name='tasks'),
-    path('Skills/<int:Skill_id>/units/<int:unit_id>/tasks/<int:task_id>/', views.TaskDetailView.as_view(), name='task-details')
+    path('Skills/<int:Skill_id>/units/<int:unit_id>/tasks/<int:task_id>/', views.TaskDetailView.as_view(), name='task-details'),
+    path('async/Skills', views.AsyncSkillsListView.as_view(), name='async-Skills'),
+    path('async/Skills/<int:Skill_id>/', views.AsyncSkillDetailView.as_view(), name='async-Skill-details'),
+    path('async/Skills/<int:Skill_id>/units/', views.AsyncUnitsListView.as_view(), name='async-units'),
+    path('async/Skills/<int:Skill_id>/units/<int:unit_id>/', views.AsyncUnitDetailView.as_view(), name='async-unit-detail'),
+    path('async/Skills/<int:Skill_id>/units/<int:unit_id>/tasks/', views.AsyncTasksListView.as_view(), name='async-tasks'),
+    path('async/Skills/<int:Skill_id>/units/<int:unit_id>/tasks/<int:task_id>/', views.AsyncTaskDetailView.as_view(), name='async-task-details'),
 ]
 
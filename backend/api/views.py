@@ -1,12 +1,29 @@
+import re
+from collections import defaultdict
+
 from django.shortcuts import render, redirect
-from django.http import Http404
-from django.shortcuts import get_object_or_404
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
 from django.contrib.auth import login, logout
+from django.core.handlers.asgi import ASGIRequest
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
 from rest_framework.views import APIView
-from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.authtoken.models import Token
+from rest_framework import permissions, status
 from core.base_views import BaseListView, BaseDetailView
-from .models import Skill, Unit, Task
-from .serializers import SkillSerializer, LoginSerializer, RegisterSerializer, LearnerSerializer, UnitSerializer, TaskSerializer
+from core.async_views import AsyncBaseListView, AsyncBaseDetailView
+from core.authentication import CachedTokenAuthentication, is_token_expired, token_expires_at
+from core.db_routers import read_alias_for, stream_reads_from
+from core.renderers import FastJSONRenderer
+from .bulk_io import export_records
+from .models import Skill, Unit, Task, adjust_progress
+from .provisioning import provision_learners
+from .serializers import (
+    SkillSerializer, LoginSerializer, RegisterSerializer, LearnerSerializer, UnitSerializer, TaskSerializer,
+    LearnerTreeSerializer,
+)
 from .forms import SkillForm, UnitForm, TaskForm
 
 # List Views
@@ -14,56 +31,191 @@ class SkillsListView(BaseListView):
     model = Skill
     serializer_class = SkillSerializer
     form_class = SkillForm
+    cache_responses = True
+    conditional_get = True
 
 class UnitsListView(BaseListView):
     model = Unit
     serializer_class = UnitSerializer
     form_class = UnitForm
     parent_models = [('Skill', Skill)]
-
-    def get_queryset(self, request, *args, **kwargs):
-        Skill = get_object_or_404(Skill, id=kwargs.get('Skill_id'), Learner=request.user)
-        return Unit.objects.filter(Skill=Skill)
+    bulk_create_enabled = True
+    cache_responses = True
+    conditional_get = True
 
 class TasksListView(BaseListView):
     model = Task
     serializer_class = TaskSerializer
     form_class = TaskForm
     parent_models = [('Skill', Skill), ('unit', Unit)]
+    bulk_create_enabled = True
+    bulk_update_fields = ('done',)
+    cache_responses = True
+    conditional_get = True
 
-    def get_queryset(self, request, *args, **kwargs):
-            unit_id = kwargs.get('unit_id')
-            Skill_id = kwargs.get('Skill_id')
-            if unit_id is None or Skill_id is None:
-                raise Http404("URL must contain Skill_id and unit_id.")
-
-            unit = get_object_or_404(
-                Unit,
-                id=unit_id,
-                Skill_id=Skill_id,
-                Skill__Learner=request.user
-            )
-            return Task.objects.filter(unit=unit)
+    def perform_bulk_create(self, instances):
+        # bulk_create() bypasses Task.save(), so count the new tasks here
+        instances = super().perform_bulk_create(instances)
+        deltas = defaultdict(lambda: [0, 0])
+        for task in instances:
+            deltas[task.unit_id][0] += 1
+            deltas[task.unit_id][1] += int(task.done)
+        for unit_id, (total, done) in deltas.items():
+            adjust_progress(unit_id, total=total, done=done)
+        return instances
+
+    def perform_bulk_update(self, queryset, updates):
+        # update() bypasses Task.save(): diff `done` across the UPDATE, with the changed task
+        # rows locked. Only those: the ownership joins would lock the unit and skill rows too
+        if 'done' not in updates:
+            return super().perform_bulk_update(queryset, updates)
+        before = dict(queryset.select_for_update(of=('self',)).values_list('pk', 'done'))
+        result = super().perform_bulk_update(queryset, updates)
+        deltas = defaultdict(int)
+        for pk, unit_id, done in queryset.values_list('pk', 'unit_id', 'done'):
+            deltas[unit_id] += int(done) - int(before[pk])
+        for unit_id, done in deltas.items():
+            adjust_progress(unit_id, done=done)
+        return result
 
 # Details Views
 class SkillDetailView(BaseDetailView):
     model = Skill
     serializer_class = SkillSerializer
-
-
-    def get_queryset(self, request, *args, **kwargs):
-        Skill = get_object_or_404(Skill, id=kwargs.get('Skill_id'), Learner=request.user)
-        return Unit.objects.filter(Skill=Skill)
+    lookup_url_kwarg = 'Skill_id'
+    conditional_get = True
+    background_delete = True
 
 class UnitDetailView(BaseDetailView):
     model = Unit
     serializer_class = UnitSerializer
     parent_models = [('Skill', Skill)]
+    conditional_get = True
 
 class TaskDetailView(BaseDetailView):
     model = Task
     serializer_class = TaskSerializer
     parent_models = [('Skill', Skill), ('unit', Unit)]
+    conditional_get = True
+
+
+# Async Views (ASGI-native counterparts of the views above, mounted under async/)
+class AsyncSkillsListView(AsyncBaseListView):
+    model = Skill
+    serializer_class = SkillSerializer
+    form_class = SkillForm
+
+class AsyncUnitsListView(AsyncBaseListView):
+    model = Unit
+    serializer_class = UnitSerializer
+    form_class = UnitForm
+    parent_models = [('Skill', Skill)]
+
+class AsyncTasksListView(AsyncBaseListView):
+    model = Task
+    serializer_class = TaskSerializer
+    form_class = TaskForm
+    parent_models = [('Skill', Skill), ('unit', Unit)]
+
+class AsyncSkillDetailView(AsyncBaseDetailView):
+    model = Skill
+    serializer_class = SkillSerializer
+    lookup_url_kwarg = 'Skill_id'
+    background_delete = True
+
+class AsyncUnitDetailView(AsyncBaseDetailView):
+    model = Unit
+    serializer_class = UnitSerializer
+    parent_models = [('Skill', Skill)]
+
+class AsyncTaskDetailView(AsyncBaseDetailView):
+    model = Task
+    serializer_class = TaskSerializer
+    parent_models = [('Skill', Skill), ('unit', Unit)]
+
+
+class LearnerTreeView(APIView):
+    """
+    The requesting learner's whole plan in one response.
+
+    Returns `{"skills": [...]}`, each skill with its skill/reason pair, the pair's
+    units and the units' tasks (`LearnerTreeSerializer`), instead of one list call
+    per skill and per unit.
+
+    Every `chunk_size` skills cost three queries, whatever the number of units and
+    tasks: the skills joined with their pair and reason, then one `Prefetch` for the
+    units and one for the tasks. The body is streamed skill by skill, so at most one
+    chunk of the tree is held in memory, under WSGI and ASGI alike.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    chunk_size = 200
+
+    def get_queryset(self):
+        tasks = Task.objects.only('id', 'title', 'done', 'version', 'unit').order_by('id')
+        units = Unit.objects.prefetch_related(Prefetch('task_set', queryset=tasks)).order_by('id')
+        return (
+            Skill.objects.filter(learner=self.request.user)
+            .select_related('skillreason__reason')
+            .prefetch_related(Prefetch('skillreason__units', queryset=units))
+            .order_by('id')
+        )
+
+    def get(self, request):
+        content = stream_reads_from(
+            read_alias_for(request), self.stream(), asynchronous=isinstance(request._request, ASGIRequest)
+        )
+        return StreamingHttpResponse(content, content_type='application/json')
+
+    def stream(self):
+        renderer = FastJSONRenderer()
+        yield b'{"skills":['
+        for index, skill in enumerate(self.get_queryset().iterator(chunk_size=self.chunk_size)):
+            if index:
+                yield b','
+            yield renderer.render(LearnerTreeSerializer(skill).data)
+        yield b']}'
+
+
+class LearnerExportView(APIView):
+    """
+    Download of the requesting learner's plans as NDJSON.
+
+    One line per record, in the format of `manage.py export_plans`/`import_plans`
+    (see `api.bulk_io`). The rows are read with server-side cursors in chunks of
+    `chunk_size` and written out `lines_per_chunk` at a time as they arrive, so
+    memory stays flat and the first bytes leave before the last rows are read,
+    under WSGI and ASGI alike. The body is gzipped when the client accepts it.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    chunk_size = 2000
+    lines_per_chunk = 500
+    accepts_gzip = re.compile(r'\bgzip\b')
+
+    def get(self, request):
+        content = self.stream(request.user.get_username())
+        gzipped = bool(self.accepts_gzip.search(request.META.get('HTTP_ACCEPT_ENCODING', '')))
+        if gzipped:
+            content = compress_sequence(content)
+        content = stream_reads_from(
+            read_alias_for(request), content, asynchronous=isinstance(request._request, ASGIRequest)
+        )
+        response = StreamingHttpResponse(content, content_type='application/x-ndjson')
+        response['Content-Disposition'] = f'attachment; filename="plans-{request.user.pk}.ndjson"'
+        if gzipped:
+            response['Content-Encoding'] = 'gzip'
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+    def stream(self, username):
+        renderer = FastJSONRenderer()
+        lines = []
+        for record in export_records([username], chunk_size=self.chunk_size):
+            lines.append(renderer.render(record))
+            if len(lines) == self.lines_per_chunk:
+                yield b'\n'.join(lines) + b'\n'
+                lines = []
+        if lines:
+            yield b'\n'.join(lines) + b'\n'
 
 
 class RegisterView(APIView):
@@ -104,6 +256,45 @@ class LoginView(APIView):
         return render(request, 'login.html', {'errors': serializer.errors})
 
 
+class TokenLoginView(APIView):
+    """
+    Issue API tokens for `CachedTokenAuthentication`.
+
+    POST `username`/`password` returns `{"token": ..., "expires": ...}`; the password is
+    hashed once here instead of on every request. An expired token is replaced.
+    DELETE (authenticated with the token) revokes it.
+
+    POST runs no authentication: credentials come in the body, and a client still
+    sending its expired token must be able to log in again.
+    """
+    authentication_classes = [CachedTokenAuthentication]
+
+    def get_authenticators(self):
+        if self.request.method == 'DELETE':
+            return super().get_authenticators()
+        return []
+
+    def get_permissions(self):
+        if self.request.method == 'DELETE':
+            return [permissions.IsAuthenticated()]
+        return [permissions.AllowAny()]
+
+    def post(self, request):
+        serializer = LoginSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        user = serializer.validated_data['user']
+
+        token, created = Token.objects.get_or_create(user=user)
+        if not created and is_token_expired(token):
+            token.delete()
+            token = Token.objects.create(user=user)
+        return Response({'token': token.key, 'expires': token_expires_at(token)})
+
+    def delete(self, request):
+        request.auth.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 class LogoutView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
@@ -116,6 +307,39 @@ class LogoutView(APIView):
 
 
 
+class CohortProvisionView(APIView):
+    """
+    Create the accounts of a cohort of learners in one request. Staff only.
+
+    POST a JSON array of `{"username", "email", "password", "birth_date",
+    "first_name", "last_name"}` objects (at most `max_size`). Returns 201 with the
+    created `[{"id", "username"}, ...]`, or 400 with one error dict per item, in
+    order, and nothing created (see `api.provisioning`).
+
+    Every password is hashed within the request, which is CPU-bound by design, so
+    `max_size` keeps a request within the usual proxy timeouts; larger cohorts go
+    through `manage.py provision_learners`.
+    """
+    permission_classes = [permissions.IsAdminUser]
+    max_size = 200
+
+    def post(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response({'detail': "Expected a non-empty list of objects."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > self.max_size:
+            return Response(
+                {'detail': f"At most {self.max_size} learners can be created per request."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        users, errors = provision_learners(items)
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            [{'id': user.pk, 'username': user.username} for user in users], status=status.HTTP_201_CREATED
+        )
+
+
 class UserDetailView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
@@ -1,3 +1,143 @@
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
 
-# Register your models here.
+
+AFTER_VAR = 'after'
+
+
+def estimated_row_count(model, using='default'):
+    """
+    The planner's row estimate of `model`'s table (`pg_class.reltuples`), or `None`.
+
+    Free to read, and kept current by autovacuum/ANALYZE; `None` on other databases
+    and for tables that have never been analyzed.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+            [connection.ops.quote_name(model._meta.db_table)],
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that counts an unfiltered table with the planner's estimate.
+
+    A `COUNT(*)` of a table with millions of rows scans all of them; the estimate
+    is read from the catalog. Filtered querysets, small tables (under
+    `exact_count_below` estimated rows) and other databases are counted exactly.
+    `estimated` tells whether `count` is an estimate.
+    """
+    exact_count_below = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.has_filters():
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= self.exact_count_below:
+                self.estimated = True
+                return estimate
+        self.estimated = False
+        return super().count
+
+
+class KeysetChangeList(ChangeList):
+    """
+    Changelist paging through the default `-pk` ordering with `?after=<pk>`.
+
+    Each page is `WHERE pk < <last pk of the previous page> LIMIT n`, so deep pages
+    cost the same as the first one, where OFFSET-based pages read and discard all
+    the rows before them. Pages only link forward ("Next") and back to the first
+    one. Sorting by a column falls back to the numbered pages of `ChangeList`.
+    """
+
+    def __init__(self, request, *args, **kwargs):
+        self.after = request.GET.get(AFTER_VAR)
+        super().__init__(request, *args, **kwargs)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(AFTER_VAR, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Sorting, filtering and searching start over from the first page
+        return super().get_query_string(new_params, [*(remove or ()), AFTER_VAR])
+
+    def get_results(self, request):
+        pk_name = self.model._meta.pk.name
+        ordering = set(self.queryset.query.order_by)  # The default ordering may list -pk more than once
+        self.keyset = bool(ordering) and ordering <= {'-pk', f'-{pk_name}'}
+        if not self.keyset:
+            return super().get_results(request)
+
+        queryset = self.queryset
+        if self.after is not None:
+            try:
+                queryset = queryset.filter(pk__lt=self.model._meta.pk.to_python(self.after))
+            except ValidationError:
+                raise IncorrectLookupParameters
+        # An index-only probe of the page's keys tells whether there is a next page
+        pks = list(queryset.values_list('pk', flat=True)[:self.list_per_page + 1])
+
+        paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        self.result_count = paginator.count
+        self.full_result_count = None
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.result_list = queryset[:self.list_per_page]
+        self.can_show_all = False
+        self.show_all = False
+        self.next_url = None
+        if len(pks) > self.list_per_page:
+            self.next_url = super().get_query_string({AFTER_VAR: pks[self.list_per_page - 1]})
+        self.first_url = super().get_query_string(remove=[AFTER_VAR]) if self.after is not None else None
+        self.multi_page = bool(self.next_url or self.first_url)
+        self.paginator = paginator
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    `ModelAdmin` for tables too big for the default changelist.
+
+    - Counts come from `EstimatedCountPaginator`, and the extra unfiltered count
+      shown next to filtered results is disabled.
+    - The changelist is keyset-paginated (`KeysetChangeList`), newest first.
+    - A numeric search term also matches the primary key exactly. Subclasses should
+      list index-friendly lookups in `search_fields` (e.g. case-sensitive
+      `__startswith` or `__exact` on indexed columns), not the default
+      `icontains`, which scans the table.
+
+    Subclasses still set `list_select_related` for what `list_display` and
+    `__str__` follow, and `raw_id_fields`/`autocomplete_fields` for foreign keys
+    to large tables, so change forms don't render a `<select>` of every row.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    ordering = ('-pk',)
+    list_per_page = 100
+    change_list_template = 'admin/keyset_change_list.html'
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        term = search_term.strip()
+        if term.isdigit():
+            results |= queryset.filter(pk=int(term))
+        return results, may_have_duplicates
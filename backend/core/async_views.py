@@ -0,0 +1,323 @@
+import base64
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import ProtectedError
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework import exceptions, status
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.utils.encoders import JSONEncoder
+
+from .base_views import apply_client_version, changed_fields, conflict_response_data, protected_response_data
+from .db_routers import pin_to_primary, read_alias_for, read_from
+from .events import get_broker, learner_channel
+from .fieldsets import serializer_for_request
+from .deletion import deleter
+from .models import SoftDeleteModel, StaleVersionError
+from .pagination import KeysetPagination
+from .query_planner import plan_for_serializer
+from .view_plans import ViewPlanMixin
+
+
+class AsyncAPIView(ViewPlanMixin, View):
+    """
+    Base for ASGI-native JSON views with the same conventions as the DRF base views.
+
+    Handlers are coroutines, so under ASGI a request waiting on the database does not
+    tie up a worker thread. DRF's `APIView` is sync-only, so these build on Django's
+    `View` instead:
+
+    - Authentication: session only (`request.auser()`); anonymous requests get 403.
+    - Request bodies are parsed as JSON; responses are rendered with DRF's `JSONEncoder`.
+    - `Http404` raised by a handler is returned as a JSON 404, and DRF's
+      `ValidationError` as a JSON 400, like DRF does.
+    - GET honours `?fields=`/`?expand=` like the sync views.
+    - Reads go to the read replica under the same rules as the sync views (`core.db_routers`).
+    """
+    model = None
+    serializer_class = None
+    parent_models = []
+    owner_field = 'learner'
+
+    async def dispatch(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return self.json({'detail': "Authentication credentials were not provided."}, status.HTTP_403_FORBIDDEN)
+        try:
+            # The ORM calls run in threads that inherit this context, and with it the alias
+            with read_from(await sync_to_async(read_alias_for)(request)):
+                return await super().dispatch(request, *args, **kwargs)
+        except Http404 as e:
+            return self.json({'detail': str(e) or "Not found."}, status.HTTP_404_NOT_FOUND)
+        except exceptions.ValidationError as e:
+            return self.json(e.detail, status.HTTP_400_BAD_REQUEST)
+        finally:
+            if request.method not in SAFE_METHODS:
+                await sync_to_async(pin_to_primary)(request.user.pk)
+
+    def json(self, data, status_code=status.HTTP_200_OK):
+        return JsonResponse(data, status=status_code, safe=False, encoder=JSONEncoder)
+
+    def parse_body(self):
+        """The JSON request body, or raises `ValueError`."""
+        return json.loads(self.request.body or b'null')
+
+    def get_serializer_class(self):
+        """`serializer_class`, narrowed by `?fields=`/`?expand=` on GET (see `core.fieldsets`)."""
+        if self.request.method != 'GET':
+            return self.serializer_class
+        return serializer_for_request(self.serializer_class, self.request.GET)
+
+    def get_query_plan(self):
+        """The `select_related`/`prefetch_related`/`only()` plan derived from the serializer class."""
+        return plan_for_serializer(self.get_serializer_class())
+
+    def get_parent_chain_filters(self):
+        """Lookups restricting `model` to rows under the URL's parents (or itself) owned by the user."""
+        return self.get_view_plan().fill_parent_filters(self.kwargs, self.request.user)
+
+
+class AsyncBaseListView(AsyncAPIView):
+    """
+    Async counterpart of `BaseListView`: list (GET) and create (POST).
+
+    Listing uses the same keyset pagination parameters as `KeysetPagination`
+    (`limit`, `cursor`), ordered on `id`. As in the sync view, the parent chain
+    from `parent_models` is joined into the queryset directly.
+
+    Creation validates with `form_class` (in a thread, since form validation may
+    query) and saves with `asave()`. Parents are fetched with `aget()`.
+    """
+    form_class = None
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        if not self.get_view_plan().owned:
+            raise ImproperlyConfigured(
+                f"{self.__class__.__name__} model {self.model.__name__} lacks '{self.owner_field}' field "
+                f"and defines no parent_models."
+            )
+        return self.model.objects.filter(**self.get_parent_chain_filters())
+
+    async def get(self, request, *args, **kwargs):
+        paginator = self.pagination_class()
+        try:
+            limit = min(int(request.GET.get(paginator.page_size_query_param, paginator.page_size)),
+                        paginator.max_page_size)
+            after = self.decode_cursor(request.GET.get(paginator.cursor_query_param))
+        except ValueError:
+            return self.json({'detail': "Invalid limit or cursor."}, status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return self.json({'detail': "Invalid limit or cursor."}, status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.get_query_plan().apply(self.get_queryset(), extra_columns=['id']).order_by('id')
+        if after is not None:
+            queryset = queryset.filter(id__gt=after)
+        rows = [obj async for obj in queryset[:limit + 1]]
+
+        next_link = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            query = request.GET.copy()
+            query[paginator.cursor_query_param] = self.encode_cursor(rows[-1].id)
+            next_link = request.build_absolute_uri(f'{request.path}?{query.urlencode()}')
+
+        # Everything the serializer reads is loaded by the query plan, so this does no I/O
+        data = self.get_serializer_class()(rows, many=True).data
+        return self.json({'next': next_link, 'results': data})
+
+    async def post(self, request, *args, **kwargs):
+        try:
+            data = self.parse_body()
+        except ValueError:
+            return self.json({'detail': "Malformed JSON body."}, status.HTTP_400_BAD_REQUEST)
+        if not isinstance(data, dict):
+            return self.json({'detail': "Expected an object."}, status.HTTP_400_BAD_REQUEST)
+
+        form_context = await self.get_form_kwargs()
+        form = self.form_class(data, **form_context)
+        if not await sync_to_async(form.is_valid)():
+            return self.json(form.errors, status.HTTP_400_BAD_REQUEST)
+
+        try:
+            instance = await sync_to_async(form.save)()
+        except ValidationError:
+            # Unique violation caught by the database, mapped back onto the form
+            return self.json(form.errors, status.HTTP_400_BAD_REQUEST)
+        return self.json(self.serializer_class(instance).data, status.HTTP_201_CREATED)
+
+    async def get_form_kwargs(self):
+        """Async `BaseListView.get_form_kwargs`: parents fetched with `aget()`, in chain order."""
+        plan = self.get_view_plan()
+        if plan.top_level_unowned is not None:
+            raise ImproperlyConfigured(
+                f"Top-level parent {plan.top_level_unowned.model.__name__} in {self.__class__.__name__} "
+                f"requires a '{self.owner_field}' field for ownership check."
+            )
+
+        context = {}
+        for link in plan.parents:
+            parent_id = self.kwargs.get(link.url_kwarg)
+            if parent_id is None:
+                raise Http404(f"URL Configuration Error: Missing '{link.url_kwarg}' in URL for POST request.")
+            filters = {'id': parent_id}
+            for prev_param, prev_path in link.prev_params:
+                filters[prev_path] = context[prev_param].pk
+            if link.owner_field:
+                filters[link.owner_field] = self.request.user
+            queryset = link.model.objects.select_related(*(prev_path for _, prev_path in link.prev_params))
+            try:
+                context[link.param_name] = await queryset.aget(**filters)
+            except link.model.DoesNotExist:
+                raise Http404(f"Not Found or Access Denied: Parent {link.model.__name__} not found.")
+
+        if plan.form_takes_user:
+            context['user'] = self.request.user
+        return {key: value for key, value in context.items() if key in plan.form_context_keys}
+
+    @staticmethod
+    def encode_cursor(last_id):
+        return base64.urlsafe_b64encode(str(last_id).encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor):
+        if not cursor:
+            return None
+        try:
+            return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+        except (TypeError, UnicodeDecodeError, base64.binascii.Error) as e:
+            raise ValueError(cursor) from e
+
+
+class AsyncBaseDetailView(AsyncAPIView):
+    """
+    Async counterpart of `BaseDetailView`: retrieve (GET), update (PUT/PATCH), delete (DELETE).
+
+    The instance is resolved with one `aget()` over the joined ownership chain, using the
+    same URL kwargs (`lookup_url_kwarg`, `{param_name}_id`) as the sync view. Serializer
+    validation runs in a thread (validators may query); the write itself uses `asave()`
+    with the changed `update_fields` (compare-and-swap on `version`, as in the sync
+    view), or `adelete()` (or a background delete, see `BaseDetailView.background_delete`).
+    """
+    lookup_field = 'id'
+    lookup_url_kwarg = None
+    background_delete = False
+
+    async def get_object(self):
+        instance_lookup_url_kwarg = self.lookup_url_kwarg or f'{self.model.__name__.lower()}_id'
+        instance_lookup_value = self.kwargs.get(instance_lookup_url_kwarg)
+        if instance_lookup_value is None:
+            raise Http404(f"URL Config Error: Missing '{instance_lookup_url_kwarg}' for {self.model.__name__}.")
+
+        filters = {self.lookup_field: instance_lookup_value}
+        filters.update(self.get_parent_chain_filters())
+
+        queryset = self.model.objects.select_related(*(link.path for link in self.get_view_plan().parents))
+        queryset = self.get_query_plan().apply(queryset, restrict_columns=False)
+        try:
+            return await queryset.aget(**filters)
+        except (self.model.DoesNotExist, ValidationError, ValueError):
+            raise Http404(
+                f"Not Found/Access Denied: {self.model.__name__} with "
+                f"{self.lookup_field}={instance_lookup_value} not found."
+            )
+
+    async def get(self, request, *args, **kwargs):
+        instance = await self.get_object()
+        return self.json(self.get_serializer_class()(instance, context={'request': request}).data)
+
+    async def put(self, request, *args, **kwargs):
+        return await self.update(request, partial=False)
+
+    async def patch(self, request, *args, **kwargs):
+        return await self.update(request, partial=True)
+
+    async def update(self, request, partial):
+        try:
+            data = self.parse_body()
+        except ValueError:
+            return self.json({'detail': "Malformed JSON body."}, status.HTTP_400_BAD_REQUEST)
+
+        instance = await self.get_object()
+        serializer = self.serializer_class(
+            instance, data=data, partial=partial, context={'request': request, 'view': self}
+        )
+        if not await sync_to_async(serializer.is_valid)():
+            return self.json(serializer.errors, status.HTTP_400_BAD_REQUEST)
+
+        try:
+            errors = apply_client_version(instance, data)
+            if errors:
+                return self.json(errors, status.HTTP_400_BAD_REQUEST)
+            changed = changed_fields(instance, serializer.validated_data)
+            if changed:
+                await instance.asave(update_fields=changed)
+        except StaleVersionError as e:
+            return self.json(conflict_response_data(e), status.HTTP_409_CONFLICT)
+        return self.json(self.serializer_class(instance, context={'request': request}).data)
+
+    async def delete(self, request, *args, **kwargs):
+        instance = await self.get_object()
+        if self.background_delete and isinstance(instance, SoftDeleteModel):
+            try:
+                await sync_to_async(self.mark_deleted)(instance)
+            except StaleVersionError as e:
+                return self.json(conflict_response_data(e), status.HTTP_409_CONFLICT)
+        else:
+            try:
+                await instance.adelete()
+            except ProtectedError as e:
+                return self.json(protected_response_data(e), status.HTTP_409_CONFLICT)
+        return HttpResponse(status=status.HTTP_204_NO_CONTENT)
+
+    @staticmethod
+    @transaction.atomic
+    def mark_deleted(instance):
+        instance.mark_deleted()
+        deleter.submit(type(instance), instance.pk)
+
+
+class ChangeStreamView(AsyncAPIView):
+    """
+    Server-sent events stream of the requesting learner's changes (`core.events`).
+
+    Each write to their skills, units or tasks arrives as
+    `event: change` with `data: {"model", "id", "action", "fields"}`, so clients
+    can subscribe once instead of polling the list endpoints. An `event: resync`
+    means events were dropped (the client fell behind) and it should refetch.
+    A comment line is sent every `API_EVENT_HEARTBEAT_SECONDS` to keep proxies
+    from closing an idle connection.
+
+    Needs ASGI: the connection is held by a coroutine, not a worker thread. Under
+    WSGI the view answers 501.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        if not isinstance(request, ASGIRequest):
+            return self.json({'detail': "Event streams are only served over ASGI."}, status.HTTP_501_NOT_IMPLEMENTED)
+        response = StreamingHttpResponse(
+            self.stream(learner_channel(request.user.pk)), content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # Don't let nginx buffer the stream
+        return response
+
+    async def stream(self, channel):
+        heartbeat = getattr(settings, 'API_EVENT_HEARTBEAT_SECONDS', 15)
+        async with get_broker().subscribe(channel) as subscription:
+            yield b': connected\n\n'
+            while True:
+                message = await subscription.get(timeout=heartbeat)
+                if subscription.overflowed:
+                    subscription.clear()
+                    yield b'event: resync\ndata: {}\n\n'
+                elif message is None:
+                    yield b': keep-alive\n\n'
+                else:
+                    yield f'event: change\ndata: {json.dumps(message, cls=JSONEncoder)}\n\n'.encode()
+
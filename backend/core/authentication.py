@@ -0,0 +1,87 @@
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+
+TOKEN_CACHE_KEY = 'auth-token:{}'  # -> (user_id, created) of the token
+
+
+def get_token_ttl():
+    """How long an issued token stays valid (`API_TOKEN_TTL`, default 7 days)."""
+    return getattr(settings, 'API_TOKEN_TTL', timedelta(days=7))
+
+
+def token_expires_at(token):
+    return token.created + get_token_ttl()
+
+
+def is_token_expired(token):
+    return token_expires_at(token) <= timezone.now()
+
+
+def token_cache_key(key):
+    # Hashed, so token keys never show up in a shared cache's key space
+    return TOKEN_CACHE_KEY.format(hashlib.sha256(key.encode()).hexdigest())
+
+
+def forget_token(key):
+    """Drop a token from this process's token cache (on deletion)."""
+    cache.delete(token_cache_key(key))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    DRF token authentication with expiring tokens and a cached token lookup.
+
+    Unlike Basic authentication no password hash is computed per request. The token
+    row is read from Django's cache, as its user's id and creation time only, for up
+    to `API_TOKEN_CACHE_TIMEOUT` seconds (default 300); the user is read by primary
+    key on every request, so changes to it (e.g. deactivation) apply immediately.
+
+    Deleting a token drops its cache entry (see `core.signals`), but only from the
+    cache of the process that deleted it when that cache is per-process (the default
+    `LocMemCache`): other workers keep accepting a revoked token for up to
+    `API_TOKEN_CACHE_TIMEOUT`. Use a shared cache backend to revoke everywhere at once.
+
+    Tokens older than `API_TOKEN_TTL` are rejected and deleted; clients obtain a new
+    one from the token login endpoint.
+
+    Clients send `Authorization: Token <key>`.
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = token_cache_key(key)
+        model = self.get_model()
+        cached = cache.get(cache_key)
+        if cached is None:
+            try:
+                token = model.objects.select_related('user').get(key=key)
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+            cache.set(cache_key, (token.user_id, token.created), getattr(settings, 'API_TOKEN_CACHE_TIMEOUT', 300))
+        else:
+            user_id, created = cached
+            token = model(key=key, user_id=user_id, created=created)
+            try:
+                token.user = get_user_model()._default_manager.get(pk=user_id)
+            except ObjectDoesNotExist:
+                forget_token(key)
+                raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        if is_token_expired(token):
+            forget_token(key)
+            token.delete()
+            raise exceptions.AuthenticationFailed(_('Token has expired.'))
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        return (token.user, token)
@@ -1,5 +1,10 @@
+from collections import defaultdict
+from contextlib import nullcontext
+
 from django import forms
-from django.core.exceptions import ValidationError
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import IntegrityError, router, transaction
+from django.db.models import UniqueConstraint
 
 class BaseForm(forms.Form):
     """
@@ -12,7 +17,7 @@ class BaseForm(forms.Form):
         model (Model): The Django model class this form operates on.
         required_context (list): Context variables required for form operation (e.g., ['user', 'Skill']).
         context_to_field_map (dict): Mapping from context variable names to model field names
-                                    (e.g., {'user': 'Learner'}).
+                                    (e.g., {'user': 'learner'}).
 
     Key Features:
         1. Context Handling:
@@ -23,7 +28,18 @@ class BaseForm(forms.Form):
         2. Model Operations:
             - Supports both create and update operations
             - Handles model instance initialization and updating
-            - Built-in unique validation helper
+            - Built-in unique validation helper. When the model has a unique constraint
+              over exactly the checked fields, no query is run up front: `save()` relies
+              on the database and maps an `IntegrityError` back to the same field error
+              (raised as `ValidationError`, with the error added to `form.errors`).
+              Conditional constraints (`UniqueConstraint(condition=...)`) are still
+              checked with a query, and a violation that slips past it (a concurrent
+              insert) is mapped back the same way
+
+        3. Batch Validation:
+            - Pass `defer_unique_checks=True` to record `_validate_unique` checks instead of
+              running them; `validate_unique_in_bulk(forms)` then runs the checks of a whole
+              batch with one `IN` query per model/scope
 
     Methods:
         _validate_unique: Validates uniqueness of field values against model constraints
@@ -33,7 +49,7 @@ class BaseForm(forms.Form):
         class SkillForm(BaseForm):
             model = Skill
             required_context = ['user']
-            context_to_field_map = {'user': 'Learner'}
+            context_to_field_map = {'user': 'learner'}
             # ... form fields and custom validation ...
 
         # In view:
@@ -44,7 +60,8 @@ class BaseForm(forms.Form):
     Notes:
         - Context variables are automatically removed from kwargs during initialization
         - Combines form data with context values during save() for complete model population
-        - Maintains existing instance when updating (pass 'instance' kwarg)
+        - Maintains existing instance when updating (pass 'instance' kwarg); only the
+          changed fields are saved (`save(update_fields=...)`), and nothing when none changed
     """
     required_context = []
     model = None
@@ -52,6 +69,9 @@ class BaseForm(forms.Form):
 
     def __init__(self, *args, **kwargs):
         self.instance = kwargs.pop('instance', None)
+        self.defer_unique_checks = kwargs.pop('defer_unique_checks', False)
+        self.deferred_unique_checks = []
+        self.db_unique_checks = []
         self.context = {var: kwargs.pop(var, None) for var in self.required_context}
         data = kwargs.pop('data', None)
         if data is None and args:
@@ -73,6 +93,18 @@ class BaseForm(forms.Form):
     # The rest of the methods remain unchanged
     def _validate_unique(self, model, filters, error_message, field=None, exclude_instance=True):
         """Helper method for unique validation"""
+        if self.defer_unique_checks:
+            self.deferred_unique_checks.append((model, filters, error_message, field, exclude_instance))
+            return
+        enforced = _db_enforcement(model, filters) if model is self.model else None
+        if enforced:
+            # Lets save() map the database's rejection of a duplicate back to this check
+            self.db_unique_checks.append((model, filters, error_message, field, exclude_instance))
+        if enforced != 'always':
+            self._check_unique(model, filters, error_message, field, exclude_instance)
+
+    def _check_unique(self, model, filters, error_message, field=None, exclude_instance=True):
+        """Query for a duplicate of `filters` and add `error_message` if there is one."""
         queryset = model.objects.filter(**filters)
         if self.instance and self.instance.pk and exclude_instance:
             queryset = queryset.exclude(pk=self.instance.pk)
@@ -100,17 +132,130 @@ class BaseForm(forms.Form):
             if context_key in self.context:
                 data_to_save[model_field] = self.context[context_key]
 
+        update_fields = None
         if self.instance and self.instance.pk:
-            # Update existing instance
-            for field, value in data_to_save.items():
-                setattr(self.instance, field, value)
+            # Update existing instance, writing only the fields that changed, so the
+            # post_save signal (and the change events sent from it) names them
+            update_fields = _set_changed_fields(self.instance, data_to_save)
             instance = self.instance
         else:
             # Create new instance with context variables
             instance = self.model(**data_to_save)
             self.instance = instance
 
+        if commit and update_fields == []:
+            return instance  # Nothing changed, nothing to write
         if commit:
-            instance.save()
+            # Inside a transaction, wrap the save in a savepoint so a violation doesn't
+            # break it; in autocommit mode that would only add round trips.
+            in_transaction = transaction.get_connection(router.db_for_write(self.model)).in_atomic_block
+            try:
+                with transaction.atomic() if in_transaction else nullcontext():
+                    instance.save(update_fields=update_fields)
+            except IntegrityError:
+                if not self._add_db_unique_errors():
+                    raise
+                raise ValidationError(self.errors)
         return instance
 
+    def _add_db_unique_errors(self):
+        """
+        Map a unique violation raised on save back to the checks `_validate_unique` left
+        to the database.
+
+        With a single candidate check it must be the one that failed; otherwise the
+        candidates are re-run as queries to find out. Returns whether an error was added.
+        """
+        checks, self.db_unique_checks = self.db_unique_checks, []
+        if len(checks) == 1:
+            model, filters, error_message, field, exclude_instance = checks[0]
+            self.add_error(field, ValidationError(error_message))
+            return True
+
+        errors_before = len(self.errors)
+        for check in checks:
+            self._check_unique(*check)
+        return len(self.errors) > errors_before
+
+
+def _set_changed_fields(instance, values):
+    """Set `values` on `instance`; returns the names of the model fields whose value changed."""
+    changed = []
+    for name, value in values.items():
+        try:
+            field = instance._meta.get_field(name)
+        except FieldDoesNotExist:
+            setattr(instance, name, value)
+            continue
+        if field.is_relation:
+            # Compared by id, so an unloaded related object isn't fetched for it
+            differs = getattr(instance, field.attname) != getattr(value, 'pk', value)
+        else:
+            differs = getattr(instance, name) != value
+        setattr(instance, name, value)
+        if differs:
+            changed.append(field.name)
+    return changed
+
+
+def _db_enforcement(model, filters):
+    """
+    How the database enforces uniqueness over exactly the fields in `filters`:
+    `'always'` (a unique field, `unique_together` or an unconditional constraint),
+    `'conditional'` (a `UniqueConstraint` with a `condition`, which may not cover the
+    rows being saved, so checks still query), or `None`.
+    """
+    if any(value is None for value in filters.values()):
+        return None  # NULLs never conflict in a unique constraint
+    try:
+        names = {model._meta.get_field(key).name for key in filters}
+    except FieldDoesNotExist:
+        return None
+
+    if len(names) == 1 and model._meta.get_field(next(iter(names))).unique:
+        return 'always'
+    if any(set(fields) == names for fields in model._meta.unique_together):
+        return 'always'
+    if any(set(constraint.fields) == names for constraint in model._meta.total_unique_constraints):
+        return 'always'
+    if any(
+        isinstance(constraint, UniqueConstraint) and constraint.condition is not None
+        and not constraint.expressions and set(constraint.fields) == names
+        for constraint in model._meta.constraints
+    ):
+        return 'conditional'
+    return None
+
+
+def validate_unique_in_bulk(forms):
+    """
+    Run the unique checks deferred by a batch of `BaseForm`s (`defer_unique_checks=True`).
+
+    Checks are grouped by model, checked field and the rest of their filters (the scope,
+    e.g. the parent unit), and each group is resolved with a single
+    `filter(<scope>, <field>__in=[...])` query. Values repeated within the batch are
+    reported as well, on every occurrence after the first. Checks that can't be grouped
+    (no `field`, or `field` not among the filters) fall back to one query each.
+    """
+    groups = defaultdict(list)
+    for form in forms:
+        for model, filters, error_message, field, exclude_instance in form.deferred_unique_checks:
+            if field is None or field not in filters:
+                form.defer_unique_checks = False
+                form._validate_unique(model, filters, error_message, field, exclude_instance)
+                continue
+            if filters[field] is None:
+                continue  # Missing value, the field itself already failed validation
+            scope = tuple(sorted((key, value) for key, value in filters.items() if key != field))
+            groups[(model, field, scope)].append((form, filters[field], error_message))
+
+    for (model, field, scope), checks in groups.items():
+        existing = set(
+            model.objects.filter(**dict(scope), **{f'{field}__in': {value for _, value, _ in checks}})
+            .values_list(field, flat=True)
+        )
+        seen = set()
+        for form, value, error_message in checks:
+            if value in existing or value in seen:
+                form.add_error(field, ValidationError(error_message))
+            seen.add(value)
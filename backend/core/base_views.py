@@ -1,25 +1,126 @@
-from django.core.exceptions import ImproperlyConfigured, FieldDoesNotExist
+import logging
+from collections.abc import Mapping
+
+from django.core.exceptions import ImproperlyConfigured, FieldError, ValidationError
 from django.shortcuts import get_object_or_404
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, ProtectedError, Value, When
 from django.http import Http404
+from django.utils.cache import patch_vary_headers
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.authentication import SessionAuthentication, BasicAuthentication
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
 from rest_framework import status
-import inspect
-
-class BaseListView(APIView):
+from .authentication import CachedTokenAuthentication
+from .base_forms import validate_unique_in_bulk
+from .cache import (
+    bump_learner_version_on_commit, cache_stats, etag_matches, make_response_cache_key, make_response_etag,
+)
+from .db_routers import ReadReplicaMixin
+from .deletion import deleter
+from .events import change_event, publish_on_commit
+from .fieldsets import serializer_for_request
+from .metrics import timed_serialization
+from .models import SoftDeleteModel, StaleVersionError, VersionedModel
+from .pagination import KeysetPagination
+from .query_planner import plan_for_serializer, values_fields_for_serializer
+from .view_plans import ViewPlanMixin
+
+
+logger = logging.getLogger(__name__)
+
+
+def apply_client_version(instance, data):
+    """
+    Set a versioned instance's expected `version` from the request body, if sent.
+
+    Clients send back the `version` they read, so an edit based on an outdated
+    copy is refused (409) instead of overwriting newer changes. Without it, the
+    version read for this request is used. Returns an error dict for a malformed
+    value, else `None`; raises `StaleVersionError` if the value isn't the version
+    just read. That is checked here as well as by the write, since an update that
+    changes nothing writes nothing.
+    """
+    if not isinstance(instance, VersionedModel) or not isinstance(data, Mapping) or 'version' not in data:
+        return None
+    try:
+        version = int(data['version'])
+    except (TypeError, ValueError):
+        return {'version': ["A valid integer is required."]}
+    current, instance.version = instance.version, version
+    if version != current:
+        raise StaleVersionError(instance, current)
+    return None
+
+
+def changed_fields(instance, validated_data):
+    """Set the values of `validated_data` that differ from `instance` on it; returns their names."""
+    changed = [attr for attr, value in validated_data.items() if getattr(instance, attr) != value]
+    for attr in changed:
+        setattr(instance, attr, validated_data[attr])
+    return changed
+
+
+def conflict_response_data(error):
+    return {
+        'detail': "This object was changed by another request. Reload it and try again.",
+        'version': error.current_version,
+    }
+
+
+def protected_response_data(error):
+    names = sorted({str(obj._meta.verbose_name_plural) for obj in error.protected_objects})
+    return {'detail': f"This object still has {', '.join(names)}; delete them first."}
+
+class BaseListView(ReadReplicaMixin, ViewPlanMixin, APIView):
     """
     Base API view for listing multiple instances and creating new ones.
 
     Handles GET requests to list resources and POST requests to create a new resource.
 
     List Filtering:
-    - The base `get_queryset` method filters instances by `Learner=request.user`.
-      This assumes the model has a `Learner` field linked to the user.
-    - For nested resources (defined in `parent_models`), subclasses should
-      override `get_queryset` to further filter the results based on the
-      parent objects found using URL keyword arguments like `{param_name}_id`.
+    - The base `get_queryset` method filters instances by `<owner_field>=request.user`
+      (`learner` by default), assuming the model has that field linked to the user.
+    - For nested resources (defined in `parent_models`), it filters by the parents
+      named in the URL instead (keyword arguments like `{param_name}_id`), with the
+      top-level parent owned by the user and none of them marked deleted. The
+      lookups are precompiled in the view plan (`core.view_plans`), which finds the
+      path from the model to each parent along its foreign keys.
+    - The queryset is then shaped by `get_query_plan()`, which derives the
+      `select_related`/`prefetch_related`/`only()` calls from `serializer_class`
+      (see `core.query_planner`), so nested serializers don't cause N+1 queries.
+
+    Response Caching:
+    - Opt in with `cache_responses = True`. GET responses are stored in Django's
+      cache under `(view, user, learner version, host + full path)`, which covers
+      the parent ids and query params. Writes bump the learner's version
+      (`core.cache`), either through model signals or, for bulk writes that bypass
+      signals, from the view itself, so stale entries are never served again.
+      Hits and misses are counted in `core.cache.cache_stats` and reported in the
+      `X-Cache` response header.
+
+    Conditional Requests:
+    - Opt in with `conditional_get = True`. GET responses carry a weak `ETag`
+      derived from the learner's version counter, the full path and the negotiated
+      media type (with `Vary: Accept`), and a request whose
+      `If-None-Match` matches is answered with `304 Not Modified` before any
+      query or serialization runs.
+
+    Sparse Fieldsets:
+    - GET accepts `?fields=a,b` (render only these top-level fields) and
+      `?expand=x,y` (render only these nested serializers), see `core.fieldsets`.
+      The narrowed serializer class is what the query plan is derived from, so
+      relations that are not rendered are neither joined nor prefetched.
+
+    Fast Path:
+    - When `serializer_class` is a plain `ModelSerializer` over simple columns (like
+      `TaskSerializer`), GET fetches the rows with `values()` and returns the dicts
+      as they are, skipping model instantiation and per-field `to_representation`
+      (see `core.query_planner.values_fields_for_serializer`). Serializers with
+      declared, nested or computed fields always go through the serializer. Set
+      `values_fast_path = False` to opt out.
 
     Creation (`POST`):
     - Uses the specified `form_class` for data validation and saving new instances.
@@ -27,7 +128,21 @@ class BaseListView(APIView):
     - If `parent_models` are defined, it fetches the parent objects based on
       URL kwargs (`{param_name}_id`) using `get_form_context` and passes
       them as keyword arguments to the form's `__init__` method.
-      Parent objects fetched this way are also filtered by `Learner=request.user`.
+      The top-level parent fetched this way is also filtered by `<owner_field>=request.user`.
+    - When `bulk_create_enabled` is set, the body may also be a JSON array of
+      objects. The parents are looked up once for the whole batch, unique checks
+      run set-based (`validate_unique_in_bulk`), and the rows are written with one
+      `bulk_create` in a transaction. Errors are reported per item, in order, and
+      nothing is written if any item is invalid.
+
+    Bulk Update (`PATCH`):
+    - When `bulk_update_fields` is set, PATCH on the collection takes a JSON array
+      like `[{"id": 1, "done": true}, {"id": 2, "done": false}]`. Only the listed
+      fields can be changed. Rows are looked up through `get_queryset` (so ownership,
+      the parents in the URL and soft deletion are enforced), and the ones that
+      actually change are written with a single `UPDATE ... WHERE id IN (...)`. The
+      response lists the `updated` ids and the ids that were `not_found` among the
+      user's objects.
 
     Nested Resources:
     - Supported via the `parent_models` attribute: a list of tuples
@@ -45,128 +160,412 @@ class BaseListView(APIView):
     Optional Attributes:
     - `parent_models`: List of tuples `(param_name, ParentModel)` for handling
                        nested resources.
+    - `owner_field`: Field linking the model (or its top-level parent) to the user who
+                     owns it (default: `learner`).
+    - `pagination_class`: Paginator used by GET (default: `KeysetPagination`, driven
+                          by the `limit`/`cursor` query params). Set to `None` to
+                          return the whole collection as a plain list.
+    - `ordering`: Ordering of GET pages (default: `id`). Only the first field is
+                  the cursor key, so it should be unique (see `KeysetPagination`).
+    - `bulk_create_enabled`: Accept a JSON array in POST (default: `False`).
+    - `bulk_create_max_size`: Largest accepted batch (default: 500).
+    - `bulk_update_fields`: Fields PATCH on the collection may change (default: none,
+                            which disables bulk PATCH).
+    - `cache_responses`: Cache GET responses per learner (default: `False`).
+    - `cache_timeout`: Lifetime of cached responses in seconds (default: 300).
+    - `conditional_get`: Send ETags and answer `If-None-Match` with 304 (default: `False`).
+    - `values_fast_path`: Use the `values()` fast path when the serializer allows it
+                          (default: `True`).
 
     Authentication & Permissions:
-    - Defaults use `SessionAuthentication` and `BasicAuthentication`.
+    - Defaults use `CachedTokenAuthentication` (expiring tokens with a cached lookup,
+      no per-request password hashing), then `SessionAuthentication` and
+      `BasicAuthentication`.
     - Default permission requires the user to be authenticated (`IsAuthenticated`).
+
+    Read Replica:
+    - With `API_READ_REPLICA` set, GET/HEAD/OPTIONS read from the replica
+      (`core.db_routers.ReadReplicaMixin`); users who wrote within the last
+      `API_REPLICA_PIN_SECONDS` keep reading from the primary.
     """
-    authentication_classes = [SessionAuthentication, BasicAuthentication]
+    authentication_classes = [CachedTokenAuthentication, SessionAuthentication, BasicAuthentication]
     permission_classes = [IsAuthenticated]
     model = None
     serializer_class = None
     form_class = None
     parent_models = []
+    owner_field = 'learner'
+    pagination_class = KeysetPagination
+    ordering = None
+    bulk_create_enabled = False
+    bulk_create_max_size = 500
+    bulk_update_fields = ()
+    cache_responses = False
+    cache_timeout = 300
+    conditional_get = False
+    values_fast_path = True
 
     def get_queryset(self, request, *args, **kwargs):
-        """Get the queryset filtered by user. Assumes direct 'Learner' field.
-           Subclasses for nested resources MUST override this."""
-        if not hasattr(self.model, 'Learner'):
+        """The user's instances, under the parents named in the URL for nested resources."""
+        plan = self.get_view_plan()
+        if not plan.owned:
              raise ImproperlyConfigured(
                  f"{self.__class__.__name__} uses default get_queryset, but model "
-                 f"{self.model.__name__} lacks 'Learner' field. Override get_queryset "
-                 f"for nested resources like Units or Tasks."
+                 f"{self.model.__name__} lacks '{self.owner_field}' field and defines no "
+                 f"parent_models. Override get_queryset."
              )
-        return self.model.objects.filter(Learner=request.user)
+        return self.model.objects.filter(**plan.fill_parent_filters(kwargs, request.user))
     
+    @property
+    def paginator(self):
+        """The paginator instance associated with the view, or `None`."""
+        if not hasattr(self, '_paginator'):
+            self._paginator = self.pagination_class() if self.pagination_class else None
+        return self._paginator
+
+    def get_serializer_class(self):
+        """`serializer_class`, narrowed by `?fields=`/`?expand=` on reads (see `core.fieldsets`)."""
+        if self.request.method not in SAFE_METHODS:
+            return self.serializer_class
+        return serializer_for_request(self.serializer_class, self.request.query_params)
+
+    def get_query_plan(self):
+        """The `select_related`/`prefetch_related`/`only()` plan derived from the serializer class."""
+        return plan_for_serializer(self.get_serializer_class())
+
     def get(self, request, *args, **kwargs):
+        # Computed before reading, so a concurrent write can only make the ETag older than the data
+        etag = make_response_etag(self, request) if self.conditional_get else None
+        if etag and etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag, 'Vary': 'Accept'})
+
+        response = self.get_cached_list(request, *args, **kwargs)
+        if etag and response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+            patch_vary_headers(response, ('Accept',))
+        return response
+
+    def get_cached_list(self, request, *args, **kwargs):
+        """`list()`, served from and stored in the response cache when `cache_responses` is set."""
+        if not self.cache_responses:
+            return self.list(request, *args, **kwargs)
+
+        cache_key = make_response_cache_key(self, request)
+        data = cache.get(cache_key)
+        cache_stats.record(self.__class__.__name__, hit=data is not None)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+
+        response = self.list(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(cache_key, response.data, self.cache_timeout)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def get_values_fields(self):
+        """Fields for the `values()` fast path, or `None` to serialize model instances."""
+        if not self.values_fast_path:
+            return None
+        return values_fields_for_serializer(self.get_serializer_class())
+
+    def list(self, request, *args, **kwargs):
+        """Build the (uncached) GET response: the filtered, planned and paginated collection."""
         queryset = self.get_queryset(request, *args, **kwargs)
-        serializer = self.serializer_class(queryset, many=True)
-        return Response(serializer.data)
+        values_fields = self.get_values_fields()
+        if values_fields is not None:
+            return self.list_values(request, queryset, values_fields)
+
+        if self.paginator is None:
+            queryset = self.get_query_plan().apply(queryset)
+            serializer = self.get_serializer_class()(queryset, many=True)
+            with timed_serialization():
+                data = serializer.data
+            return Response(data)
+
+        # The cursor reads the ordering key from each row, so it must not be deferred
+        ordering = self.paginator.get_ordering(request, queryset, self)
+        queryset = self.get_query_plan().apply(queryset, extra_columns=[key.lstrip('-') for key in ordering])
+
+        # Only the requested page is fetched and serialized
+        page = self.paginator.paginate_queryset(queryset, request, view=self)
+        serializer = self.get_serializer_class()(page, many=True)
+        with timed_serialization():
+            data = serializer.data
+        return self.paginator.get_paginated_response(data)
+
+    def list_values(self, request, queryset, fields):
+        """
+        `list()` for plain model serializers: rows come from `values()` as dicts.
+
+        No model instances are built and no per-field `to_representation` runs; the
+        rows already are the serialized form (see `values_fields_for_serializer`).
+        """
+        if self.paginator is None:
+            return Response(list(queryset.values(*fields)))
+
+        # The cursor reads the ordering key from each row; columns fetched only for it are
+        # dropped once the response (and its links) has been built
+        ordering = self.paginator.get_ordering(request, queryset, self)
+        extra = [key.lstrip('-') for key in ordering if key.lstrip('-') not in fields]
+        page = self.paginator.paginate_queryset(queryset.values(*fields, *extra), request, view=self)
+        response = self.paginator.get_paginated_response(page)
+        for row in page:
+            for key in extra:
+                del row[key]
+        return response
     
     def post(self, request, *args, **kwargs):
-        # Consider simplifying context handling if 'required_context' isn't strictly needed
-        form_context = self.get_form_context(request, *args, **kwargs) # Pass request/kwargs
-
-        # Add user if form expects it (check __init__ signature or a class attribute)
-        # A common pattern is just to pass it if the form needs it.
-        # Let's assume forms might need 'user' or specific parents.
-        init_params = list(inspect.signature(self.form_class.__init__).parameters)
-        if 'user' in init_params:
-            form_context['user'] = request.user
-
-        # Filter context to only what the form explicitly takes in __init__ ?
-        # This prevents errors if extra context is passed, but standard forms ignore extras.
-        # Keeping your original filtering logic based on required_context if you use that pattern:
-        if hasattr(self.form_class, 'required_context'):
-             filtered_context = {
-                 key: value
-                 for key, value in form_context.items()
-                 if key in self.form_class.required_context
-             }
-        else:
-            # Default: pass all context (parents, user if needed)
-            # Filter to only keys expected by form's __init__ to be safe
-            valid_keys = init_params[1:] # Skip 'self', take other args/kwargs
-            filtered_context = {
-                key: value for key, value in form_context.items() if key in valid_keys
-            }
-
-
+        if isinstance(request.data, list):
+            if not self.bulk_create_enabled:
+                return Response(
+                    {'detail': f"{self.__class__.__name__} does not accept a list of objects."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            return self.bulk_create(request, *args, **kwargs)
+
+        filtered_context = self.get_form_kwargs(request, *args, **kwargs)
         form = self.form_class(request.data, **filtered_context)
 
         if form.is_valid():
-            instance = form.save()
+            try:
+                instance = form.save()
+            except ValidationError:
+                # Unique violation caught by the database, mapped back onto the form
+                return Response(form.errors, status=status.HTTP_400_BAD_REQUEST)
             serializer = self.serializer_class(instance)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(form.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def bulk_create(self, request, *args, **kwargs):
+        """Validate and create every object of a JSON array POST body, all or nothing."""
+        items = request.data
+        if not items:
+            return Response({'detail': "Expected a non-empty list of objects."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > self.bulk_create_max_size:
+            return Response(
+                {'detail': f"At most {self.bulk_create_max_size} objects can be created per request."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Parents are looked up once for the whole batch
+        filtered_context = self.get_form_kwargs(request, *args, **kwargs)
+
+        forms = []
+        for item in items:
+            if not isinstance(item, dict):
+                forms.append(None)
+                continue
+            form = self.form_class(item, defer_unique_checks=True, **filtered_context)
+            form.is_valid()
+            forms.append(form)
+        validate_unique_in_bulk([form for form in forms if form is not None])
+
+        errors = [
+            form.errors if form is not None else {'non_field_errors': ["Expected an object."]}
+            for form in forms
+        ]
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            with transaction.atomic():
+                # Built in the transaction: a form may create rows its instance refers to
+                instances = self.perform_bulk_create([form.save(commit=False) for form in forms])
+                # bulk_create sends no post_save signals, so invalidate cached responses and notify here
+                bump_learner_version_on_commit(request.user.pk)
+                publish_on_commit(
+                    request.user.pk, (change_event(self.model, instance.pk, 'created') for instance in instances)
+                )
+        except IntegrityError:
+            # A concurrent request won the race on a unique constraint: re-check to report it per item
+            validate_unique_in_bulk(forms)
+            errors = [form.errors for form in forms]
+            if not any(errors):
+                raise
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        serializer = self.serializer_class(instances, many=True)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def perform_bulk_create(self, instances):
+        """Write a validated batch; runs inside a transaction. Override to add side effects."""
+        return self.model.objects.bulk_create(instances)
+
+    def patch(self, request, *args, **kwargs):
+        """Apply `[{"id": ..., <field>: <value>}, ...]` to the user's objects in one UPDATE."""
+        if not self.bulk_update_fields:
+            return Response(
+                {'detail': f"{self.__class__.__name__} does not support bulk updates."},
+                status=status.HTTP_405_METHOD_NOT_ALLOWED,
+            )
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response({'detail': "Expected a non-empty list of objects."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > self.bulk_create_max_size:
+            return Response(
+                {'detail': f"At most {self.bulk_create_max_size} objects can be updated per request."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        targets, errors = self.clean_bulk_update(items)
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        fields = sorted({field for values in targets.values() for field in values})
+        with transaction.atomic():
+            queryset = self.get_queryset(request, *args, **kwargs)
+            current = queryset.filter(pk__in=targets).values_list('pk', *fields)
+            found, changed = set(), []
+            for pk, *values in current:
+                found.add(pk)
+                if any(
+                    field in targets[pk] and targets[pk][field] != value
+                    for field, value in zip(fields, values)
+                ):
+                    changed.append(pk)
+
+            if changed:
+                # One CASE per field maps each changed row to its target value
+                updates = {}
+                for field in fields:
+                    model_field = self.model._meta.get_field(field)
+                    whens = [
+                        When(pk=pk, then=Value(targets[pk][field], output_field=model_field))
+                        for pk in changed if field in targets[pk]
+                    ]
+                    if whens:
+                        updates[field] = Case(*whens, default=field, output_field=model_field)
+                if issubclass(self.model, VersionedModel):
+                    # Fail detail-view writes based on the rows as they were before this update
+                    updates['version'] = F('version') + 1
+                self.perform_bulk_update(queryset.filter(pk__in=changed), updates)
+                # update() sends no post_save signals, so invalidate cached responses and notify here
+                bump_learner_version_on_commit(request.user.pk)
+                publish_on_commit(
+                    request.user.pk, (change_event(self.model, pk, 'updated', targets[pk]) for pk in changed)
+                )
+
+        return Response({
+            'updated': sorted(changed),
+            'not_found': sorted(pk for pk in targets if pk not in found),
+        })
+
+    def clean_bulk_update(self, items):
+        """
+        Validate a bulk PATCH body against `bulk_update_fields`.
+
+        Returns `({pk: {field: value}}, errors)` where `errors` has one entry per item.
+        """
+        targets, errors = {}, []
+        for item in items:
+            item_errors = {}
+            if not isinstance(item, dict):
+                errors.append({'non_field_errors': ["Expected an object."]})
+                continue
+
+            try:
+                pk = self.model._meta.pk.to_python(item.get('id'))
+            except ValidationError as e:
+                pk = None
+                item_errors['id'] = e.messages
+            if pk is None:
+                item_errors.setdefault('id', ["This field is required."])
+            elif pk in targets:
+                item_errors['id'] = ["Duplicate id in request."]
+
+            values = {}
+            for field, value in item.items():
+                if field == 'id':
+                    continue
+                if field not in self.bulk_update_fields:
+                    item_errors[field] = ["This field cannot be bulk updated."]
+                    continue
+                try:
+                    values[field] = self.model._meta.get_field(field).clean(value, None)
+                except ValidationError as e:
+                    item_errors[field] = e.messages
+            if not values and not item_errors:
+                item_errors['non_field_errors'] = [
+                    f"Expected at least one of: {', '.join(self.bulk_update_fields)}."
+                ]
+
+            if not item_errors:
+                targets[pk] = values
+            errors.append(item_errors)
+        return targets, errors
+
+    def perform_bulk_update(self, queryset, updates):
+        """Write a bulk PATCH; runs inside a transaction. Override to add side effects."""
+        return queryset.update(**updates)
+
+    def get_form_kwargs(self, request, *args, **kwargs):
+        """
+        Context keyword arguments for `form_class`: the parent objects, plus the user
+        if the form takes it, filtered to the keys the form declares.
+        """
+        plan = self.get_view_plan()
+        form_context = self.get_form_context(request, *args, **kwargs) # Pass request/kwargs
+
+        # Add user if form expects it (its __init__ signature or `required_context`);
+        # resolved once per class in the view plan.
+        if plan.form_takes_user:
+            form_context['user'] = request.user
+
+        # Only pass the context the form declares (`required_context`, or its __init__ params)
+        return {
+            key: value for key, value in form_context.items() if key in plan.form_context_keys
+        }
+
     def get_form_context(self, request, *args, **kwargs):
         """
         Get parent objects for form initialization, ensuring ownership chain.
+
+        The chain (FKs between parents, ownership field of the top-level parent)
+        comes from the precompiled view plan; only the ids are filled in here.
         """
-        context = {}
-        parent_objects_so_far = {}
+        plan = self.get_view_plan()
+        if plan.top_level_unowned is not None:
+            raise ImproperlyConfigured(
+                f"Top-level parent {plan.top_level_unowned.model.__name__} in {self.__class__.__name__} "
+                f"requires a '{self.owner_field}' field for ownership check."
+            )
 
-        for param_name, parent_model in self.parent_models:
-            parent_lookup_url_kwarg = f'{param_name}_id'
-            parent_id = kwargs.get(parent_lookup_url_kwarg)
+        context = {}
+        for link in plan.parents:
+            parent_id = kwargs.get(link.url_kwarg)
             if parent_id is None:
-                raise Http404(f"URL Configuration Error: Missing '{parent_lookup_url_kwarg}' in URL for POST request.")
+                raise Http404(f"URL Configuration Error: Missing '{link.url_kwarg}' in URL for POST request.")
 
-            parent_qs = parent_model.objects
             current_parent_lookup_filters = {'id': parent_id}
-
             # Check relationship to previously fetched parents
-            for prev_param, prev_model in self.parent_models:
-                 if prev_param == param_name: break
-                 try:
-                     fk_field = parent_model._meta.get_field(prev_param)
-                     if fk_field.is_relation and fk_field.remote_field.model == prev_model:
-                          if prev_param in parent_objects_so_far:
-                               current_parent_lookup_filters[prev_param] = parent_objects_so_far[prev_param].pk # Filter by PK
-                          else:
-                               raise ImproperlyConfigured(f"Cannot filter {parent_model.__name__} by {prev_param}: Previous parent not yet fetched.")
-                 except FieldDoesNotExist: pass
-
-            # Enforce 'Learner' ownership on the top-level parent
-            if self.parent_models and param_name == self.parent_models[0][0]:
-                 if hasattr(parent_model, 'Learner'):
-                     current_parent_lookup_filters['Learner'] = request.user
-                 else:
-                     raise ImproperlyConfigured(f"Top-level parent {parent_model.__name__} in {self.__class__.__name__} requires a 'Learner' field for ownership check.")
-
+            for prev_param, prev_path in link.prev_params:
+                current_parent_lookup_filters[prev_path] = context[prev_param].pk
+            # Enforce ownership on the top-level parent
+            if link.owner_field:
+                current_parent_lookup_filters[link.owner_field] = request.user
+
+            # The joins to the earlier parents are made for the check anyway; keeping the
+            # rows saves the queries that would otherwise follow them (e.g. in signals)
+            queryset = link.model.objects.select_related(*(prev_path for _, prev_path in link.prev_params))
             try:
-                parent_obj = get_object_or_404(parent_qs, **current_parent_lookup_filters)
-                context[param_name] = parent_obj
-                parent_objects_so_far[param_name] = parent_obj
+                context[link.param_name] = get_object_or_404(queryset, **current_parent_lookup_filters)
             except Http404:
                  raise Http404(
-                     f"Not Found or Access Denied: Parent {parent_model.__name__} with query "
+                     f"Not Found or Access Denied: Parent {link.model.__name__} with query "
                      f"{current_parent_lookup_filters} not found for form context."
                  )
             except Exception as e:
-                print(f"Error constructing filter for parent {parent_model.__name__} in get_form_context: {e}")
-                raise Http404(f"Configuration error checking parent {parent_model.__name__} for form context.")
+                logger.exception("Error constructing filter for parent %s in get_form_context", link.model.__name__)
+                raise Http404(f"Configuration error checking parent {link.model.__name__} for form context.")
 
         return context
 
 
-class BaseDetailView(APIView):
+class BaseDetailView(ReadReplicaMixin, ViewPlanMixin, APIView):
     """
     Base API view for single-instance operations (Retrieve, Update, Delete).
 
-    Retrieves the instance using a URL keyword argument dynamically generated
-    as `{model_name}_id` (e.g., `Skill_id` for a Skill model).
+    Retrieves the instance using the URL keyword argument `lookup_url_kwarg`, by
+    default generated as `{model_name}_id` (e.g., `unit_id` for a Unit model).
 
     Ensures that nested resources (like Units, Tasks) are only retrieved if
     they belong to the specific parent instance(s) indicated in the URL,
@@ -181,28 +580,52 @@ class BaseDetailView(APIView):
                        Assumes parent lookup via `{param_name}_id` in URL kwargs.
     - `lookup_field` (optional): The model field used for lookup in the database
                                   (default: 'id'). This is NOT the URL kwarg name.
+    - `lookup_url_kwarg` (optional): The URL kwarg holding the lookup value
+                                     (default: `{model_name}_id`).
+    - `owner_field` (optional): Field linking the model (or its top-level parent) to the
+                                user who owns it (default: `learner`).
+    - `conditional_get` (optional): Send a weak `ETag` (from the learner's version counter)
+                                    on GET and answer a matching `If-None-Match` with 304
+                                    without querying (default: `False`).
+    - `background_delete` (optional): For a `SoftDeleteModel`, DELETE only marks the
+                                      instance deleted, which hides it and everything
+                                      nested under it, and queues the real removal on
+                                      `core.deletion.deleter` (default: `False`).
+
+    GET accepts `?fields=` and `?expand=` like `BaseListView`; writes always use the
+    full `serializer_class`. Reads are routed to the read replica like in `BaseListView`.
+
+    PUT/PATCH write only the changed columns. For a `VersionedModel` they are
+    compare-and-swap updates on `version` (sent back by the client, see
+    `apply_client_version`); a stale write gets 409 with the current version.
     """
-    authentication_classes = [SessionAuthentication, BasicAuthentication]
+    authentication_classes = [CachedTokenAuthentication, SessionAuthentication, BasicAuthentication]
     permission_classes = [IsAuthenticated]
     model = None
     serializer_class = None
     parent_models = []
+    owner_field = 'learner'
     lookup_field = 'id'
+    lookup_url_kwarg = None
+    conditional_get = False
+    background_delete = False
 
     def get_object(self):
         """
         Retrieve a single instance, ensuring it belongs to the specified parents
         (retrieved via URL kwargs like `{parent_name}_id`) and that the ultimate
         parentage traces back to the requesting user.
+
+        The whole ownership chain is resolved in a single query: parent constraints
+        are expressed as lookups spanning the target's foreign keys, and the parents
+        are pulled in with `select_related` so they are available on the instance
+        without extra round trips.
         """
         if not self.model:
             raise ImproperlyConfigured(f"{self.__class__.__name__} is missing the 'model' attribute.")
 
-        queryset = self.model.objects.all() # Start with all objects
-
         # --- Determine the lookup kwarg and value for the target instance ---
-        model_name_lower = self.model.__name__.lower()
-        instance_lookup_url_kwarg = f'{model_name_lower}_id'
+        instance_lookup_url_kwarg = self.lookup_url_kwarg or f'{self.model.__name__.lower()}_id'
         instance_lookup_value = self.kwargs.get(instance_lookup_url_kwarg)
         if instance_lookup_value is None:
             # Handle missing lookup value error as before
@@ -212,98 +635,132 @@ class BaseDetailView(APIView):
             if fallback_pk or fallback_id: raise Http404(...)
             else: raise Http404(...)
 
-        # --- Build filters: Start with the target object's ID ---
+        # --- Build filters: the target object's ID, its parents and its owner ---
+        # (for a view without parents, the owner filter is on the target model itself)
         filters = {self.lookup_field: instance_lookup_value}
+        filters.update(self.get_parent_chain_filters())
 
-        # --- Fetch Parent Objects Sequentially and Add to Filters ---
-        # This ensures ownership and relationship at each step
-        fetched_parents_context = {} # Store {'Skill': <Skill obj>} for filtering Unit
-
-        for param_name, parent_model in self.parent_models:
-            parent_lookup_url_kwarg = f'{param_name}_id'
-            parent_id = self.kwargs.get(parent_lookup_url_kwarg)
-            if parent_id is None:
-                raise Http404(f"URL Config Error: Missing '{parent_lookup_url_kwarg}' for {parent_model.__name__}.")
-
-            parent_qs = parent_model.objects
-            current_parent_lookup_filters = {'id': parent_id}
-
-            # --- Add relationship constraint to *previously* fetched parent ---
-            for prev_param, prev_model in self.parent_models:
-                if prev_param == param_name: break
-                try:
-                    fk_field = parent_model._meta.get_field(prev_param)
-                    if fk_field.is_relation and fk_field.remote_field.model == prev_model:
-                        if prev_param in fetched_parents_context:
-                            # Filter by the actual parent object already validated
-                            current_parent_lookup_filters[prev_param] = fetched_parents_context[prev_param]
-                        else: raise ImproperlyConfigured(...)
-                except FieldDoesNotExist: pass
-
-            # --- Add ownership constraint if this is the top-level parent ---
-            if self.parent_models and param_name == self.parent_models[0][0]:
-                if hasattr(parent_model, 'Learner'):
-                    current_parent_lookup_filters['Learner'] = self.request.user
-                else: raise ImproperlyConfigured(...)
-
-            try:
-                # Fetch the parent securely
-                parent_obj = get_object_or_404(parent_qs, **current_parent_lookup_filters)
-                # Add the fetched parent object directly to the main filters for the target lookup
-                filters[param_name] = parent_obj
-                # Store context for the *next* parent lookup
-                fetched_parents_context[param_name] = parent_obj
-            except Http404:
-                 raise Http404(f"Not Found/Access Denied: Parent {parent_model.__name__} query {current_parent_lookup_filters} failed.")
-            except Exception as e:
-                 print(f"Error fetching parent {parent_model.__name__} in get_object: {e}")
-                 raise Http404(f"Config error accessing parent {parent_model.__name__}.")
-
-        # --- Add Ownership Filter for Non-Nested Detail Views (e.g., SkillDetailView) ---
-        # If there are no parents, check if the target model itself should be owned by the Learner
-        if not self.parent_models and hasattr(self.model, 'Learner'):
-            filters['Learner'] = self.request.user # Add the Learner filter directly
+        # Parents are joined for the filters anyway, so they can ride along in the same query.
+        # Columns are not restricted: the instance may be saved back by put()/patch().
+        queryset = self.model.objects.select_related(*(link.path for link in self.get_view_plan().parents))
+        queryset = self.get_query_plan().apply(queryset, restrict_columns=False)
 
         # --- Retrieve the Target Object using combined filters ---
         try:
-            # Example for TaskDetailView: Task.objects.get(id=task_id, unit=<Unit obj>, Skill=<Skill obj>)
-            # Example for SkillDetailView: Skill.objects.get(id=Skill_id, Learner=request.user)
+            # Example for TaskDetailView:
+            #   Task.objects.select_related('unit__skill_reason_pair__skill', 'unit').get(
+            #       id=task_id, unit__skill_reason_pair__skill__id=Skill_id,
+            #       unit__skill_reason_pair__skill__learner=request.user, unit__id=unit_id)
+            # Example for SkillDetailView: Skill.objects.get(id=Skill_id, learner=request.user)
             obj = get_object_or_404(queryset, **filters)
         except Http404:
-             denied_filters = {k:getattr(v, 'pk', v) for k,v in filters.items() if k != self.lookup_field}
+             denied_filters = {k: getattr(v, 'pk', v) for k, v in filters.items() if k != self.lookup_field}
              raise Http404(
                  f"Not Found/Access Denied: {self.model.__name__} with {self.lookup_field}={instance_lookup_value} "
                  f"matching criteria {denied_filters} not found."
              )
         except (FieldError, TypeError, ValueError) as e:
-             print(f"Error during final lookup for {self.model.__name__}. Filters: {filters}. Error: {e}")
+             logger.warning("Error during final lookup for %s. Filters: %s. Error: %s", self.model.__name__, filters, e)
              raise Http404(f"Invalid lookup params/model field mismatch for {self.model.__name__}.")
 
         self.check_object_permissions(self.request, obj) # Standard DRF permissions
         return obj
 
+    def get_parent_chain_filters(self):
+        """
+        Translate `parent_models` and the URL kwargs into lookups on the target model.
+
+        For a task under `[('Skill', Skill), ('unit', Unit)]` this yields
+        `{'unit__skill_reason_pair__skill__id': ...,
+        'unit__skill_reason_pair__skill__learner': user, 'unit__id': ...}`, i.e. the
+        same ownership and relationship checks the parents used to be fetched with one
+        by one, now joined into the target lookup. Without parents it is the owner filter
+        on the model itself (`{'learner': user}`). The lookup names are precompiled in
+        the view plan; only the values are filled in here.
+        """
+        return self.get_view_plan().fill_parent_filters(self.kwargs, self.request.user)
+
+    def get_serializer_class(self):
+        """`serializer_class`, narrowed by `?fields=`/`?expand=` on reads (see `core.fieldsets`)."""
+        if self.request.method not in SAFE_METHODS:
+            return self.serializer_class
+        return serializer_for_request(self.serializer_class, self.request.query_params)
+
+    def get_query_plan(self):
+        """The `select_related`/`prefetch_related` plan derived from the serializer class."""
+        return plan_for_serializer(self.get_serializer_class())
+
     # --- get(), put(), patch(), delete() methods remain the same ---
     def get(self, request, *args, **kwargs):
+        etag = make_response_etag(self, request) if self.conditional_get else None
+        if etag and etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag, 'Vary': 'Accept'})
+
         instance = self.get_object()
-        serializer = self.serializer_class(instance, context={'request': request})
-        return Response(serializer.data)
+        serializer = self.get_serializer_class()(instance, context={'request': request})
+        with timed_serialization():
+            data = serializer.data
+        headers = {'ETag': etag, 'Vary': 'Accept'} if etag else None
+        return Response(data, headers=headers)
 
     def put(self, request, *args, **kwargs):
-        instance = self.get_object()
-        serializer = self.serializer_class(instance, data=request.data, context={'request': request, 'view': self})
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
-        return Response(serializer.data)
+        return self.update(request, partial=False)
 
     def patch(self, request, *args, **kwargs):
+        return self.update(request, partial=True)
+
+    def update(self, request, partial):
         instance = self.get_object()
-        serializer = self.serializer_class(instance, data=request.data, partial=True, context={'request': request, 'view': self})
+        serializer = self.serializer_class(
+            instance, data=request.data, partial=partial, context={'request': request, 'view': self}
+        )
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        try:
+            errors = apply_client_version(instance, request.data)
+            if errors:
+                return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+            self.perform_update(serializer)
+        except StaleVersionError as e:
+            return Response(conflict_response_data(e), status=status.HTTP_409_CONFLICT)
         return Response(serializer.data)
 
+    def perform_update(self, serializer):
+        """
+        Write the fields that changed, and only those (`save(update_fields=...)`).
+
+        For a `VersionedModel` the write is a compare-and-swap on `version`, which
+        raises `StaleVersionError` (answered with 409) if the row changed since the
+        client read it. Nothing is written when no field changed.
+        """
+        instance = serializer.instance
+        changed = changed_fields(instance, serializer.validated_data)
+        if changed:
+            instance.save(update_fields=changed)
+
     def delete(self, request, *args, **kwargs):
         instance = self.get_object()
-        instance.delete()
+        try:
+            self.perform_destroy(instance)
+        except StaleVersionError as e:
+            return Response(conflict_response_data(e), status=status.HTTP_409_CONFLICT)
+        except ProtectedError as e:
+            return Response(protected_response_data(e), status=status.HTTP_409_CONFLICT)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    def perform_destroy(self, instance):
+        """
+        Delete inline, or mark deleted and purge in the background (`background_delete`).
+
+        Marking a `VersionedModel` deleted is an update, checked against the version
+        read by `get_object()`: it raises `StaleVersionError` (answered with 409) if a
+        concurrent write got there first. An inline delete of a row that `PROTECT`ed
+        rows still refer to (e.g. a unit with tasks) raises `ProtectedError`, also
+        answered with 409.
+        """
+        if self.background_delete and isinstance(instance, SoftDeleteModel):
+            with transaction.atomic():
+                instance.mark_deleted()
+                deleter.submit(type(instance), instance.pk)
+        else:
+            instance.delete()
+
@@ -0,0 +1,109 @@
+import hashlib
+import threading
+import time
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.http import parse_etags
+
+
+LEARNER_VERSION_KEY = 'learner-version:{}'
+
+
+def get_learner_version(user_id):
+    """
+    Current data version of a learner, bumped on every write to their objects.
+
+    A missing counter (first use, eviction, cache restart) is seeded from the clock,
+    so a re-created counter never repeats a value handed out earlier.
+    """
+    key = LEARNER_VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_learner_version(user_id):
+    """Invalidate everything cached for a learner by moving their version forward."""
+    key = LEARNER_VERSION_KEY.format(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def bump_learner_version_on_commit(user_id):
+    """
+    Bump once the surrounding transaction commits (immediately in autocommit mode).
+
+    Bumping earlier would let a concurrent read cache pre-commit data under the
+    new version.
+    """
+    transaction.on_commit(lambda: bump_learner_version(user_id))
+
+
+def make_response_cache_key(view, request):
+    """Cache key for a GET response of `view`, scoped to the user's current version."""
+    user_id = request.user.pk
+    digest = hashlib.md5(f'{request.get_host()}{request.get_full_path()}'.encode()).hexdigest()
+    return f'api-response:{view.__class__.__name__}:{user_id}:{get_learner_version(user_id)}:{digest}'
+
+
+def make_response_etag(view, request):
+    """
+    Weak ETag for a GET response of `view`, computed without touching the database.
+
+    Derived from the learner's version, so it changes on any write to their data, and
+    from the host, the full path (query string included, so e.g. `?fields=` gets its
+    own tag) and the negotiated media type, since the same URL can be rendered as
+    JSON or as the browsable API. Responses carrying it should `Vary: Accept`.
+    """
+    user_id = request.user.pk
+    media_type = getattr(request, 'accepted_media_type', '')
+    digest = hashlib.md5(
+        f'{view.__class__.__name__}:{user_id}:{get_learner_version(user_id)}:'
+        f'{request.get_host()}{request.get_full_path()}:{media_type}'.encode()
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(request, etag):
+    """Whether the request's `If-None-Match` header matches `etag` (weak comparison)."""
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    candidates = parse_etags(header)
+    if '*' in candidates:
+        return True
+    return etag.removeprefix('W/') in {candidate.removeprefix('W/') for candidate in candidates}
+
+
+class CacheStats:
+    """Thread-safe hit/miss counters of the response cache, per view class."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+
+    def record(self, view_name, hit):
+        with self._lock:
+            self._counts[(view_name, 'hits' if hit else 'misses')] += 1
+
+    def snapshot(self):
+        """`{view_name: {'hits': n, 'misses': n}}`"""
+        with self._lock:
+            counts = dict(self._counts)
+        stats = {}
+        for (view_name, outcome), count in counts.items():
+            stats.setdefault(view_name, {'hits': 0, 'misses': 0})[outcome] = count
+        return stats
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+cache_stats = CacheStats()
@@ -0,0 +1,154 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+
+PRIMARY_PIN_KEY = 'db-primary-pin:{}'
+
+# Alias reads are sent to for the current request (None: the primary)
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def get_replica_alias():
+    """The database alias safe-method API reads go to, or `None` when no replica is set up."""
+    return getattr(settings, 'API_READ_REPLICA', None)
+
+
+@contextmanager
+def read_from(alias):
+    """Send the reads made inside the block to `alias` (`None` for the primary)."""
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def stream_reads_from(alias, iterable, asynchronous=False):
+    """
+    Iterate `iterable`, a streamed response body, with its reads sent to `alias`.
+
+    The body is produced after the view has returned, outside of `ReadReplicaMixin`'s
+    scope. With `asynchronous` (for requests served over ASGI) this returns an async
+    iterator that runs one step of `iterable` at a time in the request's thread;
+    Django would otherwise read a sync body to its end with `sync_to_async(list)`
+    before sending any of it. Every step runs in a copy of the context there, so the
+    alias is set around each step rather than once.
+    """
+    if asynchronous:
+        return _async_reads_from(alias, iter(iterable))
+    return _sync_reads_from(alias, iterable)
+
+
+def _sync_reads_from(alias, iterable):
+    with read_from(alias):
+        yield from iterable
+
+
+async def _async_reads_from(alias, iterator):
+    exhausted = object()
+
+    def step():
+        with read_from(alias):
+            return next(iterator, exhausted)
+
+    step = sync_to_async(step, thread_sensitive=True)
+    try:
+        while (item := await step()) is not exhausted:
+            yield item
+    finally:
+        # Also when the client went away: releases the server-side cursors of the body
+        if hasattr(iterator, 'close'):
+            await sync_to_async(iterator.close, thread_sensitive=True)()
+
+
+def pin_to_primary(user_id):
+    """
+    Keep a user's reads on the primary for `API_REPLICA_PIN_SECONDS`.
+
+    Called after each of their writes, so they read their own writes while the
+    replica catches up. The window should be longer than the usual replication lag.
+    """
+    cache.set(PRIMARY_PIN_KEY.format(user_id), True, getattr(settings, 'API_REPLICA_PIN_SECONDS', 5))
+
+
+def is_pinned_to_primary(user_id):
+    return cache.get(PRIMARY_PIN_KEY.format(user_id)) is not None
+
+
+def read_alias_for(request):
+    """The alias `request`'s reads should use: the replica for safe methods of unpinned users."""
+    alias = get_replica_alias()
+    if alias is None or request.method not in SAFE_METHODS:
+        return None
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated and is_pinned_to_primary(user.pk):
+        return None
+    return alias
+
+
+class ReplicaRouter:
+    """
+    Database router sending reads to the alias chosen for the current request.
+
+    Views opt in with `ReadReplicaMixin`, which picks the replica for safe-method
+    requests (see `read_alias_for`); everything else, and every write, goes to the
+    primary (`default`). Once a request writes (or locks rows with
+    `select_for_update`), its remaining reads go to the primary as well. Enabled by listing it in `DATABASE_ROUTERS` and setting
+    `API_READ_REPLICA` to a configured alias.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        # The rest of the request reads its own write, which the replica may not have yet.
+        # Reset with the rest of the context by `read_from`/`ReadReplicaMixin`.
+        if _read_alias.get() is not None:
+            _read_alias.set(None)
+        # Explicit, otherwise Django would save an instance back to the replica it was read from
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        aliases = {DEFAULT_DB_ALIAS, get_replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+
+class ReadReplicaMixin:
+    """
+    Route the reads of safe-method requests to the read replica (DRF views).
+
+    The alias is chosen once the request is authenticated, so a user who has
+    written within the pin window keeps reading from the primary. Requests with
+    unsafe methods read and write on the primary, and pin the user once they are
+    done.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        alias = read_alias_for(request)
+        if alias is not None:
+            self._read_alias_token = _read_alias.set(alias)
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            # Also on errors: the context outlives the request in a reused worker thread
+            token = getattr(self, '_read_alias_token', None)
+            if token is not None:
+                _read_alias.reset(token)
+                self._read_alias_token = None
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if request.method not in SAFE_METHODS and request.user.is_authenticated:
+            pin_to_primary(request.user.pk)
+        return super().finalize_response(request, response, *args, **kwargs)
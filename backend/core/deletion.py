@@ -0,0 +1,86 @@
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, connections, router, transaction
+
+
+logger = logging.getLogger(__name__)
+
+
+def delete_in_batches(queryset, batch_size=None):
+    """
+    Delete the rows of `queryset` with raw `DELETE ... WHERE id IN (...)` statements.
+
+    Ids are read `batch_size` at a time and each batch is deleted in its own short
+    transaction, so locks are held briefly and memory stays flat. Both run on the
+    model's write database (the primary, with `core.db_routers` active). Bypasses
+    the cascade collector and delete signals: delete the dependent rows first.
+    Returns the number of rows deleted.
+    """
+    batch_size = batch_size or getattr(settings, 'API_PURGE_BATCH_SIZE', 1000)
+    model = queryset.model
+    using = router.db_for_write(model)
+    connection = connections[using]
+    table = connection.ops.quote_name(model._meta.db_table)
+    pk = connection.ops.quote_name(model._meta.pk.column)
+    ids = queryset.using(using).order_by().values_list('pk', flat=True)
+    deleted = 0
+    while batch := list(ids[:batch_size]):
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {table} WHERE {pk} IN ({", ".join(["%s"] * len(batch))})', batch)
+            deleted += cursor.rowcount
+    return deleted
+
+
+class BackgroundDeleter:
+    """
+    Worker thread purging `SoftDeleteModel` rows after they are marked deleted.
+
+    `submit()` only queues the row, so a request deleting a large tree returns
+    as fast as one deleting a single row. Jobs run one at a time in a daemon
+    thread started on first use; a job lost with the process (restart, crash) is
+    picked up by `manage.py purge_deleted`, which purges every marked row.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, model, pk):
+        """Purge `model` row `pk` once the surrounding transaction commits."""
+        transaction.on_commit(lambda: self._enqueue(model, pk))
+
+    def _enqueue(self, model, pk):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='background-deleter', daemon=True)
+                self._thread.start()
+        self._queue.put((model, pk))
+
+    def _run(self):
+        while True:
+            model, pk = self._queue.get()
+            try:
+                purge(model, pk)
+            except Exception:
+                logger.exception("Background purge of %s %s failed", model.__name__, pk)
+            finally:
+                close_old_connections()
+                self._queue.task_done()
+
+    def join(self):
+        """Wait until the queued purges are done (commands, tests)."""
+        self._queue.join()
+
+
+def purge(model, pk):
+    """Purge a marked row of `model`; does nothing if it is gone or no longer marked."""
+    instance = model.all_objects.filter(pk=pk, deleted_at__isnull=False).first()
+    if instance is not None:
+        instance.purge()
+
+
+deleter = BackgroundDeleter()
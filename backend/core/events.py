@@ -0,0 +1,140 @@
+"""
+Per-learner change events, pushed to clients over server-sent events (`ChangeStreamView`).
+
+Writes publish small events such as
+`{"model": "task", "id": 12, "action": "updated", "fields": ["done"]}` on the
+learner's channel once their transaction commits; `fields` is `null` when the
+whole row was written (creates, full saves) and for deletes. Clients subscribe
+once and refetch what changed instead of polling the list endpoints.
+
+Events go through the broker named by the `API_EVENT_BROKER` setting (default:
+`InProcessBroker`). A broker provides:
+
+- `publish(channel, message)`: callable from any thread, never blocks.
+- `subscribe(channel)`: async context manager yielding a subscription with
+  `await get(timeout)` (a message, or `None` on timeout) and an `overflowed`
+  flag, set when messages were dropped because the subscriber fell behind.
+
+The in-process broker only reaches subscribers served by the same process, so
+with several ASGI workers swap it for one backed by a shared broker (e.g. Redis
+pub/sub or PostgreSQL LISTEN/NOTIFY) with the same interface.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+LEARNER_CHANNEL = 'learner:{}'
+
+
+class Subscription:
+    """Bounded queue of the messages of one subscriber, fed from any thread."""
+
+    def __init__(self, max_size):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(max_size)
+        self.overflowed = False
+
+    def put(self, message):
+        try:
+            self.loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            pass  # The subscriber's event loop is gone
+
+    def _put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout=None):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def clear(self):
+        """Drop the queued messages and the overflow flag (after telling the client to resync)."""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.overflowed = False
+
+
+class InProcessBroker:
+    """
+    Pub/sub between the threads and event loop of one process.
+
+    Each subscriber gets a queue of at most `max_queue_size` messages; a
+    subscriber that falls further behind loses messages and is flagged
+    `overflowed` rather than slowing down publishers.
+    """
+
+    def __init__(self, max_queue_size=256):
+        self.max_queue_size = max_queue_size
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.put(message)
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        subscription = Subscription(self.max_queue_size)
+        with self._lock:
+            self._subscriptions[channel].add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                self._subscriptions[channel].discard(subscription)
+                if not self._subscriptions[channel]:
+                    del self._subscriptions[channel]
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    """The broker instance named by `API_EVENT_BROKER`, created once per process."""
+    return import_string(getattr(settings, 'API_EVENT_BROKER', 'core.events.InProcessBroker'))()
+
+
+def learner_channel(user_id):
+    return LEARNER_CHANNEL.format(user_id)
+
+
+def change_event(model, pk, action, fields=None):
+    """`{"model", "id", "action", "fields"}` for a created/updated/deleted row of `model`."""
+    return {
+        'model': model._meta.model_name,
+        'id': pk,
+        'action': action,
+        'fields': sorted(fields) if fields is not None else None,
+    }
+
+
+def publish_on_commit(user_id, events):
+    """
+    Publish `events` on a learner's channel once the surrounding transaction commits.
+
+    Publishing earlier could send clients refetching before the change is visible,
+    or announce a change that is then rolled back.
+    """
+    events = list(events)
+    if not events:
+        return
+    channel = learner_channel(user_id)
+
+    def publish():
+        broker = get_broker()
+        for event in events:
+            broker.publish(channel, event)
+
+    transaction.on_commit(publish)
@@ -0,0 +1,97 @@
+from functools import lru_cache
+
+from rest_framework import exceptions, serializers
+
+
+FIELDS_QUERY_PARAM = 'fields'
+EXPAND_QUERY_PARAM = 'expand'
+
+
+def serializer_for_request(serializer_class, query_params):
+    """
+    Return `serializer_class` narrowed by the request's `?fields=` and `?expand=`.
+
+    Both take comma-separated top-level field names:
+
+    - `fields`: Only these fields are rendered (default: all of them).
+    - `expand`: Only these nested serializers are rendered; the others are dropped
+                (default: all the selected ones). Fields named here are rendered
+                even when `fields` doesn't list them.
+
+    e.g. `?fields=id,name` renders skills without `units` or `Learner`, and
+    `?fields=name&expand=units` adds the units back. Unknown names are refused
+    with a `ValidationError` (400). Without either parameter, or when every field
+    is kept, `serializer_class` itself is returned.
+    """
+    fields = _parse(query_params.get(FIELDS_QUERY_PARAM))
+    expand = _parse(query_params.get(EXPAND_QUERY_PARAM))
+    if fields is None and expand is None:
+        return serializer_class
+
+    names = _field_names(serializer_class)
+    unknown = {
+        param: [f"Unknown field: {name}." for name in sorted(value - names)]
+        for param, value in ((FIELDS_QUERY_PARAM, fields), (EXPAND_QUERY_PARAM, expand))
+        if value is not None and value - names
+    }
+    if unknown:
+        raise exceptions.ValidationError(unknown)
+
+    # Requests are reduced to the set of fields kept, so there is at most one
+    # class per subset of a serializer's fields, whatever the query strings
+    nested = _nested_field_names(serializer_class)
+    keep = frozenset(
+        name for name in names
+        if (fields is None or name in fields or (expand is not None and name in expand))
+        and not (name in nested and expand is not None and name not in expand)
+    )
+    if keep == names:
+        return serializer_class
+    return sparse_serializer(serializer_class, keep)
+
+
+@lru_cache(maxsize=None)
+def sparse_serializer(serializer_class, keep):
+    """
+    Return a cached subclass of `serializer_class` rendering only the fields in `keep`.
+
+    The subclass drops fields in `get_fields()`, before any field is bound, so
+    `plan_for_serializer` never sees them: the joins and prefetches that only fed
+    dropped nested serializers are not part of its query plan.
+
+    The cache is unbounded on purpose: `keep` is a frozenset of the serializer's
+    own field names, so it holds at most one class per subset of them, and an
+    evicted class would only be rebuilt as a new key of the (equally unbounded)
+    query plan caches.
+    """
+    def get_fields(self):
+        return {name: field for name, field in super(sparse, self).get_fields().items() if name in keep}
+
+    sparse = type(serializer_class.__name__, (serializer_class,), {
+        '__module__': serializer_class.__module__,
+        '__qualname__': serializer_class.__qualname__,
+        'get_fields': get_fields,
+    })
+    return sparse
+
+
+def _parse(value):
+    if not value:
+        return None
+    return frozenset(name.strip() for name in value.split(',') if name.strip())
+
+
+@lru_cache(maxsize=None)
+def _field_names(serializer_class):
+    return frozenset(serializer_class().fields)
+
+
+@lru_cache(maxsize=None)
+def _nested_field_names(serializer_class):
+    names = set()
+    for name, field in serializer_class().fields.items():
+        if isinstance(field, serializers.ListSerializer):
+            field = field.child
+        if isinstance(field, serializers.BaseSerializer):
+            names.add(name)
+    return frozenset(names)
@@ -0,0 +1,78 @@
+"""
+Password hashing across worker processes, for creating many accounts at once.
+
+Kept free of model imports: spawned workers import this module before Django is
+set up.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+
+
+def _setup_worker():
+    # Spawned workers start from a fresh interpreter
+    django.setup()
+
+
+_pool = None  # (workers, ProcessPoolExecutor)
+_pool_lock = threading.Lock()
+
+
+def get_pool(workers):
+    """
+    The process pool of `workers` hashing processes, started on first use and then
+    kept for the life of the process, so each call doesn't pay for spawning workers
+    and setting Django up in them.
+
+    There is one pool per process, sized by the configured worker count: asking
+    for another size shuts the current pool down first.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool[0] != workers:
+            _pool[1].shutdown(wait=False, cancel_futures=True)
+            _pool = None
+        if _pool is None:
+            _pool = (workers, ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context('spawn'), initializer=_setup_worker,
+            ))
+        return _pool[1]
+
+
+def _discard_pool(pool):
+    """Shut `pool` down and forget it, if it is still the current one."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool[1] is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def hash_passwords(passwords, workers=None):
+    """
+    `make_password` of each password, in input order, spread over `workers`
+    processes (default: `API_PROVISIONING_WORKERS`, else one per CPU).
+
+    The hashers are CPU-bound by design, so threads wouldn't help. Workers are
+    spawned rather than forked, since forking a multi-threaded web worker can
+    deadlock the child.
+    """
+    passwords = list(passwords)
+    workers = workers or getattr(settings, 'API_PROVISIONING_WORKERS', None) or os.cpu_count() or 1
+    if workers <= 1 or len(passwords) <= 1:
+        return [make_password(password) for password in passwords]
+    pool = get_pool(workers)
+    # Small batches just submit fewer chunks; the pool keeps its configured size
+    chunksize = -(-len(passwords) // (min(workers, len(passwords)) * 4))
+    try:
+        return list(pool.map(make_password, passwords, chunksize=chunksize))
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); start a fresh pool next time
+        _discard_pool(pool)
+        raise
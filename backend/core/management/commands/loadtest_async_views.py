@@ -0,0 +1,79 @@
+import asyncio
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient
+from django.urls import NoReverseMatch, reverse
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test a sync base view against its async counterpart (URL name prefixed "
+        "with 'async-') through the in-process ASGI handler, and compare throughput "
+        "and latency. Requests run against the configured database as USERNAME."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('url_name', help="Sync URL name, e.g. 'tasks' (compared with 'async-tasks').")
+        parser.add_argument('--username', required=True, help="User the requests are made as.")
+        parser.add_argument('--kwargs', nargs='*', default=[], metavar='NAME=VALUE',
+                            help="URL kwargs, e.g. Skill_id=1 unit_id=2.")
+        parser.add_argument('--requests', type=int, default=500, help="Requests per view (default: 500).")
+        parser.add_argument('--concurrency', type=int, default=50, help="Requests in flight (default: 50).")
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options['username'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user named {options['username']!r}.")
+
+        url_kwargs = {}
+        for item in options['kwargs']:
+            name, _, value = item.partition('=')
+            url_kwargs[name] = int(value) if value.isdigit() else value
+
+        try:
+            urls = [
+                ('sync', reverse(options['url_name'], kwargs=url_kwargs)),
+                ('async', reverse(f"async-{options['url_name']}", kwargs=url_kwargs)),
+            ]
+        except NoReverseMatch as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            f"{'view':<8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}  url"
+        )
+        for label, url in urls:
+            elapsed, latencies, errors = asyncio.run(
+                self.run_load(user, url, options['requests'], options['concurrency'])
+            )
+            quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+            self.stdout.write(
+                f"{label:<8}{len(latencies) / elapsed:>10.1f}{quantiles[49] * 1e3:>10.1f}"
+                f"{quantiles[94] * 1e3:>10.1f}{quantiles[98] * 1e3:>10.1f}{errors:>8}  {url}"
+            )
+
+    async def run_load(self, user, url, total, concurrency):
+        client = AsyncClient()
+        await client.aforce_login(user)
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies, errors = [], 0
+
+        async def one_request():
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(url)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        await one_request()  # Warm up (view plans, query plans, connections)
+        latencies.clear()
+        errors = 0
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one_request() for _ in range(total)))
+        return time.perf_counter() - start, latencies, errors
@@ -0,0 +1,30 @@
+import datetime
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.deletion import purge
+from core.models import SoftDeleteModel
+
+
+class Command(BaseCommand):
+    help = (
+        "Purge every row marked deleted (SoftDeleteModel) that is still in the database, "
+        "e.g. because the process running the background deleter stopped. Safe to run "
+        "alongside the background deleter, and from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, default=0, metavar='MINUTES',
+                            help="Only purge rows marked at least this many minutes ago (default: 0).")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - datetime.timedelta(minutes=options['older_than'])
+        for model in apps.get_models():
+            if not issubclass(model, SoftDeleteModel):
+                continue
+            pks = list(model.all_objects.filter(deleted_at__lte=cutoff).values_list('pk', flat=True))
+            for pk in pks:
+                purge(model, pk)
+            self.stdout.write(f"Purged {len(pks)} {model._meta.verbose_name_plural}.")
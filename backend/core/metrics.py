@@ -0,0 +1,216 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.db import connections
+
+
+# Upper bounds of the histogram buckets, per metric (`+Inf` is implicit)
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+METRICS = {
+    'http_request_duration_seconds': ("Wall time of the request, per URL name.", SECONDS_BUCKETS),
+    'db_queries_per_request': ("Database queries run by the request, per URL name.", QUERY_BUCKETS),
+    'db_duration_seconds': ("Time spent in database queries by the request, per URL name.", SECONDS_BUCKETS),
+    'serialization_duration_seconds': ("Time spent serializing and rendering the response, per URL name.",
+                                       SECONDS_BUCKETS),
+    'response_size_bytes': ("Size of the response body, per URL name.", BYTES_BUCKETS),
+}
+
+# Measurements of the request being handled, if it is instrumented
+_current = ContextVar('request_stats', default=None)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram with Prometheus semantics (cumulative `le` buckets).
+
+    Memory is constant: observing a value increments one bucket, the count and
+    the sum. Windows (e.g. the last 5 minutes) are computed by the scraper with
+    `rate()`, as usual for Prometheus histograms.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """`[(le, count), ...]` including `+Inf`."""
+        total, result = 0, []
+        for bound, count in zip((*self.buckets, float('inf')), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class MetricsRegistry:
+    """Thread-safe histograms keyed by `(metric, url_name)`."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def observe(self, url_name, values):
+        """Record `{metric: value}` for one request."""
+        with self._lock:
+            for metric, value in values.items():
+                histogram = self._histograms.get((metric, url_name))
+                if histogram is None:
+                    histogram = self._histograms[(metric, url_name)] = Histogram(METRICS[metric][1])
+                histogram.observe(value)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def render_prometheus(self):
+        """The histograms in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            snapshot = {
+                key: (histogram.cumulative(), histogram.sum, histogram.count)
+                for key, histogram in self._histograms.items()
+            }
+
+        lines = []
+        for metric, (help_text, _) in METRICS.items():
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.append(f'# TYPE {metric} histogram')
+            for (name, url_name), (buckets, total, count) in sorted(snapshot.items()):
+                if name != metric:
+                    continue
+                label = f'url_name="{_escape(url_name)}"'
+                for bound, cumulative in buckets:
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{metric}_bucket{{{label},le="{le}"}} {cumulative}')
+                lines.append(f'{metric}_sum{{{label}}} {total!r}')
+                lines.append(f'{metric}_count{{{label}}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+class RequestStats:
+    """Counters of one request, filled in by the database wrapper and `timed_serialization`."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialization_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper() hook
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+
+
+@contextmanager
+def timed_serialization():
+    """Count the block as serialization time of the current request (no-op when not instrumented)."""
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.serialization_time += time.perf_counter() - start
+
+
+class RequestMetricsMiddleware:
+    """
+    Record per-URL-name histograms of every request into `registry`.
+
+    Measures wall time, query count and time (through `connection.execute_wrapper`
+    on each configured database), serialization time (blocks wrapped in
+    `timed_serialization`, e.g. `FastJSONRenderer.render`) and response size. The
+    cost is a few `perf_counter()` calls per query and a lock per request. Requests
+    that don't resolve to a named URL are recorded as `unresolved`. Streaming
+    responses are measured up to the point they are returned; their size is not
+    recorded.
+
+    Metrics are kept per process; each worker is scraped (or its metrics summed)
+    separately.
+
+    Runs natively under both WSGI and ASGI, so the async views and event stream are
+    not adapted through a thread for its sake; the async path only hops to the
+    request's thread to install and remove the query wrappers.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            with _count_queries(stats):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, response, stats, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        # Queries run on the request's thread-sensitive thread (sync views, sync_to_async,
+        # the async ORM), so that thread's connections are the ones to wrap
+        queries = await sync_to_async(_count_queries)(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(queries.close)()
+            _current.reset(token)
+        self.record(request, response, stats, time.perf_counter() - start)
+        return response
+
+    def record(self, request, response, stats, wall_time):
+        match = getattr(request, 'resolver_match', None)
+        url_name = (match.view_name if match is not None else None) or 'unresolved'
+        values = {
+            'http_request_duration_seconds': wall_time,
+            'db_queries_per_request': stats.queries,
+            'db_duration_seconds': stats.db_time,
+            'serialization_duration_seconds': stats.serialization_time,
+        }
+        if not response.streaming:
+            values['response_size_bytes'] = len(response.content)
+        registry.observe(url_name, values)
+
+
+def _count_queries(stats):
+    """Send the queries of this thread's connections through `stats` until the returned stack is closed."""
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(stats))
+    return stack
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -1,3 +1,97 @@
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models import F
+from django.utils import timezone
 
-# Create your models here.
+
+class StaleVersionError(Exception):
+    """A versioned row was changed by someone else since it was read."""
+
+    def __init__(self, instance, current_version):
+        self.instance = instance
+        self.current_version = current_version
+        super().__init__(
+            f"{type(instance).__name__} {instance.pk} is at version {current_version}, "
+            f"not {instance.version}."
+        )
+
+
+class VersionedModel(models.Model):
+    """
+    Abstract model with optimistic concurrency control.
+
+    Every update of an existing row is a compare-and-swap on `version`:
+    `UPDATE ... SET ..., version = version + 1 WHERE id = %s AND version = %s`,
+    with the version the instance was read at (or set to, e.g. from a client).
+    If another write got there first, `save()` raises `StaleVersionError` instead
+    of overwriting it; nothing is locked while the caller works on the instance.
+
+    Combine with `save(update_fields=...)` to write only the columns that changed.
+    Bulk writes (`QuerySet.update()`) bypass the check and must bump `version`
+    themselves, as `BaseListView`'s bulk PATCH does.
+    """
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        if self._state.adding or not transaction.get_connection(using).in_atomic_block:
+            return super().save(*args, **kwargs)
+        # An error in save() breaks the surrounding transaction; a StaleVersionError is an
+        # outcome callers handle, so it is raised out of a savepoint that can be rolled back
+        with transaction.atomic(using=using):
+            return super().save(*args, **kwargs)
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        version_field = self._meta.get_field('version')
+        expected = self.version
+        values = [value for value in values if value[0] is not version_field]
+        values.append((version_field, None, F('version') + 1))
+        if super()._do_update(
+            base_qs.filter(version=expected), using, pk_val, values, update_fields, forced_update
+        ):
+            self.version = expected + 1
+            return True
+
+        current = base_qs.filter(pk=pk_val).values_list('version', flat=True).first()
+        if current is not None:
+            raise StaleVersionError(self, current)
+        return False  # Deleted meanwhile: save() reports or inserts as usual
+
+
+class LiveManager(models.Manager):
+    """Default manager of a `SoftDeleteModel`: rows that aren't marked deleted."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
+class SoftDeleteModel(models.Model):
+    """
+    Abstract model whose rows can be deleted in the background.
+
+    `mark_deleted()` sets `deleted_at`, which hides the row (and, through the view
+    plans, everything nested under it) from `objects` and the base views right
+    away; `purge()` removes it for good later, from `core.deletion`'s worker or
+    `manage.py purge_deleted`. `all_objects` still sees marked rows. Related
+    lookups use the base manager, so they see marked rows too.
+
+    Subclasses with large dependent trees override `purge()` to delete them in
+    batches instead of through the cascade collector.
+    """
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = LiveManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        abstract = True
+
+    def mark_deleted(self):
+        self.deleted_at = timezone.now()
+        self.save(update_fields=['deleted_at'])
+
+    def purge(self):
+        """Delete the row and what depends on it (by default through the ORM cascade)."""
+        self.delete()
@@ -0,0 +1,35 @@
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination used by `BaseListView`.
+
+    Pages are fetched with `WHERE <first ordering field> > <value at the cursor>`
+    and a LIMIT instead of an OFFSET into the whole collection, so the cost of a page
+    does not grow with how deep the client has paged. This is DRF's `CursorPagination`:
+    the cursor holds the first ordering field's value plus an offset past the rows
+    sharing that value. Later ordering fields only sort; they are not part of the
+    cursor and do not break ties in it. Order on a unique field, or one close to
+    unique, for stable and cheap pages.
+
+    Query Parameters:
+    - `limit`: Page size (defaults to `page_size`, capped at `max_page_size`).
+    - `cursor`: Opaque cursor taken from the `next`/`previous` links of a previous page.
+
+    The ordering defaults to `id` and can be changed per view through the view's
+    `ordering` attribute. DRF only reads a view's ordering through `OrderingFilter`,
+    which would also let clients reorder with `?ordering=`; the base views have no
+    filter backends, so `get_ordering` reads the attribute directly instead.
+    """
+    page_size = 50
+    page_size_query_param = 'limit'
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    ordering = 'id'
+
+    def get_ordering(self, request, queryset, view):
+        view_ordering = getattr(view, 'ordering', None)
+        if view_ordering:
+            return (view_ordering,) if isinstance(view_ordering, str) else tuple(view_ordering)
+        return super().get_ordering(request, queryset, view)
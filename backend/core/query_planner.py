@@ -0,0 +1,257 @@
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import Prefetch
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+
+class QueryPlan:
+    """
+    The `select_related`/`prefetch_related`/`only()` calls a serializer needs.
+
+    Built once per serializer class by `plan_for_serializer` and applied to the
+    querysets handed to that serializer, so nested and related fields are loaded
+    up front instead of one query per row.
+
+    Attributes:
+        select_related (tuple): Forward (and reverse one-to-one) relation paths to join.
+        prefetch_related (tuple): Lookups or `Prefetch` objects for to-many relations.
+        only (tuple or None): Columns the serializer reads, or `None` when the
+                              serializer touches something that can't be mapped to a
+                              column (properties, methods, `source='*'`, ...), in which
+                              case no columns are deferred.
+    """
+
+    def __init__(self, select_related=(), prefetch_related=(), only=None):
+        self.select_related = tuple(select_related)
+        self.prefetch_related = tuple(prefetch_related)
+        self.only = tuple(only) if only is not None else None
+
+    def apply(self, queryset, restrict_columns=True, extra_columns=()):
+        """
+        Apply the plan to `queryset`.
+
+        Args:
+            restrict_columns (bool): Whether to apply `only()`. Detail views that go on to
+                                     save the instance should pass `False`.
+            extra_columns (iterable): Columns that must be loaded on top of the ones the
+                                      serializer reads (e.g. the pagination ordering key).
+        """
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if restrict_columns and self.only is not None:
+            queryset = queryset.only(*self.only, *extra_columns)
+        return queryset
+
+    def __repr__(self):
+        return (
+            f"QueryPlan(select_related={self.select_related!r}, "
+            f"prefetch_related={self.prefetch_related!r}, only={self.only!r})"
+        )
+
+
+@lru_cache(maxsize=None)
+def plan_for_serializer(serializer_class):
+    """
+    Return the cached `QueryPlan` for a `ModelSerializer` class.
+
+    Walks the serializer's fields once, following nested serializers and related
+    fields to the model relations they read from. Serializers without a model
+    (plain `Serializer`) get an empty plan.
+    """
+    model = getattr(getattr(serializer_class, 'Meta', None), 'model', None)
+    if model is None:
+        return QueryPlan()
+    select_related, prefetch_related, only = _plan_fields(serializer_class(), model)
+    return QueryPlan(select_related, prefetch_related, only)
+
+
+def _plan_fields(serializer, model, prefix=''):
+    """
+    Collect `(select_related, prefetch_related, only)` for `serializer` over `model`.
+
+    Paths are prefixed with `prefix` so plans of serializers nested through forward
+    relations can be merged into their parent's plan. `only` is `None` as soon as one
+    field can't be mapped to concrete columns.
+
+    Dotted sources (`source='skillreason.units'`) are followed through to-one
+    relations, which are joined; the last attribute is then planned as usual.
+    Columns are not restricted past such a hop.
+    """
+    select_related, prefetch_related, only = [], [], []
+    columns_known = True
+
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == '*':
+            columns_known = False
+            continue
+
+        field_model, field_prefix = model, prefix
+        if len(field.source_attrs) > 1:
+            columns_known = False
+            hops = _to_one_hops(model, field.source_attrs[:-1])
+            if hops is None:
+                continue
+            for hop in hops:
+                select_related.append(f'{field_prefix}{hop.name}')
+                field_model, field_prefix = hop.related_model, f'{field_prefix}{hop.name}__'
+
+        name = field.source_attrs[-1]
+        try:
+            model_field = field_model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # Property, method or typo: nothing to plan, but we can't defer columns either
+            columns_known = False
+            continue
+
+        path = f'{field_prefix}{name}'
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        is_nested = isinstance(nested, serializers.ModelSerializer)
+        is_to_one = model_field.is_relation and (model_field.many_to_one or model_field.one_to_one)
+
+        if not model_field.is_relation:
+            only.append(path)
+        elif is_to_one:
+            if model_field.concrete:
+                only.append(path)
+            if is_nested:
+                # Join the relation and merge the nested serializer's own plan into ours
+                select_related.append(path)
+                nested_select, nested_prefetch, nested_only = _plan_fields(
+                    nested, model_field.related_model, prefix=f'{path}__'
+                )
+                select_related.extend(nested_select)
+                prefetch_related.extend(nested_prefetch)
+                if nested_only is None or not model_field.concrete:
+                    columns_known = False
+                else:
+                    only.extend(nested_only)
+            elif not _reads_pk_only(field):
+                select_related.append(path)
+                columns_known = False
+        elif is_nested:
+            prefetch_related.append(_nested_prefetch(path, model_field, nested))
+        else:
+            prefetch_related.append(path)
+
+    return select_related, prefetch_related, (only if columns_known else None)
+
+
+def _to_one_hops(model, names):
+    """The to-one relation fields named by `names`, walked from `model`, or `None`."""
+    hops = []
+    for name in names:
+        try:
+            hop = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+        if not (hop.is_relation and (hop.many_to_one or hop.one_to_one)):
+            return None
+        hops.append(hop)
+        model = hop.related_model
+    return hops
+
+
+def _nested_prefetch(path, model_field, nested):
+    """Build a `Prefetch` for a to-many relation rendered by a nested serializer."""
+    related_model = model_field.related_model
+    nested_select, nested_prefetch, nested_only = _plan_fields(nested, related_model)
+    queryset = related_model._default_manager.all()
+    if nested_select:
+        queryset = queryset.select_related(*nested_select)
+    if nested_prefetch:
+        queryset = queryset.prefetch_related(*nested_prefetch)
+    if nested_only is not None and model_field.one_to_many:
+        # The FK back to the parent is needed to attach the prefetched rows
+        queryset = queryset.only(*nested_only, model_field.field.name)
+    return Prefetch(path, queryset=queryset)
+
+
+def _reads_pk_only(field):
+    """Whether a related field renders from the FK column alone (no join needed)."""
+    if isinstance(field, serializers.ManyRelatedField):
+        field = field.child_relation
+    return isinstance(field, serializers.RelatedField) and field.use_pk_only_optimization()
+
+
+# Model fields whose `values()` output is what the matching default DRF field renders,
+# once it has been through `FastJSONRenderer` (dates are rendered as ISO 8601 there).
+# DateTimeField is left out: DRF converts it to the current time zone first.
+_VALUES_MODEL_FIELDS = (
+    models.AutoField, models.BigAutoField, models.SmallAutoField,
+    models.IntegerField, models.FloatField, models.BooleanField,
+    models.CharField, models.TextField, models.DateField, models.ForeignKey,
+)
+_VALUES_SERIALIZER_FIELDS = (
+    serializers.IntegerField, serializers.FloatField, serializers.BooleanField,
+    serializers.CharField, serializers.ChoiceField, serializers.PrimaryKeyRelatedField,
+    serializers.DateField, serializers.ReadOnlyField,
+)
+
+
+@lru_cache(maxsize=None)
+def values_fields_for_serializer(serializer_class):
+    """
+    Return the `values()` field names that reproduce `serializer_class`'s output, or `None`.
+
+    Only plain `ModelSerializer`s qualify: no overridden `to_representation`, and
+    every readable field a stock DRF field over a single concrete column of a simple
+    type (numbers, booleans, strings, dates, FK ids). For those,
+    `queryset.values(*fields)` yields rows equal to the serializer's output as far as
+    the rendered JSON goes, without instantiating a model or calling
+    `Field.to_representation` per value. Anything else returns `None` and goes
+    through the serializer.
+    """
+    model = getattr(getattr(serializer_class, 'Meta', None), 'model', None)
+    if (
+        model is None
+        or not issubclass(serializer_class, serializers.ModelSerializer)
+        or serializer_class.to_representation is not serializers.ModelSerializer.to_representation
+    ):
+        return None
+
+    fields = []
+    for name, field in serializer_class().fields.items():
+        if field.write_only:
+            continue
+        if not _renders_raw_value(field) or field.source != name:
+            return None
+        if isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is not None:
+            return None
+        if (
+            isinstance(field, serializers.DateField)
+            and getattr(field, 'format', api_settings.DATE_FORMAT) != ISO_8601
+        ):
+            return None
+        try:
+            model_field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+        if not model_field.concrete or isinstance(model_field, models.DateTimeField):
+            return None
+        if not isinstance(model_field, _VALUES_MODEL_FIELDS):
+            return None
+        if (
+            isinstance(model_field, models.ForeignKey)
+            and model_field.target_field != model_field.related_model._meta.pk
+        ):
+            return None
+        fields.append(name)
+    return tuple(fields)
+
+
+def _renders_raw_value(field):
+    """Whether a serializer field renders a column value as it comes from `values()`."""
+    big_integer_field = getattr(serializers, 'BigIntegerField', None)
+    if big_integer_field is not None and type(field) is big_integer_field:
+        return not getattr(field, 'coerce_to_string', getattr(api_settings, 'COERCE_BIGINT_TO_STRING', False))
+    return any(
+        isinstance(field, base) and type(field).to_representation is base.to_representation
+        for base in _VALUES_SERIALIZER_FIELDS
+    )
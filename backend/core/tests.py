@@ -1,3 +1,106 @@
-from django.test import TestCase
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth.hashers import check_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from rest_framework import exceptions
+from rest_framework.authtoken.models import Token
+
+from .authentication import CachedTokenAuthentication, get_token_ttl, token_cache_key
+from .hashing import get_pool, hash_passwords
+from .metrics import RequestMetricsMiddleware, registry
+
+
+class CachedTokenAuthenticationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('learner')
+        self.token = Token.objects.create(user=self.user)
+        self.auth = CachedTokenAuthentication()
+
+    def test_cache_holds_no_user_data(self):
+        with self.assertNumQueries(1):
+            user, token = self.auth.authenticate_credentials(self.token.key)
+        self.assertEqual((user, token), (self.user, self.token))
+        self.assertEqual(cache.get(token_cache_key(self.token.key)), (self.user.pk, self.token.created))
+
+    def test_cached_token_rereads_the_user(self):
+        self.auth.authenticate_credentials(self.token.key)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        with self.assertNumQueries(1), self.assertRaises(exceptions.AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token.key)
+
+    def test_deleted_token_is_forgotten(self):
+        key = self.token.key
+        self.auth.authenticate_credentials(key)
+        self.token.delete()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.auth.authenticate_credentials(key)
+
+    def test_expired_token_is_deleted(self):
+        Token.objects.filter(pk=self.token.pk).update(created=self.token.created - get_token_ttl())
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token.key)
+        self.assertFalse(Token.objects.filter(pk=self.token.pk).exists())
+
+
+class RequestMetricsMiddlewareTests(TestCase):
+
+    def setUp(self):
+        registry.reset()
+        self.request = RequestFactory().get('/')
+
+    def recorded(self, metric):
+        histogram = registry._histograms[(metric, 'unresolved')]
+        return histogram.count, histogram.sum
+
+    def test_sync_request(self):
+        def view(request):
+            return HttpResponse(str(User.objects.count()))
+
+        middleware = RequestMetricsMiddleware(view)
+        self.assertFalse(iscoroutinefunction(middleware))
+        middleware(self.request)
+        self.assertEqual(self.recorded('db_queries_per_request'), (1, 1))
+        self.assertEqual(self.recorded('response_size_bytes'), (1, 1))
+
+    async def test_async_request_stays_async(self):
+        async def view(request):
+            return HttpResponse(str(await User.objects.acount()))
+
+        middleware = RequestMetricsMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        await middleware(self.request)
+        self.assertEqual(self.recorded('db_queries_per_request'), (1, 1))
+        self.assertEqual(self.recorded('response_size_bytes'), (1, 1))
+
+
+class HashPasswordsTests(TestCase):
+
+    def test_hashes_in_order_with_one_reused_pool(self):
+        passwords = ['first', 'second', 'third']
+        hashes = hash_passwords(passwords, workers=2)
+        pool = get_pool(2)
+        self.assertEqual(len(hash_passwords(passwords, workers=2)), len(passwords))
+        self.assertIs(get_pool(2), pool)
+        self.assertTrue(all(check_password(password, hashed) for password, hashed in zip(passwords, hashes)))
+
+    def test_small_batches_reuse_the_configured_pool(self):
+        hash_passwords(['first', 'second', 'third'], workers=2)
+        pool = get_pool(2)
+        hash_passwords(['first', 'second'], workers=2)
+        self.assertIs(get_pool(2), pool)
+
+    def test_broken_pool_is_shut_down_and_replaced(self):
+        pool = get_pool(2)
+        with mock.patch.object(pool, 'map', side_effect=BrokenProcessPool), \
+                mock.patch.object(pool, 'shutdown') as shutdown, self.assertRaises(BrokenProcessPool):
+            hash_passwords(['first', 'second'], workers=2)
+        shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+        self.assertIsNot(get_pool(2), pool)
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,198 @@
+import inspect
+from collections import deque, namedtuple
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.http import Http404
+
+from .models import SoftDeleteModel
+
+
+ParentLink = namedtuple('ParentLink', ['param_name', 'model', 'url_kwarg', 'path', 'prev_params', 'owner_field'])
+ParentLink.__doc__ = """
+One step of a view's `parent_models` chain, resolved once per class.
+
+Fields:
+    param_name (str): Name used in `parent_models` (and as the form context key).
+    model (Model): The parent model class.
+    url_kwarg (str): URL keyword argument holding the parent id (`{param_name}_id`).
+    path (str): Lookup from the view's model to this parent (e.g. `unit__skill_reason_pair__skill`).
+    prev_params (tuple): `(param_name, lookup)` of the earlier parents this model relates to,
+                         with the lookup from this model to them; checked during lookup.
+    owner_field (str or None): The view's `owner_field` for a top-level parent that has it,
+                               `None` otherwise.
+"""
+
+
+def relation_path(model, target, preferred=None, max_depth=4):
+    """
+    The shortest lookup from `model` to `target` along forward foreign keys and
+    one-to-one fields (e.g. `'skill_reason_pair__skill'` from `Unit` to `Skill`),
+    or `None` if there is none within `max_depth` hops.
+
+    A direct relation named `preferred` wins over any other path.
+    """
+    if preferred is not None:
+        try:
+            field = model._meta.get_field(preferred)
+        except FieldDoesNotExist:
+            field = None
+        if field is not None and field.is_relation and field.concrete and field.related_model is target:
+            return preferred
+
+    queue = deque([(model, ())])
+    seen = {model}
+    while queue:
+        current, path = queue.popleft()
+        if len(path) == max_depth:
+            continue
+        for field in current._meta.concrete_fields:
+            if not field.is_relation or field.related_model in seen:
+                continue
+            if field.related_model is target:
+                return '__'.join((*path, field.name))
+            seen.add(field.related_model)
+            queue.append((field.related_model, (*path, field.name)))
+    return None
+
+
+def has_field(model, name):
+    try:
+        model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+class ViewPlan:
+    """
+    Per-class metadata for `BaseListView`/`BaseDetailView`, compiled once.
+
+    Everything here depends only on class attributes (`form_class`, `parent_models`,
+    `model`, `owner_field`), so it is worked out when the view is wired up with
+    `as_view()` instead of on every request. Requests only fill in the values (URL
+    kwargs, the user).
+
+    Attributes:
+        form_init_params (tuple): Parameters of `form_class.__init__` (excluding `self`).
+        form_takes_user (bool): Whether `request.user` should be passed as `user`.
+        form_context_keys (frozenset or None): Context keys the form accepts.
+        parents (tuple): `ParentLink` for each entry of `parent_models`, in order.
+        top_level_unowned (ParentLink or None): Top-level parent lacking the owner field;
+                                                 using the chain is a configuration error.
+        owned (bool): Whether the filters restrict rows to the requesting user: through the
+                      top-level parent, or the model's own owner field when it has no parents.
+        detail_filter_template (tuple): `(lookup, source)` pairs restricting the model to the
+                                        rows under the URL's parents and owned by the user,
+                                        where `source` is a URL kwarg name or `None` for
+                                        the requesting user.
+        live_filters (dict): Lookups excluding rows under a parent marked deleted
+                             (`SoftDeleteModel`), added to every parent filter.
+    """
+
+    def __init__(self, view_class):
+        self.view_name = view_class.__name__
+        self.form_init_params = ()
+        self.form_takes_user = False
+        self.form_context_keys = None
+        form_class = getattr(view_class, 'form_class', None)
+        if form_class is not None:
+            self.form_init_params = tuple(inspect.signature(form_class.__init__).parameters)[1:]
+            required_context = getattr(form_class, 'required_context', None)
+            self.form_takes_user = 'user' in self.form_init_params or 'user' in (required_context or ())
+            if required_context is not None:
+                self.form_context_keys = frozenset(required_context)
+            else:
+                self.form_context_keys = frozenset(self.form_init_params)
+
+        model = getattr(view_class, 'model', None)
+        owner_field = getattr(view_class, 'owner_field', None)
+        self.parents = tuple(self._compile_parents(view_class.__name__, model, view_class.parent_models, owner_field))
+        self.top_level_unowned = None
+        if self.parents and self.parents[0].owner_field is None:
+            self.top_level_unowned = self.parents[0]
+
+        # Keyed by lookup: a relation between two parents may already be implied by the
+        # paths to them (e.g. a task's unit and skill), and is then only filtered once
+        template = {}
+        for link in self.parents:
+            template[f'{link.path}__id'] = link.url_kwarg
+            for prev_param, prev_path in link.prev_params:
+                template.setdefault(f'{link.path}__{prev_path}__id', f'{prev_param}_id')
+            if link.owner_field:
+                template[f'{link.path}__{link.owner_field}'] = None
+        if not self.parents and model is not None and owner_field and has_field(model, owner_field):
+            template[owner_field] = None
+        self.owned = None in template.values()
+        self.detail_filter_template = tuple(template.items())
+        self.live_filters = {
+            f'{link.path}__deleted_at__isnull': True
+            for link in self.parents if issubclass(link.model, SoftDeleteModel)
+        }
+
+    def fill_parent_filters(self, kwargs, user):
+        """
+        Fill `detail_filter_template` with the URL kwargs and the requesting user.
+
+        The result restricts the target model to rows under the parents named in the
+        URL, with the top-level parent owned by `user` and no parent marked deleted.
+        """
+        if self.top_level_unowned is not None:
+            raise ImproperlyConfigured(
+                f"Top-level parent {self.top_level_unowned.model.__name__} in {self.view_name} "
+                f"requires an owner field for ownership check."
+            )
+
+        for link in self.parents:
+            if kwargs.get(link.url_kwarg) is None:
+                raise Http404(f"URL Config Error: Missing '{link.url_kwarg}' for {link.model.__name__}.")
+
+        filters = {
+            lookup: user if source is None else kwargs[source]
+            for lookup, source in self.detail_filter_template
+        }
+        filters.update(self.live_filters)
+        return filters
+
+    @staticmethod
+    def _compile_parents(view_name, model, parent_models, owner_field):
+        for index, (param_name, parent_model) in enumerate(parent_models):
+            path = relation_path(model, parent_model, preferred=param_name)
+            if path is None:
+                raise ImproperlyConfigured(
+                    f"{view_name}: {model.__name__} has no relation to its parent {parent_model.__name__}."
+                )
+
+            prev_params = []
+            for prev_param, prev_model in parent_models[:index]:
+                prev_path = relation_path(parent_model, prev_model, preferred=prev_param)
+                if prev_path is not None:
+                    prev_params.append((prev_param, prev_path))
+
+            link_owner_field = None
+            if index == 0 and owner_field and has_field(parent_model, owner_field):
+                link_owner_field = owner_field
+
+            yield ParentLink(param_name, parent_model, f'{param_name}_id', path, tuple(prev_params), link_owner_field)
+
+
+class ViewPlanMixin:
+    """
+    Compiles a `ViewPlan` for the view class when `as_view()` is called.
+
+    The plan is stored on the class itself (not inherited), so each concrete view gets
+    its own. `get_view_plan()` compiles lazily as well, for views instantiated without
+    going through `as_view()`.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        cls.get_view_plan()
+        return super().as_view(**initkwargs)
+
+    @classmethod
+    def get_view_plan(cls):
+        plan = cls.__dict__.get('_view_plan')
+        if plan is None:
+            plan = ViewPlan(cls)
+            cls._view_plan = plan
+        return plan
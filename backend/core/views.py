@@ -1,3 +1,13 @@
-from django.shortcuts import render
+from django.http import HttpResponse
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
 
-# Create your views here.
+from .metrics import registry
+
+
+class MetricsView(APIView):
+    """Request metrics of this process (`core.metrics`) in Prometheus text format. Staff only."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return HttpResponse(registry.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
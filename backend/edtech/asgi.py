@@ -2,6 +2,8 @@
 ASGI config for edtech project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve the project through it for the change event stream (``/events/``, see
+``core.events``), which holds one connection per subscribed client.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
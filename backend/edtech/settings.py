@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+from datetime import timedelta
 from pathlib import Path
 from dotenv import load_dotenv
 import os
@@ -48,6 +49,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the other middleware (see /metrics/)
+    'core.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -91,6 +94,35 @@ DATABASES = {
     }
 }
 
+# Optional read replica: safe-method API requests read from it (core.db_routers).
+# Set DB_REPLICA_HOST to enable it; locally, any second alias works (e.g. a copy of a
+# SQLite database). edtech.test_settings sets one up as a test mirror for the routing tests.
+if os.environ.get('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.environ['DB_REPLICA_HOST'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['core.db_routers.ReplicaRouter']
+API_READ_REPLICA = 'replica' if 'replica' in DATABASES else None
+# Users read from the primary for this long after a write; keep it above the replication lag
+API_REPLICA_PIN_SECONDS = 5
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Backs the per-learner API response cache (core.cache). The local-memory backend is
+# per process; deployments running several processes should point this at a shared
+# backend (e.g. Redis or Memcached) so version bumps reach every process.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'edtech',
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -134,13 +166,31 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
+    # orjson-backed JSON; the browsable API (template rendering) is only offered in development
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
-        'rest_framework.renderers.BrowsableAPIRenderer',
+        'core.renderers.FastJSONRenderer',
+        *(['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []),
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.BasicAuthentication',
+        'core.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
     ],
 }
 
+# API tokens (core.authentication.CachedTokenAuthentication)
+API_TOKEN_TTL = timedelta(days=7)
+# Seconds a token -> user id lookup is served from the cache; with a per-process cache, also how
+# long other workers may still accept a revoked token
+API_TOKEN_CACHE_TIMEOUT = 300
+
+# Change events pushed over /events/ (core.events); in-process only reaches clients of the same worker
+API_EVENT_BROKER = 'core.events.InProcessBroker'
+API_EVENT_HEARTBEAT_SECONDS = 15
+
+# Rows per DELETE when purging skills deleted in the background (core.deletion)
+API_PURGE_BATCH_SIZE = 1000
+
+# Processes hashing passwords when provisioning a cohort (core.hashing); None: one per CPU
+API_PROVISIONING_WORKERS = None
+
@@ -0,0 +1,25 @@
+"""
+Settings for running the test suite without Postgres:
+
+    python manage.py test --settings=edtech.test_settings
+
+Two SQLite aliases, with `replica` a test mirror of `default` (the same database),
+so the read replica routing of `core.db_routers` can be exercised. The replica is
+not enabled by default; tests of the routing turn it on with `API_READ_REPLICA`.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR
+
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'test.sqlite3',
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'test-replica.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+API_READ_REPLICA = None
@@ -16,8 +16,12 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from core.async_views import ChangeStreamView
+from core.views import MetricsView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('api/', include('api.urls'))
+    path('api/', include('api.urls')),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+    path('events/', ChangeStreamView.as_view(), name='events'),
 ]